@@ -1,17 +1,45 @@
 # for command line arguments
 import argparse
+# for the asynchronous HTTP transport
+import asyncio
+# for the repository processing worker pool
+import concurrent.futures
+# for the metrics stage context manager
+import contextlib
 # for writing the CSV file
 import csv
+# for splitting the search created date ranges
+import datetime
+# for parsing the HTTP-date form of the Retry-After header
+import email.utils
+# for the metrics stage decorator
+import functools
+# for generating the HTTP response cache filenames
+import hashlib
+# for merging the sorted runs of the spool file
+import heapq
 # for URL request errors
 import http.client
+# for parsing HTTP response headers
+import io
+# for reading the spool file in chunks
+import itertools
 # for parsing Library Manager index
 import json
 # for debug output
 import logging
 # for deleting failed verification list file
 import os
+# for the jitter of the retry delays
+import random
 # for parsing page count from response header
 import re
+# for the asynchronous HTTP transport
+import ssl
+# for interning the text of the compact rows
+import sys
+# for thread-safe access to the shared state from the repository processing workers
+import threading
 # for handling rate limiting timeouts
 import time
 # for URL request errors
@@ -27,43 +55,205 @@ import urllib.request
 rate_limit_reset_wait_notification_interval = 300
 # (s) delay after rate limit reset time to make sure it has actually reset before the next API request
 rate_limit_reset_wait_additional_delay = 180
+# fraction of the remaining GitHub API requests that can be made without pacing. The rest are spread evenly over the
+# time until the rate limit is reset, so that the allotment is not used up long before the reset.
+rate_limit_burst_fraction = 0.5
+# path of the GitHub API rate limit status (https://developer.github.com/v3/rate_limit/)
+rate_limit_api_path = "/rate_limit"
 
 # call check_rate_limiting() after an exception that starts with this string
 # urllib.error.HTTPError: HTTP Error 503: Service Unavailable
 check_rate_limiting_after_exception = "HTTPError: HTTP Error 503"
-# retry urlopen after exceptions that start with the following strings
+# retry urlopen after exceptions that start with the following strings (exception string, error class). Each class of
+# error has its own retry budget.
 # urllib.error.HTTPError: HTTP Error 403: Forbidden
-urlopen_retry_exceptions = ["HTTPError: HTTP Error 403",
+urlopen_retry_exceptions = [("HTTPError: HTTP Error 403", "rate_limit"),
+                            # urllib.error.HTTPError: HTTP Error 429: Too Many Requests
+                            ("HTTPError: HTTP Error 429", "rate_limit"),
                             # urllib.error.HTTPError: HTTP Error 502: Bad Gateway
-                            "HTTPError: HTTP Error 502",
-                            check_rate_limiting_after_exception,
+                            ("HTTPError: HTTP Error 502", "server_error"),
+                            (check_rate_limiting_after_exception, "server_error"),
+                            # urllib.error.HTTPError: HTTP Error 504: Gateway Timeout
+                            ("HTTPError: HTTP Error 504", "server_error"),
                             # http.client.RemoteDisconnected: Remote end closed connection without response
                             # https://circleci.com/gh/per1234/inoliblist/4
-                            "RemoteDisconnected",
+                            ("RemoteDisconnected", "connection_error"),
                             # ConnectionResetError: [Errno 104] Connection reset by peer
                             # https://circleci.com/gh/per1234/inoliblist/25
-                            "ConnectionResetError",
+                            ("ConnectionResetError", "connection_error"),
                             # ConnectionRefusedError: [WinError 10061] No connection could be made because the target
                             # machine actively refused it
-                            "ConnectionRefusedError",
+                            ("ConnectionRefusedError", "connection_error"),
                             # urllib.error.URLError: <urlopen error [WinError 10061] No connection could be made because
                             # the target machine actively refused it>
-                            "<urlopen error [WinError 10061] No connection could be made because the target machine "
-                            "actively refused it>"
+                            ("<urlopen error [WinError 10061] No connection could be made because the target machine "
+                             "actively refused it>", "connection_error"),
+                            # asyncio.TimeoutError: (the asynchronous HTTP transport timed out waiting for a response)
+                            ("TimeoutError", "connection_error")
                             ]
 
-# delay before retry after failed urlopen (seconds)
-urlopen_retry_delay = 60
-# maximum times to retry opening the URL before giving up
-maximum_urlopen_retries = 5
+# maximum times to retry a request for each class of error before giving up
+retry_budgets = {"rate_limit": 5,
+                 "server_error": 5,
+                 "connection_error": 5,
+                 # the search results are incomplete due to a timeout
+                 "incomplete_search": 10,
+                 # a page after the first page of the search results has no results
+                 "empty_search": 2}
+# (s) the delay before a retry is random, between 0 and this value doubled for each retry of the request
+retry_base_delay = 1
+# (s) maximum of the random range of the delay before a retry
+retry_maximum_delay = 60
+# (s) additional delay before retrying after exceeding GitHub's secondary rate limit, when the response doesn't specify
+# the delay (https://developer.github.com/v3/#abuse-rate-limits)
+secondary_rate_limit_delay = 60
+
+# number of repositories to process concurrently (1 results in serial processing)
+default_job_count = 1
+# maximum number of repositories waiting for a free worker, per worker
+# this keeps memory use bounded when the sources produce repositories faster than they can be processed
+repository_queue_size_per_job = 2
+
+# maximum number of HTTP requests in flight at the same time when the asynchronous HTTP transport is used
+maximum_requests_in_flight = 64
+# (s) how long the asynchronous HTTP transport waits for a response before giving up on the request
+async_http_timeout = 120
+# maximum number of redirects the asynchronous HTTP transport follows (GitHub redirects renamed repositories)
+maximum_http_redirects = 10
+# user agent header sent by the asynchronous HTTP transport (required by the GitHub API)
+http_user_agent = "inoliblist"
+
+# the run report is written to this file in the output folder
+run_report_filename = "run_report.json"
+# (s) upper bounds of the buckets of the HTTP request latency histograms
+metrics_latency_buckets = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+# the endpoint type of each GitHub API request is determined by the first of these paths its URL starts with
+metrics_github_api_endpoint_types = [("/search", "github_search"),
+                                     ("/graphql", "github_graphql"),
+                                     ("/rate_limit", "github_rate_limit"),
+                                     ("", "github_core")]
+
+# base URLs of the services the list is generated from. These can be changed to use a local stand-in server (e.g. for
+# the benchmarks).
+default_github_api_url = "https://api.github.com"
+default_github_raw_url = "https://raw.githubusercontent.com"
+default_library_index_url = "http://downloads.arduino.cc/libraries/library_index.json"
+
+# default folder for the HTTP response cache
+default_cache_folder_name = "cache"
+# (bytes) maximum total size of the HTTP response cache. When exceeded, the least recently used responses are evicted.
+maximum_cache_size = 1024 * 1024 * 1024
+# when eviction is necessary, the cache is reduced to this fraction of maximum_cache_size
+cache_eviction_target = 0.9
+# the Library Manager index and the data saved for the next run are kept in this subfolder of the cache folder. Only the
+# responses in the cache folder itself count towards the cache size and are evicted.
+state_folder_name = "state"
+# responses from GitHub API URLs that start with these paths are never cached
+uncached_github_api_paths = [rate_limit_api_path]
+# the Library Manager index is downloaded to this file in the state folder, or in the output folder if the cache is
+# disabled
+library_index_filename = "library_index.json"
+# the ETag and Last-Modified values of the downloaded Library Manager index are saved to this file in the state folder
+# so the index is only downloaded again if it has changed
+library_index_validators_filename = "library_index_validators.json"
+# (characters) size of the chunks the Library Manager index is downloaded and parsed in
+library_index_chunk_size = 1024 * 1024
+# the fields of the newest release of each library in the Library Manager index that are kept
+library_index_release_fields = ["name", "version", "author", "maintainer", "sentence", "paragraph", "category",
+                                "website", "architectures"]
 
 # maximum number of results per API request (max allowed by GitHub is 100)
 results_per_page = 100
-
-# (s) delay before retrying search
-search_retry_delay = 60
-# maximum times to retry the search when it returns incomplete or no results
-maximum_search_retries = 10
+# the repository objects in search results are missing these items, which are only provided by the repos API
+search_result_missing_keys = ["parent", "source", "network_count", "subscribers_count"]
+# only these items of the repository objects in search results are used to populate the rows, so the rest are discarded
+# when the search results are collected
+search_result_used_keys = ["name", "full_name", "html_url", "owner", "default_branch", "archived", "fork", "pushed_at",
+                           "forks_count", "stargazers_count", "license", "language", "description", "topics"]
+# the fork parents of the repositories are saved to this file in the state folder so the next run doesn't need to fetch
+# them again
+fork_parents_filename = "fork_parents.json"
+# the raw files found to be missing from the repositories are saved to this file in the state folder so the next run
+# doesn't need to request them again unless the repository has been pushed to since
+missing_raw_files_filename = "missing_raw_files.json"
+# the newest release of each library in the Library Manager index and the repository's push time when its
+# library.properties was verified to be that release's are saved to this file in the state folder. If the repository
+# hasn't been pushed to since, the metadata in the index is still current.
+verified_library_releases_filename = "verified_library_releases.json"
+
+# URL of the GitHub GraphQL API, used when the --graphql command line argument is passed
+default_graphql_api_url = "https://api.github.com/graphql"
+# number of repositories fetched by each GraphQL query
+graphql_batch_size = 50
+# fields of each repository fetched via the GraphQL API. The contributor count is not available via GraphQL so it is
+# still fetched via the REST API.
+graphql_repository_fields = """
+fragment RepositoryFields on Repository {
+  name
+  nameWithOwner
+  url
+  owner {
+    login
+  }
+  defaultBranchRef {
+    name
+    target {
+      ... on Commit {
+        status {
+          state
+        }
+      }
+    }
+  }
+  isArchived
+  isFork
+  parent {
+    nameWithOwner
+  }
+  pushedAt
+  forkCount
+  stargazers {
+    totalCount
+  }
+  licenseInfo {
+    spdxId
+  }
+  primaryLanguage {
+    name
+  }
+  description
+  repositoryTopics(first: 100) {
+    nodes {
+      topic {
+        name
+      }
+    }
+  }
+}
+"""
+# mode of symbolic link entries in Git trees
+git_tree_symlink_mode = "120000"
+
+# GraphQL commit status states and the equivalent combined status API states
+graphql_status_states = {"ERROR": "failure",
+                         "EXPECTED": "pending",
+                         "FAILURE": "failure",
+                         "PENDING": "pending",
+                         "SUCCESS": "success"}
+
+# default number of search segments fetched concurrently
+default_search_job_count = 1
+# GitHub's search API provides data for a maximum of this many search results
+# https://developer.github.com/v3/search/#about-the-search-api
+maximum_search_results_count = 1000
+# adjacent search segments are merged for the next run if their combined result count is not more than this. It's
+# lower than maximum_search_results_count so that the merged segment doesn't need to be split again as soon as more
+# repositories are created.
+search_segment_merge_limit = 800
+# the lower bound of the created date ranges of search segments that don't have a lower bound
+search_minimum_created_date = datetime.date(2007, 10, 1)
+# the search segments learned by splitting and merging are saved to this file in the state folder
+search_segments_filename = "search_segments.json"
 
 # when verification is enabled, repositories that match the following regular expressions will be skipped
 repository_name_blacklist = ["^arduino$",
@@ -242,6 +432,22 @@ output_folder_name = "output"
 verification_failed_list_filename = "verification_failed_list.csv"
 non_library_folders_list_filename = "non_library_folders_list.csv"
 output_filename = "inoliblist.csv"
+# each row is appended to this file as soon as it's produced. The output file is generated from it.
+spool_filename = "inoliblist_spool.csv"
+# number of rows sorted in memory at a time when generating the output file from the spool file
+spool_sort_chunk_size = 10000
+# default order of the rows of the output file. The names are the keys of sort_keys.
+default_sort_key_names = ["url"]
+# the progress of the list generation is saved to this file so that an interrupted run can be resumed
+checkpoint_filename = "checkpoint.json"
+# the repositories collected from the sources are appended to this file after each source and search segment so that
+# an interrupted run can resume without searching again. Each line is a JSON array of the repository key and the
+# candidate. A candidate that was updated by a later segment is written again and the last line of a key is used.
+candidates_filename = "candidates.jsonl"
+# a checkpoint is saved after this many of the collected repositories have been processed
+checkpoint_interval = 100
+# lines appended to these output files after the last checkpoint are removed when resuming
+checkpointed_list_filenames = [verification_failed_list_filename, non_library_folders_list_filename]
 output_file_delimiter = '\t'
 output_file_quotechar = None
 file_encoding = "utf-8"
@@ -337,28 +543,734 @@ class Column:
     column_counter += 1
     platformio_platforms = column_counter
     column_counter += 1
+    # the columns added later are at the end so the position of the existing columns doesn't change
+    library_manager_release_count = column_counter
+    column_counter += 1
     count = column_counter
 
 
+class Row:
+    """Compact record of a row of the table, used for the rows kept in memory.
+    Each cell is stored in a slot named after its column. The count columns are stored as integers and the True/False
+    columns as booleans. The text of the columns that have few distinct values is interned so all the rows share a
+    single copy of each value. The text of the cells is only produced when it's read.
+    """
+    # the slot name of each column, in column order
+    column_names = [name for value, name in sorted((value, name) for name, value in vars(Column).items()
+                                                   if isinstance(value, int)
+                                                   and name not in ["column_counter", "count"])]
+    __slots__ = column_names
+    integer_columns = frozenset([Column.fork_count, Column.star_count, Column.contributor_count,
+                                 Column.library_manager_release_count])
+    boolean_columns = frozenset([Column.archived, Column.is_fork, Column.in_library_manager_index])
+    interned_columns = frozenset([Column.repository_owner, Column.repository_default_branch, Column.library_path,
+                                  Column.tip_status, Column.repository_license, Column.repository_language,
+                                  Column.library_manager_category, Column.library_manager_architectures])
+
+    def __init__(self, row_list):
+        """Keyword arguments:
+        row_list -- list of the text of the cells of the row. The cells of the columns missing from a row saved by an
+                    older version of the script are empty.
+        """
+        for column, column_name in enumerate(self.column_names):
+            cell = row_list[column] if column < len(row_list) else ""
+            setattr(self, column_name, self.get_typed_value(column=column, cell=cell))
+
+    @classmethod
+    def get_typed_value(cls, column, cell):
+        """Return the value to store for the cell. Text that doesn't have the expected format for the column (e.g. the
+        empty contributor count when the request failed) is stored as is so that the text is unchanged.
+
+        Keyword arguments:
+        column -- the column of the cell
+        cell -- text of the cell
+        """
+        if column in cls.integer_columns:
+            if cell.isdigit() and str(int(cell)) == cell:
+                return int(cell)
+        elif column in cls.boolean_columns:
+            if cell == "True":
+                return True
+            if cell == "False":
+                return False
+        elif column in cls.interned_columns:
+            return sys.intern(cell)
+        return cell
+
+    def get_value(self, column):
+        """Return the stored value of the cell.
+
+        Keyword arguments:
+        column -- the column of the cell
+        """
+        return getattr(self, self.column_names[column])
+
+    def __getitem__(self, column):
+        """Return the text of the cell.
+
+        Keyword arguments:
+        column -- the column of the cell
+        """
+        return str(getattr(self, self.column_names[column]))
+
+    def __len__(self):
+        return Column.count
+
+    def get_text_list(self):
+        """Return the list of the text of the cells of the row."""
+        return [str(getattr(self, column_name)) for column_name in self.column_names]
+
+
+class NameMatcher:
+    """Matches names against a list of regular expressions, ignoring case.
+    The regular expressions are compiled once, when the object is created. Those that only match an exact name
+    (e.g. "^examples$") or a file extension (e.g. "^.*\\.md$") are checked with set lookups and the rest are combined
+    into a single regular expression.
+    """
+    exact_name_regex = re.compile(r"\^((?:[\w-]|\\\.)+)\$")
+    extension_regex = re.compile(r"\^\.\*\\\.(\w+)\$")
+
+    def __init__(self, regular_expressions):
+        """Keyword arguments:
+        regular_expressions -- list of regular expressions, each of which must match the whole name
+        """
+        self.names = set()
+        self.extensions = set()
+        combined_regular_expressions = []
+        for regular_expression in regular_expressions:
+            extension_match = self.extension_regex.fullmatch(regular_expression)
+            exact_name_match = self.exact_name_regex.fullmatch(regular_expression)
+            if extension_match is not None:
+                self.extensions.add("." + extension_match.group(1).lower())
+            elif exact_name_match is not None:
+                self.names.add(exact_name_match.group(1).replace("\\.", ".").lower())
+            else:
+                combined_regular_expressions.append("(?:" + regular_expression + ")")
+
+        if combined_regular_expressions:
+            self.combined_regex = re.compile("|".join(combined_regular_expressions), flags=re.IGNORECASE)
+        else:
+            self.combined_regex = None
+
+    def matches(self, name):
+        """Return whether the name fully matches any of the regular expressions.
+
+        Keyword arguments:
+        name -- the name to check
+        """
+        lowercase_name = name.lower()
+        if lowercase_name in self.names:
+            return True
+        extension_index = lowercase_name.rfind(".")
+        if extension_index != -1 and lowercase_name[extension_index:] in self.extensions:
+            return True
+        return self.combined_regex is not None and self.combined_regex.fullmatch(name) is not None
+
+
+class RateLimitScheduler:
+    """Paces GitHub API requests to stay within the rate limit. The remaining requests and reset time of each API type
+    are tracked separately, using the rate limiting headers of every response. The requests are paced with a token
+    bucket that is refilled at the rate which would use up the remaining requests exactly at the reset time. When the
+    allotment is used up, the requesting threads sleep until it is reset.
+    This can be used from multiple threads at once.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        # API type: dictionary of remaining, reset, tokens, refill_time
+        self.budgets = {}
+        # API types currently being checked via the rate_limit API
+        self.checking_api_types = set()
+        self.notification_timestamp = 0
+
+    def acquire(self, api_type, charge=True):
+        """Wait until a request of the API type may be made.
+
+        Keyword arguments:
+        api_type -- the API type ("search", "core", "graphql")
+        charge -- whether a request of the API type will be made, using up a token and a request of the allotment. If
+                  False, only wait until the allotment is not used up. (default value: True)
+        """
+        with self.condition:
+            while True:
+                now = time.time()
+                budget = self.budgets.get(api_type)
+                if budget is None:
+                    outdated = True
+                elif budget["remaining"] <= 0:
+                    outdated = now >= budget["reset"] + rate_limit_reset_wait_additional_delay
+                else:
+                    # once the reset time has passed the allotment is refilled so the remaining count is stale
+                    outdated = now >= budget["reset"]
+                if outdated:
+                    # the stored values are missing or outdated (because the limit reset since the last API request) so
+                    # I need to actually do an request to the Rate Limit API to get the real values
+                    if api_type in self.checking_api_types:
+                        # another thread is already doing that
+                        self.condition.wait()
+                    else:
+                        self.check(api_type=api_type)
+                    continue
+
+                if budget["remaining"] <= 0:
+                    # API request allowance is used up
+                    reset_time = budget["reset"] + rate_limit_reset_wait_additional_delay
+                    if (now - self.notification_timestamp) > rate_limit_reset_wait_notification_interval:
+                        # print a periodic message while waiting for the API timeout to indicate the script is still
+                        # alive
+                        print("GitHub " + api_type + " API request limit reached. Time before limit reset: " +
+                              str(int((reset_time - now) / 60)) + " minutes")
+                        self.notification_timestamp = now
+                    self.condition.wait(timeout=min(reset_time - now, rate_limit_reset_wait_notification_interval))
+                    continue
+
+                if not charge:
+                    return
+
+                # refill the token bucket
+                refill_rate = budget["remaining"] / max(budget["reset"] - now, 1)
+                budget["tokens"] = min(max(budget["remaining"] * rate_limit_burst_fraction, 1),
+                                       budget["tokens"] + (now - budget["refill_time"]) * refill_rate)
+                budget["refill_time"] = now
+                if budget["tokens"] >= 1:
+                    budget["tokens"] -= 1
+                    budget["remaining"] -= 1
+                    return
+                self.condition.wait(timeout=(1 - budget["tokens"]) / refill_rate)
+
+    def check(self, api_type):
+        """Get the actual rate limit values from the GitHub API. Must be called with the condition acquired.
+
+        Keyword arguments:
+        api_type -- the API type that is being waited for
+        """
+        self.checking_api_types.add(api_type)
+        # don't block the other threads while waiting for the response
+        self.condition.release()
+        try:
+            # the rate_limit API does not use up the API request allotment so I can use get_json_from_url()
+            json_data = dict(get_json_from_url(url=github_api_url + rate_limit_api_path)["json_data"])
+        finally:
+            self.condition.acquire()
+            self.checking_api_types.discard(api_type)
+            self.condition.notify_all()
+
+        for resource_api_type, resource in json_data["resources"].items():
+            # the values are current so they replace the stored ones
+            self.budgets.pop(resource_api_type, None)
+            self.update(api_type=resource_api_type, remaining=resource["remaining"], reset=resource["reset"])
+
+        budget = self.budgets[api_type]
+        logger.info(api_type + " API request allotment: " + str(json_data["resources"][api_type]["limit"]))
+        logger.info("Remaining " + api_type + " API requests: " + str(budget["remaining"]))
+        logger.info(api_type + " API rate limiting reset time: " + str(budget["reset"]))
+
+        if budget["remaining"] <= 0:
+            if github_token is None:
+                print("Pass the script a GitHub personal API access token via the --ghtoken command line argument " +
+                      "for a more generous allowance")
+                print("https://blog.github.com/2013-05-16-personal-api-tokens/")
+            if budget["reset"] + rate_limit_reset_wait_additional_delay <= time.time():
+                # the reset time has already passed but the allotment has not been reset yet, so wait a bit before
+                # checking again
+                budget["reset"] = time.time()
+        elif budget["reset"] <= time.time():
+            # the reset time has already passed according to the local clock but not GitHub's, so the values are current
+            # and don't need to be checked again before the requests
+            budget["reset"] = time.time() + rate_limit_reset_wait_additional_delay
+
+    def update(self, api_type, remaining, reset):
+        """Store the rate limit values. Must be called with the condition acquired.
+
+        Keyword arguments:
+        api_type -- the API type
+        remaining -- number of remaining requests
+        reset -- time the allotment will be reset, in seconds since the epoch
+        """
+        now = time.time()
+        budget = self.budgets.get(api_type)
+        if budget is None or reset > budget["reset"]:
+            # this is a new rate limit window so the token bucket starts full
+            self.budgets[api_type] = {"remaining": remaining,
+                                      "reset": reset,
+                                      "tokens": max(remaining * rate_limit_burst_fraction, 1),
+                                      "refill_time": now}
+        else:
+            # responses to concurrent requests may arrive out of order so the lowest value is the most recent
+            budget["remaining"] = min(budget["remaining"], remaining)
+        self.condition.notify_all()
+
+    def update_from_headers(self, url, headers):
+        """Store the rate limit values from the headers of a GitHub API response.
+
+        Keyword arguments:
+        url -- the URL of the request
+        headers -- the response headers
+        """
+        if headers["X-RateLimit-Remaining"] is None or headers["X-RateLimit-Reset"] is None:
+            return
+        if headers["X-RateLimit-Resource"] is not None:
+            api_type = headers["X-RateLimit-Resource"]
+        elif url.startswith(github_api_url + "/search"):
+            api_type = "search"
+        elif url.startswith(github_api_url + "/graphql"):
+            api_type = "graphql"
+        else:
+            api_type = "core"
+        with self.condition:
+            self.update(api_type=api_type,
+                        remaining=int(headers["X-RateLimit-Remaining"]),
+                        reset=int(headers["X-RateLimit-Reset"]))
+
+
+class RetryPolicy:
+    """Decides whether a failed request is retried and how long to wait before the retry. Each class of error has its
+    own budget of retries (see retry_budgets). The delay is taken from the Retry-After or rate limiting headers of the
+    response if present. Otherwise, it is random, with a range that doubles with each retry of the request, so that
+    transient errors are retried quickly and requests that failed at the same time don't all retry at the same time.
+    A RetryPolicy object is used for each request.
+    """
+
+    def __init__(self):
+        # error class: number of retries done
+        self.retry_counts = {}
+        # the class of error whose budget was used up. None if no budget has been used up.
+        self.exhausted_error_class = None
+
+    def retry(self, error_class, response_headers=None):
+        """If the budget of the error class allows another retry, wait for the retry delay and return True. Otherwise,
+        return False.
+
+        Keyword arguments:
+        error_class -- the class of error (one of the keys of retry_budgets)
+        response_headers -- headers of the failed response, if there was one (default value: None)
+        """
+        retry_count = self.retry_counts.get(error_class, 0)
+        if retry_count >= retry_budgets[error_class]:
+            self.exhausted_error_class = error_class
+            return False
+        self.retry_counts[error_class] = retry_count + 1
+        metrics.record_retry()
+        delay = self.get_delay(error_class=error_class, retry_count=retry_count, response_headers=response_headers)
+        print("Retrying in " + format(delay, ".0f") + " s")
+        if error_class == "rate_limit":
+            metrics.record_rate_limit_wait(seconds=delay)
+        time.sleep(delay)
+        return True
+
+    @staticmethod
+    def get_delay(error_class, retry_count, response_headers):
+        """Return the delay (s) before the retry.
+
+        Keyword arguments:
+        error_class -- the class of error
+        retry_count -- number of retries of the request already done for the error class
+        response_headers -- headers of the failed response. None if there was no response.
+        """
+        if response_headers is not None:
+            retry_after = response_headers.get("Retry-After")
+            if retry_after is not None:
+                retry_after = retry_after.strip()
+                if retry_after.isdigit():
+                    return int(retry_after)
+                # the value can also be the date after which to retry
+                try:
+                    retry_date = email.utils.parsedate_to_datetime(retry_after)
+                except (TypeError, ValueError):
+                    retry_date = None
+                if retry_date is not None:
+                    if retry_date.tzinfo is None:
+                        # the date of the HTTP-date format is always in GMT
+                        retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+                    return max(retry_date.timestamp() - time.time(), 0)
+            reset = response_headers.get("X-RateLimit-Reset")
+            if response_headers.get("X-RateLimit-Remaining") == "0" and reset is not None and reset.isdigit():
+                # the rate limit allotment is used up so wait until it is reset
+                return max(int(reset) - time.time(), 0)
+
+        delay = random.uniform(0, min(retry_maximum_delay, retry_base_delay * 2 ** retry_count))
+        if error_class == "rate_limit":
+            # GitHub's secondary rate limit requires waiting at least a minute
+            delay += secondary_rate_limit_delay
+        return delay
+
+
+class Metrics:
+    """Collects the statistics of each stage of the list generation: the HTTP requests by endpoint type and status, the
+    bytes transferred, the request latencies, the retries, and the time spent waiting in check_rate_limiting().
+    The current stage is tracked separately for each thread, so the requests of the repository processing workers and
+    the search workers are attributed to the right stage. The time of a stage doesn't include the time spent in the
+    stages entered from it. When multiple threads are used, the stage times are the total of all threads.
+    This can be used from multiple threads at once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread_state = threading.local()
+        self.start_time = time.time()
+        # stage name: dictionary of statistics
+        self.stages = {}
+
+    def get_stage_statistics(self, stage_name):
+        """Return the statistics of the stage. Must be called with the lock acquired.
+
+        Keyword arguments:
+        stage_name -- name of the stage
+        """
+        statistics = self.stages.get(stage_name)
+        if statistics is None:
+            statistics = {"seconds": 0,
+                          # endpoint type: number of requests
+                          "requests": {},
+                          # HTTP status ("error" if there was no response): number of requests
+                          "statuses": {},
+                          "bytes_sent": 0,
+                          "bytes_received": 0,
+                          # number of requests with a latency up to each of metrics_latency_buckets, and more
+                          "latency_buckets": [0] * (len(metrics_latency_buckets) + 1),
+                          "latency_seconds": 0,
+                          "retries": 0,
+                          "rate_limit_wait_seconds": 0}
+            self.stages[stage_name] = statistics
+        return statistics
+
+    def get_stage_stack(self):
+        """Return the list of the current thread's stages, each a list of the name and the time it was last resumed."""
+        if not hasattr(self.thread_state, "stage_stack"):
+            self.thread_state.stage_stack = [["other", time.time()]]
+        return self.thread_state.stage_stack
+
+    def add_stage_time(self, stage):
+        """Add the time since the stage was last resumed to its total.
+
+        Keyword arguments:
+        stage -- list of the stage name and the time it was last resumed
+        """
+        now = time.time()
+        with self.lock:
+            self.get_stage_statistics(stage_name=stage[0])["seconds"] += now - stage[1]
+        stage[1] = now
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Attribute the statistics of the code run in the with statement to the stage.
+
+        Keyword arguments:
+        name -- name of the stage
+        """
+        stage_stack = self.get_stage_stack()
+        self.add_stage_time(stage=stage_stack[-1])
+        stage_stack.append([name, time.time()])
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage=stage_stack.pop())
+            stage_stack[-1][1] = time.time()
+
+    def record_request(self, url, status, bytes_sent, bytes_received, latency):
+        """Record an HTTP request.
+
+        Keyword arguments:
+        url -- the URL of the request
+        status -- the HTTP status of the response, None if there was no response
+        bytes_sent -- size of the request body
+        bytes_received -- size of the response body
+        latency -- (s) time taken by the request
+        """
+        endpoint_type = "other"
+        if graphql_api_url is not None and url.startswith(graphql_api_url):
+            endpoint_type = "github_graphql"
+        elif url.startswith(github_api_url):
+            for path, path_endpoint_type in metrics_github_api_endpoint_types:
+                if url.startswith(github_api_url + path):
+                    endpoint_type = path_endpoint_type
+                    break
+        elif url.startswith(github_raw_url):
+            endpoint_type = "github_raw"
+        elif url == library_index_url:
+            endpoint_type = "library_manager_index"
+        if status is None:
+            status = "error"
+        else:
+            status = str(status)
+        bucket_index = len(metrics_latency_buckets)
+        for index, bucket in enumerate(metrics_latency_buckets):
+            if latency <= bucket:
+                bucket_index = index
+                break
+
+        with self.lock:
+            statistics = self.get_stage_statistics(stage_name=self.get_stage_stack()[-1][0])
+            statistics["requests"][endpoint_type] = statistics["requests"].get(endpoint_type, 0) + 1
+            statistics["statuses"][status] = statistics["statuses"].get(status, 0) + 1
+            statistics["bytes_sent"] += bytes_sent
+            statistics["bytes_received"] += bytes_received
+            statistics["latency_buckets"][bucket_index] += 1
+            statistics["latency_seconds"] += latency
+
+    def record_retry(self):
+        """Record a retry of a request."""
+        with self.lock:
+            self.get_stage_statistics(stage_name=self.get_stage_stack()[-1][0])["retries"] += 1
+
+    def record_rate_limit_wait(self, seconds):
+        """Record the time spent waiting for the GitHub API rate limit.
+
+        Keyword arguments:
+        seconds -- (s) time spent waiting
+        """
+        with self.lock:
+            self.get_stage_statistics(stage_name=self.get_stage_stack()[-1][0])["rate_limit_wait_seconds"] += seconds
+
+    def get_report(self):
+        """Return a dictionary of the run's statistics, which can be serialized as JSON."""
+        self.add_stage_time(stage=self.get_stage_stack()[-1])
+        with self.lock:
+            stages = json.loads(json.dumps(self.stages))
+        return {"seconds": time.time() - self.start_time,
+                "source_count": source_count,
+                "non_blacklisted_source_count": non_blacklisted_source_count,
+                "non_blacklisted_unique_source_count": non_blacklisted_unique_source_count,
+                "library_count": len(table_index),
+                "latency_buckets": metrics_latency_buckets,
+                "stages": stages}
+
+    def get_prometheus_text(self):
+        """Return the run's statistics in the Prometheus text exposition format."""
+        report = self.get_report()
+        lines = ["# TYPE inoliblist_run_seconds gauge",
+                 "inoliblist_run_seconds " + str(report["seconds"])]
+        for counter_name in ["source_count", "non_blacklisted_source_count", "non_blacklisted_unique_source_count",
+                             "library_count"]:
+            lines.append("# TYPE inoliblist_" + counter_name + " gauge")
+            lines.append("inoliblist_" + counter_name + " " + str(report[counter_name]))
+
+        stage_metrics = [("stage_seconds_total", "seconds"),
+                         ("request_bytes_total", "bytes_sent"),
+                         ("response_bytes_total", "bytes_received"),
+                         ("retries_total", "retries"),
+                         ("rate_limit_wait_seconds_total", "rate_limit_wait_seconds")]
+        for metric_name, statistic_name in stage_metrics:
+            lines.append("# TYPE inoliblist_" + metric_name + " counter")
+            for stage_name, statistics in sorted(report["stages"].items()):
+                lines.append("inoliblist_" + metric_name + "{stage=" + json.dumps(stage_name) + "} " +
+                             str(statistics[statistic_name]))
+
+        lines.append("# TYPE inoliblist_requests_total counter")
+        for stage_name, statistics in sorted(report["stages"].items()):
+            for endpoint_type, request_count in sorted(statistics["requests"].items()):
+                lines.append("inoliblist_requests_total{stage=" + json.dumps(stage_name) + ",endpoint=" +
+                             json.dumps(endpoint_type) + "} " + str(request_count))
+
+        lines.append("# TYPE inoliblist_responses_total counter")
+        for stage_name, statistics in sorted(report["stages"].items()):
+            for status, response_count in sorted(statistics["statuses"].items()):
+                lines.append("inoliblist_responses_total{stage=" + json.dumps(stage_name) + ",status=" +
+                             json.dumps(status) + "} " + str(response_count))
+
+        lines.append("# TYPE inoliblist_request_duration_seconds histogram")
+        for stage_name, statistics in sorted(report["stages"].items()):
+            cumulative_count = 0
+            for bucket, bucket_count in zip(metrics_latency_buckets + ["+Inf"], statistics["latency_buckets"]):
+                cumulative_count += bucket_count
+                lines.append("inoliblist_request_duration_seconds_bucket{stage=" + json.dumps(stage_name) +
+                             ",le=\"" + str(bucket) + "\"} " + str(cumulative_count))
+            lines.append("inoliblist_request_duration_seconds_sum{stage=" + json.dumps(stage_name) + "} " +
+                         str(statistics["latency_seconds"]))
+            lines.append("inoliblist_request_duration_seconds_count{stage=" + json.dumps(stage_name) + "} " +
+                         str(cumulative_count))
+        return "\n".join(lines) + "\n"
+
+
+def measure_stage(name):
+    """Return a decorator that attributes the statistics of the calls of the function to the metrics stage.
+
+    Keyword arguments:
+    name -- name of the stage
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with metrics.stage(name=name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# compiled versions of the regular expression lists
+repository_name_blacklist_matcher = NameMatcher(regular_expressions=repository_name_blacklist)
+administrative_file_whitelist_matcher = NameMatcher(regular_expressions=administrative_file_whitelist)
+examples_folder_names_matcher = NameMatcher(regular_expressions=examples_folder_names)
+library_subfolder_blacklist_matcher = NameMatcher(regular_expressions=library_subfolder_blacklist)
+# str.endswith() accepts a tuple of suffixes
+header_file_extension_tuple = tuple(header_file_extensions)
+
+# columns copied from the previous list in incremental mode when the repository hasn't been pushed to since then:
+# library path, fork of, and all the Library Manager and PlatformIO metadata columns
+incremental_reused_columns = [Column.library_path, Column.fork_of] + list(range(Column.library_manager_name,
+                                                                                Column.platformio_platforms + 1))
+
+# the columns filled from the fields of the newest release in the Library Manager index when the --lm-index-metadata
+# command line argument is passed (field: column)
+library_index_release_columns = {"name": Column.library_manager_name,
+                                 "version": Column.library_manager_version,
+                                 "author": Column.library_manager_author,
+                                 "maintainer": Column.library_manager_maintainer,
+                                 "sentence": Column.library_manager_sentence,
+                                 "paragraph": Column.library_manager_paragraph,
+                                 "category": Column.library_manager_category,
+                                 "website": Column.library_manager_url,
+                                 "architectures": Column.library_manager_architectures}
+
+# the keys the output file can be sorted by (name: (column, whether the order is descending)). Descending order is only
+# supported for the count and date columns.
+sort_keys = {"url": (Column.repository_url, False),
+             "owner": (Column.repository_owner, False),
+             "name": (Column.repository_name, False),
+             "stars": (Column.star_count, True),
+             "forks": (Column.fork_count, True),
+             "contributors": (Column.contributor_count, True),
+             "last-push": (Column.last_push_date, True)}
+# removes the separators from the last push timestamps (e.g. 2018-06-30T12:00:00Z) to convert them to integers
+timestamp_separators_table = str.maketrans("", "", "-:TZ")
+
+# the secondary indexes of the query engine (filter name: column). The rows are matched by the whole value of the
+# column, regardless of case.
+query_filter_columns = {"owner": Column.repository_owner,
+                        "license": Column.repository_license,
+                        "language": Column.repository_language,
+                        "category": Column.library_manager_category,
+                        "architecture": Column.library_manager_architectures,
+                        "topic": Column.github_topics}
+# these columns contain comma-separated lists, which are indexed by each of their values
+query_list_columns = frozenset([Column.library_manager_architectures, Column.github_topics])
+# the words of these columns are indexed by the full text index of the query engine
+query_text_columns = [Column.repository_description, Column.library_manager_sentence,
+                      Column.library_manager_paragraph, Column.platformio_keywords]
+# the words of the text, as indexed by the full text index
+query_word_regular_expression = re.compile(r"[^\W_]+")
+
 # globals
 table = [[""] * Column.count]
+# index of the rows of the table (normalized repository URL: Row). The insertion order is the order of the table.
+# In low memory mode, the rows are only stored in the spool file so the values are None.
+table_index = {}
+# whether the rows are only stored in the spool file instead of also being kept in the table
+enable_low_memory = False
+# the spool file, open for appending rows from start_repository_processing() to finish_repository_processing()
+spool_file = None
+# the sort_keys items the output file is sorted by, most significant first
+sort_key_columns = [sort_keys[sort_key_name] for sort_key_name in default_sort_key_names]
+# the progress of populate_table(), saved to the checkpoint file. None when checkpoints are disabled.
+checkpoint = None
+# the repositories collected by the interrupted run. None when not resuming.
+resumed_candidates = None
 github_token = None
 enable_verbosity = False
-# setting these to 0 will force a check to determine the actual values on the first request
-last_api_requests_remaining_value = {"search": 0, "core": 0}
+github_api_url = default_github_api_url
+github_raw_url = default_github_raw_url
+library_index_url = default_library_index_url
+rate_limit_scheduler = RateLimitScheduler()
+metrics = Metrics()
+# the run's statistics are also written to this file in the Prometheus text format. None disables it.
+prometheus_file_path = None
 source_count = 0
 non_blacklisted_source_count = 0
 non_blacklisted_unique_source_count = 0
+job_count = default_job_count
+search_job_count = default_search_job_count
+# the worker pool is only used when job_count > 1
+repository_executor = None
+repository_executor_slots = None
+# repositories handed to the worker pool that have not finished processing yet (repository key: future)
+pending_repositories = {}
+# the first exception raised by a worker, re-raised in the main thread
+repository_exception = None
+# protects table, table_index and pending_repositories
+table_lock = threading.RLock()
+# protects the verification failed and non-library folder list files
+output_file_lock = threading.Lock()
+# when this is None, urllib is used for HTTP requests
+async_http_transport = None
+# rows of the previous list used by incremental mode (repository URL: Row)
+previous_rows = {}
+# whether the contributor count and status are refreshed for rows reused from the previous list
+refresh_volatile_columns = True
+# when this is None, the HTTP response cache is disabled
+cache_folder = None
+# subfolder of the cache folder for the data that is not evicted. None when the cache is disabled.
+state_folder = None
+# when this is None, the repository data is fetched via the REST API only
+graphql_api_url = None
+# whether the folder listings used to find the library come from a single Git trees API request
+enable_git_tree = False
+# total size of the cached responses. None until the cache folder has been scanned.
+cache_size = None
+# the fork parents known from the state folder and this run (repository key: parent full name)
+fork_parents = {}
+# protects fork_parents
+fork_parents_lock = threading.Lock()
+# the raw files known to be missing from the repositories
+# (repository key: {"pushed_at": pushed_at, "default_branch": default branch, "paths": list of file paths})
+missing_raw_files = {}
+# protects missing_raw_files
+missing_raw_files_lock = threading.Lock()
+# whether the Library Manager metadata columns of the libraries in the index are filled from the index
+use_library_index_metadata = False
+# the newest release of each library in the Library Manager index that was verified to match the repository's
+# library.properties (repository key: {"version": version, "pushed_at": push time of the repository when verified})
+verified_library_releases = {}
+# protects verified_library_releases
+verified_library_releases_lock = threading.Lock()
+# protects cache_size and the eviction of cache entries
+cache_lock = threading.Lock()
 
 
 def main():
     """The primary function."""
     set_github_token(github_token_input=argument.github_token)
     set_verbosity(enable_verbosity_input=argument.enable_verbosity)
+    if argument.command == "query":
+        query_list(list_path=argument.query_list_path,
+                   filters={filter_name: getattr(argument, "query_" + filter_name)
+                            for filter_name in query_filter_columns
+                            if getattr(argument, "query_" + filter_name) is not None},
+                   search=argument.query_search,
+                   limit=argument.query_limit)
+        return
+    set_job_count(job_count_input=argument.job_count)
+    set_search_job_count(search_job_count_input=argument.search_job_count)
+    set_async_http(enable_async_http_input=argument.enable_async_http)
+    if argument.enable_graphql:
+        set_graphql_api_url(graphql_api_url_input=default_graphql_api_url)
+    set_git_tree(enable_git_tree_input=argument.enable_git_tree)
+    set_low_memory(enable_low_memory_input=argument.enable_low_memory)
+    set_sort_by(sort_key_names_input=argument.sort_key_names)
+    set_library_index_metadata(use_library_index_metadata_input=argument.use_library_index_metadata)
+    if argument.disable_cache:
+        set_cache_folder(cache_folder_input=None)
+    else:
+        set_cache_folder(cache_folder_input=argument.cache_folder)
+    set_prometheus_file(prometheus_file_path_input=argument.prometheus_file_path)
     initialize_table()
-    initialize_output_files()
+    set_incremental_mode(previous_list_path=argument.previous_list_path,
+                         refresh_volatile_columns_input=not argument.reuse_volatile_columns)
+    if argument.resume:
+        load_checkpoint()
+    else:
+        initialize_output_files()
+        initialize_checkpoint()
+    start_repository_processing()
     populate_table()
+    finish_repository_processing()
+    save_fork_parents()
+    save_missing_raw_files()
+    save_verified_library_releases()
+    set_async_http(enable_async_http_input=False)
     create_output_file()
+    write_run_report()
 
 
 def set_verbosity(enable_verbosity_input):
@@ -397,41 +1309,304 @@ def get_github_token():
     return github_token
 
 
+def set_job_count(job_count_input):
+    """Set the number of repositories to process concurrently.
+
+    Keyword arguments:
+    job_count_input -- this will generally be controlled via the script's --jobs command line argument. 1 results in
+                       serial processing.
+    """
+    if job_count_input < 1:
+        raise ValueError("Job count must be at least 1")
+    global job_count
+    job_count = job_count_input
+
+
+def set_search_job_count(search_job_count_input):
+    """Set the number of search segments to fetch concurrently.
+
+    Keyword arguments:
+    search_job_count_input -- this will generally be controlled via the script's --search-jobs command line argument
+    """
+    if search_job_count_input < 1:
+        raise ValueError("Search job count must be at least 1")
+    global search_job_count
+    search_job_count = search_job_count_input
+
+
+def start_repository_processing():
+    """Open the spool file and start the worker pool used by populate_row() to process repositories concurrently. If
+    the job count is 1, the repositories are processed serially by populate_row() and no worker pool is started.
+    """
+    global repository_executor
+    global repository_executor_slots
+    global repository_exception
+    global spool_file
+    repository_exception = None
+    # the spool file uses the default CSV format, which can store any cell value
+    spool_file = open(file=output_folder_name + "/" + spool_filename,
+                      mode="a",
+                      encoding=file_encoding,
+                      newline=file_newline
+                      )
+    if job_count > 1:
+        repository_executor = concurrent.futures.ThreadPoolExecutor(max_workers=job_count)
+        # the executor's own work queue is unbounded so the number of queued repositories is limited here
+        repository_executor_slots = threading.BoundedSemaphore(value=job_count * (1 + repository_queue_size_per_job))
+
+
+def wait_for_repository_processing():
+    """Wait for the worker pool to finish processing the repositories that have been handed to it. Re-raise the first
+    exception that occurred in a worker.
+    """
+    with table_lock:
+        pending_futures = list(pending_repositories.values())
+    concurrent.futures.wait(pending_futures)
+    if repository_exception is not None:
+        raise repository_exception
+
+
+def finish_repository_processing():
+    """Wait for the worker pool to finish processing all repositories, then shut it down and close the spool file.
+    Re-raise the first exception that occurred in a worker.
+    """
+    global repository_executor
+    global spool_file
+    if repository_executor is not None:
+        repository_executor.shutdown(wait=True)
+        repository_executor = None
+    if spool_file is not None:
+        spool_file.close()
+        spool_file = None
+    if repository_exception is not None:
+        raise repository_exception
+    sort_list_files()
+
+
+def sort_list_files():
+    """Sort the lines of the verification failed and non-library folder list files. The workers write the lines in the
+    order the repositories finish processing, so the order would otherwise depend on the job count and timing.
+    This is only done once processing is complete because the checkpoint resumes the files by their size.
+    """
+    with output_file_lock:
+        for list_filename in checkpointed_list_filenames:
+            list_path = output_folder_name + "/" + list_filename
+            try:
+                with open(file=list_path, mode="r", encoding=file_encoding, newline="") as list_file:
+                    lines = list_file.readlines()
+            except FileNotFoundError:
+                # no lines were written
+                continue
+            with open(file=list_path, mode="w", encoding=file_encoding, newline="") as list_file:
+                list_file.writelines(sorted(lines))
+
+
+def set_async_http(enable_async_http_input):
+    """Switch between urllib and the asynchronous HTTP transport for all HTTP requests.
+
+    Keyword arguments:
+    enable_async_http_input -- this will generally be controlled via the script's --async-http command line argument
+                               (True, False)
+    """
+    global async_http_transport
+    if enable_async_http_input:
+        if async_http_transport is None:
+            async_http_transport = AsyncHTTPTransport(maximum_requests=maximum_requests_in_flight)
+    elif async_http_transport is not None:
+        async_http_transport.close()
+        async_http_transport = None
+
+
+def set_base_urls(github_api_url_input=default_github_api_url,
+                  github_raw_url_input=default_github_raw_url,
+                  library_index_url_input=default_library_index_url):
+    """Set the base URLs of the services the list is generated from. Used by the benchmarks to substitute a local
+    stand-in server.
+
+    Keyword arguments:
+    github_api_url_input -- base URL of the GitHub API (default value: default_github_api_url)
+    github_raw_url_input -- base URL of the raw content of GitHub repositories (default value: default_github_raw_url)
+    library_index_url_input -- URL of the Library Manager index (default value: default_library_index_url)
+    """
+    global github_api_url
+    global github_raw_url
+    global library_index_url
+    github_api_url = github_api_url_input
+    github_raw_url = github_raw_url_input
+    library_index_url = library_index_url_input
+
+
+def set_graphql_api_url(graphql_api_url_input):
+    """Set the URL of the GraphQL API used to fetch the repository data in batches.
+
+    Keyword arguments:
+    graphql_api_url_input -- None disables the use of the GraphQL API. This will generally be controlled via the
+                             script's --graphql command line argument.
+    """
+    global graphql_api_url
+    if graphql_api_url_input is not None and graphql_api_url_input.startswith(default_github_api_url):
+        if github_token is None:
+            raise ValueError("The GitHub GraphQL API requires a GitHub personal API access token (--ghtoken)")
+    graphql_api_url = graphql_api_url_input
+
+
+def set_git_tree(enable_git_tree_input):
+    """Switch between the Git trees API and the contents API for getting the folder listings used to find the library.
+
+    Keyword arguments:
+    enable_git_tree_input -- this will generally be controlled via the script's --git-tree command line argument
+                             (True, False)
+    """
+    global enable_git_tree
+    enable_git_tree = enable_git_tree_input
+
+
+def set_low_memory(enable_low_memory_input):
+    """Configure whether the rows are kept in the table in addition to the spool file.
+
+    Keyword arguments:
+    enable_low_memory_input -- this will generally be controlled via the script's --low-memory command line argument
+                               (True, False)
+    """
+    global enable_low_memory
+    enable_low_memory = enable_low_memory_input
+
+
+def set_sort_by(sort_key_names_input):
+    """Set the order of the rows of the output file.
+
+    Keyword arguments:
+    sort_key_names_input -- list of the names of the keys to sort by, most significant first (allowed values: the keys
+                            of sort_keys). This will generally be controlled via the script's --sort-by command line
+                            argument.
+    """
+    if not sort_key_names_input:
+        raise ValueError("At least one sort key is required")
+    for sort_key_name in sort_key_names_input:
+        if sort_key_name not in sort_keys:
+            raise ValueError("Unknown sort key: " + sort_key_name)
+    global sort_key_columns
+    sort_key_columns = [sort_keys[sort_key_name] for sort_key_name in sort_key_names_input]
+
+
+def set_library_index_metadata(use_library_index_metadata_input):
+    """Configure whether the Library Manager metadata columns of the libraries in the Library Manager index are filled
+    from the index instead of from the library.properties file of the repository.
+
+    Keyword arguments:
+    use_library_index_metadata_input -- this will generally be controlled via the script's --lm-index-metadata command
+                                        line argument (True, False)
+    """
+    global use_library_index_metadata
+    use_library_index_metadata = use_library_index_metadata_input
+
+
+def set_prometheus_file(prometheus_file_path_input):
+    """Set the path of the file the run's statistics are written to in the Prometheus text format.
+
+    Keyword arguments:
+    prometheus_file_path_input -- path of the file. None disables it. This will generally be controlled via the script's
+                                  --prometheus command line argument.
+    """
+    global prometheus_file_path
+    prometheus_file_path = prometheus_file_path_input
+
+
+def write_run_report():
+    """Write the run's statistics to the run report file in the output folder and, if enabled, the Prometheus file."""
+    with open(file=output_folder_name + "/" + run_report_filename, mode="w", encoding=file_encoding) as report_file:
+        json.dump(metrics.get_report(), report_file, indent=2)
+    if prometheus_file_path is not None:
+        # the file is replaced atomically because it may be read by the Prometheus node exporter at any time
+        with open(file=prometheus_file_path + ".tmp", mode="w", encoding=file_encoding) as prometheus_file:
+            prometheus_file.write(metrics.get_prometheus_text())
+        os.replace(prometheus_file_path + ".tmp", prometheus_file_path)
+
+
+def set_cache_folder(cache_folder_input):
+    """Set the folder used for the HTTP response cache.
+
+    Keyword arguments:
+    cache_folder_input -- path of the cache folder. None disables the cache. This will generally be controlled via the
+                          script's --cache-dir and --no-cache command line arguments.
+    """
+    global cache_folder
+    global state_folder
+    global cache_size
+    cache_folder = cache_folder_input
+    cache_size = None
+    if cache_folder is None:
+        state_folder = None
+    else:
+        state_folder = cache_folder + "/" + state_folder_name
+        if not os.path.exists(state_folder):
+            os.makedirs(state_folder)
+    load_fork_parents()
+    load_missing_raw_files()
+    load_verified_library_releases()
+
+
 def populate_table():
     """Create a list of Arduino library repositories and their useful metadata. This list is stored in the global list
      variable 'table'.
      """
-    logger.info("Processing the Library Manager index.")
-    json_data = dict(get_json_from_url(url="http://downloads.arduino.cc/libraries/library_index.json")["json_data"])
-    process_library_manager_index(json_data=json_data)
+    candidates = collect_candidates()
+    process_candidates(candidates=candidates)
+
+
+def collect_candidates():
+    """Collect the repositories from all sources and return them as a dictionary of candidates (see add_candidate()).
+    A repository found by multiple sources is only processed once, so no API requests are done for duplicates.
+    When resuming, the sources that were already collected are skipped and the search that was interrupted continues
+    from the segment after the last checkpoint.
+    """
+    if resumed_candidates is None:
+        candidates = {}
+    else:
+        logger.info("Resuming from the " + str(len(resumed_candidates)) + " collected repositories.")
+        candidates = resumed_candidates
+
+    if collection_source_is_pending(source_number=0):
+        logger.info("Processing the Library Manager index.")
+        with metrics.stage(name="library_manager_index"):
+            library_index_path = download_library_index()
+            collect_library_manager_candidates(
+                library_releases=generate_library_index_releases(library_index_path=library_index_path),
+                candidates=candidates
+            )
+        save_candidates(candidates=candidates, repository_keys=list(candidates), collected_source_count=1)
 
     logger.info("Processing GitHub's arduino-library topic.")
     # GitHub API search gives a max of 1000 results per search query so to avoid losing results I split the searches by
     #  repo creation date
-    search_repositories(search_query="topic:arduino-library",
-                        created_argument_list=["<=2018-05-29",
-                                               ">=2018-05-30"],
-                        fork_argument="true",
-                        verify=False,
-                        log_verification_failures=False)
+    collect_search_candidates(search_query="topic:arduino-library",
+                              created_argument_list=["<=2018-05-29",
+                                                     ">=2018-05-30"],
+                              fork_argument="true",
+                              verify=False,
+                              log_verification_failures=False,
+                              candidates=candidates,
+                              source_number=1)
 
     logger.info("Processing GitHub's arduino topic.")
-    search_repositories(search_query="topic:arduino",
-                        created_argument_list=["<=2016-03-23",
-                                               "2016-03-24..2017-01-07",
-                                               "2017-01-08..2017-03-22",
-                                               "2017-03-23..2017-06-15",
-                                               "2017-06-16..2017-09-18",
-                                               "2017-09-19..2017-12-19",
-                                               "2017-12-20..2018-03-07",
-                                               "2018-03-08..2018-06-05",
-                                               ">=2018-06-06"],
-                        fork_argument="true",
-                        verify=True,
-                        log_verification_failures=False)
+    collect_search_candidates(search_query="topic:arduino",
+                              created_argument_list=["<=2016-03-23",
+                                                     "2016-03-24..2017-01-07",
+                                                     "2017-01-08..2017-03-22",
+                                                     "2017-03-23..2017-06-15",
+                                                     "2017-06-16..2017-09-18",
+                                                     "2017-09-19..2017-12-19",
+                                                     "2017-12-20..2018-03-07",
+                                                     "2018-03-08..2018-06-05",
+                                                     ">=2018-06-06"],
+                              fork_argument="true",
+                              verify=True,
+                              log_verification_failures=False,
+                              candidates=candidates,
+                              source_number=2)
 
     logger.info("Processing GitHub search for arduino library.")
-    search_repositories(
+    collect_search_candidates(
         search_query="arduino+library+NOT+mongoose+NOT+particle+topics:0+language:cpp+language:c+language:arduino",
         created_argument_list=["<=2012-12-25",
                                "2012-12-26..2013-12-27",
@@ -447,55 +1622,248 @@ def populate_table():
                                ">=2018-06-13"],
         fork_argument="false",
         verify=True,
-        log_verification_failures=True)
+        log_verification_failures=True,
+        candidates=candidates,
+        source_number=3)
+    logger.info("Collected " + str(len(candidates)) + " unique repositories.")
+    return candidates
+
+
+def collection_source_is_pending(source_number):
+    """Return whether the candidates of the source still need to be collected (True, False). This is False for the
+    sources that were collected before the interrupted run's last checkpoint.
+
+    Keyword arguments:
+    source_number -- the position of the source in the order of collect_candidates(), starting from 0
+    """
+    return checkpoint is None or checkpoint["collected_source_count"] <= source_number
+
+
+def get_compact_repository_object(repository_object):
+    """Return a copy of a repository object from the search results that only contains the items used to populate its
+    row (search_result_used_keys).
+
+    Keyword arguments:
+    repository_object -- the repository's JSON from the search API
+    """
+    compact_repository_object = {key: repository_object[key] for key in search_result_used_keys
+                                 if key in repository_object}
+    if "owner" in compact_repository_object:
+        compact_repository_object["owner"] = {"login": repository_object["owner"]["login"]}
+    if compact_repository_object.get("license") is not None:
+        compact_repository_object["license"] = {"spdx_id": repository_object["license"]["spdx_id"]}
+    return compact_repository_object
+
+
+def add_candidate(candidates, repository_url, full_name, repository_object, source, in_library_manager, verify,
+                  log_verification_failures, library_manager_data=None):
+    """Add a repository found by a source to the candidates. If it was already found by another source, the
+    information is merged.
+
+    Keyword arguments:
+    candidates -- dictionary of the candidates (repository key: candidate dictionary)
+    repository_url -- the repository's URL
+    full_name -- the repository's full name (e.g. "arduino/Arduino")
+    repository_object -- object containing the GitHub API data for the repository. None if the source doesn't provide
+                         it, in which case it will be fetched when the repository is processed.
+    source -- string that identifies the source
+    in_library_manager -- whether the source is the Library Manager index (True, False)
+    verify -- whether the source requires verification that the repository contains an Arduino library (True, False)
+    log_verification_failures -- whether the source's repositories that fail verification should be logged
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases(). None if the source is not the Library Manager index.
+                            (default value: None)
+    """
+    repository_key = get_repository_key(repository_url=repository_url)
+    candidate = candidates.get(repository_key)
+    if candidate is None:
+        candidates[repository_key] = {"full_name": full_name,
+                                      "repository_object": repository_object,
+                                      "sources": [source],
+                                      "in_library_manager": in_library_manager,
+                                      "verify": verify,
+                                      "log_verification_failures": log_verification_failures,
+                                      "library_manager_data": library_manager_data}
+        return
+
+    if source not in candidate["sources"]:
+        candidate["sources"].append(source)
+    candidate["in_library_manager"] = candidate["in_library_manager"] or in_library_manager
+    # verification is not required if any of the sources don't require it
+    candidate["verify"] = candidate["verify"] and verify
+    candidate["log_verification_failures"] = candidate["log_verification_failures"] or log_verification_failures
+    if candidate["repository_object"] is None and repository_object is not None:
+        # this saves the request for the repository data
+        candidate["repository_object"] = repository_object
+    if candidate["library_manager_data"] is None:
+        candidate["library_manager_data"] = library_manager_data
+
+
+def process_candidates(candidates):
+    """Populate the rows of the collected repositories, in the order they were collected. The data of repositories
+    from sources that don't provide it is fetched first.
+
+    Keyword arguments:
+    candidates -- dictionary of the candidates (see add_candidate())
+    """
+    candidate_list = list(candidates.values())
+    if checkpoint is None:
+        first_candidate_index = 0
+    else:
+        first_candidate_index = checkpoint["processed_candidate_count"]
+    for batch_start in range(first_candidate_index, len(candidate_list), checkpoint_interval):
+        batch_candidates = candidate_list[batch_start:batch_start + checkpoint_interval]
+        # the objects are fetched lazily unless the GraphQL API is used
+        fetched_repository_objects = get_repository_objects(
+            full_names=[candidate["full_name"] for candidate in batch_candidates
+                        if candidate["repository_object"] is None]
+        )
+        if graphql_api_url is not None:
+            add_graphql_data(repository_objects=[candidate["repository_object"] for candidate in batch_candidates
+                                                 if candidate["repository_object"] is not None])
+        for candidate in batch_candidates:
+            repository_object = candidate["repository_object"]
+            if repository_object is None:
+                repository_object = next(fetched_repository_objects)
+            else:
+                # the object comes from the search results
+                repository_object = LazyRepositoryObject(repository_object)
+            populate_row(repository_object=repository_object,
+                         in_library_manager=candidate["in_library_manager"],
+                         verify=candidate["verify"],
+                         log_verification_failures=candidate["log_verification_failures"],
+                         source_count_increment=len(candidate["sources"]),
+                         library_manager_data=candidate["library_manager_data"])
+
+        if checkpoint is not None:
+            checkpoint["processed_candidate_count"] = batch_start + len(batch_candidates)
+            save_checkpoint()
 
 
 def initialize_table():
     """Fill in the first row of the table with the heading text."""
     # clear the table (necessary to avoid conflict between unit tests)
     global table
-    table = [[""] * Column.count]
-
-    # fill the column headings row
-    table[0][Column.repository_url] = "Repository URL \x1b \x1b"
-    table[0][Column.repository_owner] = "Owner \x1b \x1b"
-    table[0][Column.repository_name] = "Repo Name \x1b \x1b"
-    table[0][Column.repository_default_branch] = "Default Branch \x1b \x1b"
-    table[0][Column.library_path] = "Library Path \x1b \x1b"
-    table[0][Column.archived] = "Archived \x1b \x1b"
-    table[0][Column.is_fork] = "Fork \x1b \x1b"
-    table[0][Column.fork_of] = "Fork Of \x1b \x1b"
-    table[0][Column.last_push_date] = "Last Push \x1b \x1b"
-    table[0][Column.fork_count] = "#Forks \x1b \x1b"
-    table[0][Column.star_count] = "#Stars \x1b \x1b"
-    table[0][Column.contributor_count] = "#Contributors \x1b \x1b"
-    table[0][Column.tip_status] = "Status \x1b \x1b"
-    table[0][Column.repository_license] = "License \x1b \x1b"
-    table[0][Column.repository_language] = "Language \x1b \x1b"
-    table[0][Column.repository_description] = "Repo Description \x1b \x1b"
-    table[0][Column.github_topics] = "GitHub Topics \x1b \x1b"
-    table[0][Column.in_library_manager_index] = "In Library Manager \x1b \x1b"
-    # table[0][Column.in_platformio_library_registry] = "In PlatformIO \x1b \x1b"
-    table[0][Column.library_manager_name] = "LM name \x1b \x1b"
-    table[0][Column.library_manager_version] = "LM version \x1b \x1b"
-    table[0][Column.library_manager_author] = "LM author \x1b \x1b"
-    table[0][Column.library_manager_maintainer] = "LM maintainer \x1b \x1b"
-    table[0][Column.library_manager_sentence] = "LM sentence \x1b \x1b"
-    table[0][Column.library_manager_paragraph] = "LM paragraph \x1b \x1b"
-    table[0][Column.library_manager_category] = "LM category \x1b \x1b"
-    table[0][Column.library_manager_url] = "LM url \x1b \x1b"
-    table[0][Column.library_manager_architectures] = "LM architectures \x1b \x1b"
-    table[0][Column.platformio_name] = "PIO name \x1b \x1b"
-    table[0][Column.platformio_description] = "PIO description \x1b \x1b"
-    table[0][Column.platformio_keywords] = "PIO keywords \x1b \x1b"
-    table[0][Column.platformio_authors] = "PIO authors \x1b \x1b"
-    table[0][Column.platformio_repository] = "PIO repository \x1b \x1b"
-    table[0][Column.platformio_version] = "PIO version \x1b \x1b"
-    table[0][Column.platformio_license] = "PIO license \x1b \x1b"
-    table[0][Column.platformio_download_url] = "PIO downloadUrl \x1b \x1b"
-    table[0][Column.platformio_homepage] = "PIO homepage \x1b \x1b"
-    table[0][Column.platformio_frameworks] = "PIO frameworks \x1b \x1b"
-    table[0][Column.platformio_platforms] = "PIO platforms \x1b \x1b"
+    global table_index
+    table = [get_heading_row()]
+    table_index = {}
+
+
+def get_heading_row():
+    """Return the column headings row of the table."""
+    heading_row = [""] * Column.count
+    heading_row[Column.repository_url] = "Repository URL \x1b \x1b"
+    heading_row[Column.repository_owner] = "Owner \x1b \x1b"
+    heading_row[Column.repository_name] = "Repo Name \x1b \x1b"
+    heading_row[Column.repository_default_branch] = "Default Branch \x1b \x1b"
+    heading_row[Column.library_path] = "Library Path \x1b \x1b"
+    heading_row[Column.archived] = "Archived \x1b \x1b"
+    heading_row[Column.is_fork] = "Fork \x1b \x1b"
+    heading_row[Column.fork_of] = "Fork Of \x1b \x1b"
+    heading_row[Column.last_push_date] = "Last Push \x1b \x1b"
+    heading_row[Column.fork_count] = "#Forks \x1b \x1b"
+    heading_row[Column.star_count] = "#Stars \x1b \x1b"
+    heading_row[Column.contributor_count] = "#Contributors \x1b \x1b"
+    heading_row[Column.tip_status] = "Status \x1b \x1b"
+    heading_row[Column.repository_license] = "License \x1b \x1b"
+    heading_row[Column.repository_language] = "Language \x1b \x1b"
+    heading_row[Column.repository_description] = "Repo Description \x1b \x1b"
+    heading_row[Column.github_topics] = "GitHub Topics \x1b \x1b"
+    heading_row[Column.in_library_manager_index] = "In Library Manager \x1b \x1b"
+    # heading_row[Column.in_platformio_library_registry] = "In PlatformIO \x1b \x1b"
+    heading_row[Column.library_manager_name] = "LM name \x1b \x1b"
+    heading_row[Column.library_manager_version] = "LM version \x1b \x1b"
+    heading_row[Column.library_manager_author] = "LM author \x1b \x1b"
+    heading_row[Column.library_manager_maintainer] = "LM maintainer \x1b \x1b"
+    heading_row[Column.library_manager_sentence] = "LM sentence \x1b \x1b"
+    heading_row[Column.library_manager_paragraph] = "LM paragraph \x1b \x1b"
+    heading_row[Column.library_manager_category] = "LM category \x1b \x1b"
+    heading_row[Column.library_manager_url] = "LM url \x1b \x1b"
+    heading_row[Column.library_manager_architectures] = "LM architectures \x1b \x1b"
+    heading_row[Column.platformio_name] = "PIO name \x1b \x1b"
+    heading_row[Column.platformio_description] = "PIO description \x1b \x1b"
+    heading_row[Column.platformio_keywords] = "PIO keywords \x1b \x1b"
+    heading_row[Column.platformio_authors] = "PIO authors \x1b \x1b"
+    heading_row[Column.platformio_repository] = "PIO repository \x1b \x1b"
+    heading_row[Column.platformio_version] = "PIO version \x1b \x1b"
+    heading_row[Column.platformio_license] = "PIO license \x1b \x1b"
+    heading_row[Column.platformio_download_url] = "PIO downloadUrl \x1b \x1b"
+    heading_row[Column.platformio_homepage] = "PIO homepage \x1b \x1b"
+    heading_row[Column.platformio_frameworks] = "PIO frameworks \x1b \x1b"
+    heading_row[Column.platformio_platforms] = "PIO platforms \x1b \x1b"
+    heading_row[Column.library_manager_release_count] = "LM releases \x1b \x1b"
+
+    return heading_row
+
+
+def set_incremental_mode(previous_list_path, refresh_volatile_columns_input=True):
+    """Load the rows of a previously generated list. Data from these rows will be reused for repositories that haven't
+    been pushed to since then, which avoids most of the requests required to populate the row.
+
+    Keyword arguments:
+    previous_list_path -- path of the previous list file. None disables incremental mode.
+    refresh_volatile_columns_input -- whether to refresh the contributor count and status of reused rows
+                                      (default value: True)
+    """
+    global previous_rows
+    global refresh_volatile_columns
+    previous_rows = {}
+    refresh_volatile_columns = refresh_volatile_columns_input
+    if previous_list_path is None:
+        return
+
+    for previous_row in read_list_file(list_path=previous_list_path):
+        previous_rows[previous_row[Column.repository_url]] = previous_row
+
+    logger.info("Loaded " + str(len(previous_rows)) + " rows from the previous list")
+
+
+def read_list_file(list_path):
+    """Generate the rows of a previously generated list file as Row objects.
+    The columns are identified by their headings so that the list can still be used if columns were added or moved
+    since it was generated.
+
+    Keyword arguments:
+    list_path -- path of the list file
+    """
+    column_by_heading = {}
+    for column, heading in enumerate(get_heading_row()):
+        column_by_heading[heading] = column
+
+    with open(list_path, mode="r", encoding=file_encoding, newline=file_newline) as list_file:
+        csv_reader = csv.reader(list_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
+        list_columns = None
+        for list_row in csv_reader:
+            if list_columns is None:
+                # the first row is the headings
+                list_columns = [column_by_heading.get(heading) for heading in list_row]
+                if Column.repository_url not in list_columns or Column.last_push_date not in list_columns:
+                    raise ValueError("Unable to parse the headings of the list: " + list_path)
+                continue
+            row_list = [""] * Column.count
+            for list_column, cell in zip(list_columns, list_row):
+                if list_column is not None:
+                    row_list[list_column] = cell
+            yield Row(row_list=row_list)
+
+
+def get_reusable_previous_row(repository_object, verify):
+    """Return the row of the previous list for the repository if its data can be reused, otherwise None.
+
+    Keyword arguments:
+    repository_object -- object containing the GitHub API data for a repository
+    verify -- whether the repository must be verified to contain an Arduino library (True, False)
+    """
+    previous_row = previous_rows.get(repository_object["html_url"])
+    if previous_row is None:
+        return None
+    if previous_row[Column.last_push_date] != str(repository_object["pushed_at"]):
+        # the repository has changed
+        return None
+    if verify and previous_row[Column.library_path] == "":
+        # the repository was previously added without verification and no library was found
+        return None
+    return previous_row
 
 
 def get_table():
@@ -504,7 +1872,7 @@ def get_table():
 
 
 def initialize_output_files():
-    """Create output folder and remove previous verification failed and non-library folder output files."""
+    """Create output folder and remove previous verification failed, non-library folder, and spool output files."""
     if not os.path.exists(output_folder_name):
         os.makedirs(output_folder_name)
     # delete previous copy of the output files
@@ -517,6 +1885,148 @@ def initialize_output_files():
         os.remove(output_folder_name + "/" + non_library_folders_list_filename)
     except FileNotFoundError:
         pass
+    try:
+        os.remove(output_folder_name + "/" + spool_filename)
+    except FileNotFoundError:
+        pass
+    try:
+        os.remove(output_folder_name + "/" + checkpoint_filename)
+    except FileNotFoundError:
+        pass
+    try:
+        os.remove(output_folder_name + "/" + candidates_filename)
+    except FileNotFoundError:
+        pass
+
+
+def initialize_checkpoint():
+    """Start saving checkpoints of the progress of populate_table() to the checkpoint file."""
+    global checkpoint
+    global resumed_candidates
+    # collected_source_count -- the number of sources of collect_candidates() whose candidates have all been collected
+    # search_progress -- the progress of the search being collected (see collect_search_candidates()). None if no
+    #                    search is in progress.
+    # candidates_file_size -- the size of the candidates file
+    # processed_candidate_count -- the number of collected repositories that have been processed
+    checkpoint = {"collected_source_count": 0,
+                  "search_progress": None,
+                  "candidates_file_size": 0,
+                  "processed_candidate_count": 0}
+    resumed_candidates = None
+
+
+def disable_checkpoint():
+    """Stop saving checkpoints. Used to clean up after the unit tests."""
+    global checkpoint
+    global resumed_candidates
+    checkpoint = None
+    resumed_candidates = None
+
+
+def load_checkpoint():
+    """Restore the state of an interrupted run from the checkpoint, candidates, and spool files so that
+    populate_table() continues from where it was when the last checkpoint was saved.
+    """
+    global checkpoint
+    global resumed_candidates
+    global source_count
+    global non_blacklisted_source_count
+    global non_blacklisted_unique_source_count
+    try:
+        with open(file=output_folder_name + "/" + checkpoint_filename,
+                  mode="r",
+                  encoding=file_encoding
+                  ) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except FileNotFoundError:
+        # the run was interrupted before the first source had been collected
+        print("No checkpoint found. Starting from the beginning.")
+        initialize_output_files()
+        initialize_checkpoint()
+        return
+
+    # candidates added to the candidates file after the last checkpoint will be collected again so they are discarded
+    candidates_path = output_folder_name + "/" + candidates_filename
+    os.truncate(candidates_path, checkpoint["candidates_file_size"])
+    resumed_candidates = {}
+    with open(file=candidates_path, mode="r", encoding=file_encoding) as candidates_file:
+        for candidates_line in candidates_file:
+            repository_key, candidate = json.loads(candidates_line)
+            # an updated candidate keeps the position of its first line
+            resumed_candidates[repository_key] = candidate
+    source_count = checkpoint["source_count"]
+    non_blacklisted_source_count = checkpoint["non_blacklisted_source_count"]
+    non_blacklisted_unique_source_count = checkpoint["non_blacklisted_unique_source_count"]
+
+    # rows added to the spool file after the last checkpoint will be produced again so they are discarded
+    spool_path = output_folder_name + "/" + spool_filename
+    try:
+        with open(file=spool_path, mode="r", encoding=file_encoding, newline=file_newline) as spool_file:
+            rows = list(itertools.islice(csv.reader(spool_file), checkpoint["spool_row_count"]))
+    except FileNotFoundError:
+        # no rows had been produced
+        rows = []
+    with open(file=spool_path + ".tmp", mode="w", encoding=file_encoding, newline=file_newline) as spool_file:
+        csv.writer(spool_file).writerows(rows)
+    os.replace(spool_path + ".tmp", spool_path)
+    for row_list in rows:
+        index_row(row_list=row_list)
+    # lines added to the list files after the last checkpoint will be written again so they are discarded
+    for list_filename, list_file_size in checkpoint["list_file_sizes"].items():
+        try:
+            os.truncate(output_folder_name + "/" + list_filename, list_file_size)
+        except FileNotFoundError:
+            # no lines had been written
+            pass
+    logger.info("Resuming from checkpoint with " + str(len(rows)) + " rows")
+
+
+def save_candidates(candidates, repository_keys, collected_source_count, search_progress=None):
+    """Append the collected repositories that were added or updated since the last checkpoint to the candidates file
+    and save a checkpoint so that an interrupted run can resume the collection from there.
+
+    Keyword arguments:
+    candidates -- dictionary of the candidates (see add_candidate())
+    repository_keys -- keys of the candidates that were added or updated since the last checkpoint
+    collected_source_count -- the number of sources whose candidates have all been collected
+    search_progress -- the progress of the search being collected (see collect_search_candidates()). None if no search
+                       is in progress. (default value: None)
+    """
+    if checkpoint is None:
+        return
+    candidates_path = output_folder_name + "/" + candidates_filename
+    with open(file=candidates_path, mode="a", encoding=file_encoding) as candidates_file:
+        for repository_key in repository_keys:
+            candidates_file.write(json.dumps([repository_key, candidates[repository_key]]) + "\n")
+    checkpoint["candidates_file_size"] = os.path.getsize(candidates_path)
+    checkpoint["collected_source_count"] = collected_source_count
+    checkpoint["search_progress"] = search_progress
+    save_checkpoint()
+
+
+def save_checkpoint():
+    """Wait for the repositories being processed by the worker pool, then write the checkpoint file.
+    The file is replaced atomically so an interruption while saving doesn't corrupt the previous checkpoint.
+    """
+    wait_for_repository_processing()
+    with table_lock:
+        checkpoint["spool_row_count"] = len(table_index)
+    with output_file_lock:
+        # size of each list file at the checkpoint
+        checkpoint["list_file_sizes"] = {}
+        for list_filename in checkpointed_list_filenames:
+            try:
+                checkpoint["list_file_sizes"][list_filename] = os.path.getsize(output_folder_name + "/" +
+                                                                               list_filename)
+            except FileNotFoundError:
+                checkpoint["list_file_sizes"][list_filename] = 0
+    checkpoint["source_count"] = source_count
+    checkpoint["non_blacklisted_source_count"] = non_blacklisted_source_count
+    checkpoint["non_blacklisted_unique_source_count"] = non_blacklisted_unique_source_count
+    checkpoint_path = output_folder_name + "/" + checkpoint_filename
+    with open(file=checkpoint_path + ".tmp", mode="w", encoding=file_encoding) as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(checkpoint_path + ".tmp", checkpoint_path)
 
 
 def get_github_api_response(request, request_parameters="", page_number=1):
@@ -538,61 +2048,32 @@ def get_github_api_response(request, request_parameters="", page_number=1):
         api_type = "core"
     check_rate_limiting(api_type=api_type)
 
-    return get_json_from_url(url="https://api.github.com/" +
-                                 request + "?" +
-                                 request_parameters +
-                                 "&page=" + str(page_number) +
-                                 "&per_page=" + str(results_per_page)
+    return get_json_from_url(url=github_api_url + "/" +
+                             request + "?" +
+                             request_parameters +
+                             "&page=" + str(page_number) +
+                             "&per_page=" + str(results_per_page)
                              )
 
 
-def check_rate_limiting(api_type):
-    """Check whether the GitHub API request limit has been reached.
-    If so, delay until the request allotment is reset before returning.
+def check_rate_limiting(api_type, charge=True):
+    """Wait until the GitHub API request can be made without exceeding the rate limit.
+    If the request allotment is used up, delay until it is reset before returning.
 
     Keyword arguments:
-    api_type -- GitHub has two API types, each with their own limits and allotments.
+    api_type -- GitHub has separate API types, each with their own limits and allotments.
                 "search" applies only to api.github.com/search.
+                "graphql" applies only to api.github.com/graphql.
                 "core" applies to all other parts of the API.
+    charge -- whether a request of the API type will be made. If False, only wait until the allotment is not used up.
+              (default value: True)
     """
-    global last_api_requests_remaining_value
-    if last_api_requests_remaining_value[api_type] == 0:
-        # the stored requests remaining value might be outdated (because the limit reset since the last API request) so
-        #  I need to actually do an request to the Rate Limit API to get the real number
-        # the rate_limit API does not use up the API request allotment so I can use get_json_from_url()
-        json_data = dict(get_json_from_url(url="https://api.github.com/rate_limit")["json_data"])
+    start_time = time.time()
+    rate_limit_scheduler.acquire(api_type=api_type, charge=charge)
+    metrics.record_rate_limit_wait(seconds=time.time() - start_time)
 
-        last_api_requests_remaining_value["core"] = json_data["resources"]["core"]["remaining"]
-        last_api_requests_remaining_value["search"] = json_data["resources"]["search"]["remaining"]
-        rate_limiting_reset_time = json_data["resources"][api_type]["reset"] + rate_limit_reset_wait_additional_delay
 
-        logger.info(api_type + " API request allotment: " + str(json_data["resources"][api_type]["limit"]))
-        logger.info("Remaining " + api_type + " API requests: " + str(last_api_requests_remaining_value[api_type]))
-        logger.info(api_type + " API rate limiting reset time: " + str(rate_limiting_reset_time))
-
-        if last_api_requests_remaining_value[api_type] == 0:
-            # API request allowance is used up
-            if github_token is None:
-                print("Pass the script a GitHub personal API access token via the --ghtoken command line argument " +
-                      "for a more generous allowance")
-                print("https://blog.github.com/2013-05-16-personal-api-tokens/")
-            notification_timestamp = 0
-            while time.time() < rate_limiting_reset_time:
-                # print a periodic message while waiting for the API timeout to indicate the script is still alive
-                if (time.time() - notification_timestamp) > rate_limit_reset_wait_notification_interval:
-                    print(
-                        "GitHub " + api_type + " API request limit reached. Time before limit reset: " +
-                        str(int((rate_limiting_reset_time - time.time()) / 60)) + " minutes"
-                    )
-                    notification_timestamp = time.time()
-            # leave the last_api_requests_remaining_value[api_type] set to 0
-            # this will cause the actual value to be pulled from the API on the next check_rate_limiting() call
-            check_rate_limiting(api_type=api_type)
-        else:
-            logger.warning("Mismatch between stored requests remaining value (0) and actual value")
-
-
-def get_json_from_url(url):
+def get_json_from_url(url, data=None):
     """Load the specified URL and return a dictionary:
     json_data -- JSON object containing the response
     additional_pages -- indicates whether more pages of results remain (True, False)
@@ -600,15 +2081,15 @@ def get_json_from_url(url):
 
     Keyword arguments:
     url -- the URL to load
+    data -- JSON object to send as the body of a POST request. If None, a GET request is done. (default value: None)
     """
     url = normalize_url(url=url)
 
     logger.info("Opening URL: " + url)
 
-    retry_count = 0
-    while retry_count <= maximum_urlopen_retries:
-        retry_count += 1
-        if url.startswith("https://api.github.com"):
+    retry_policy = RetryPolicy()
+    while True:
+        if url.startswith(github_api_url):
             # the topics data is currently in preview mode so a custom media type must be provided in the Accept header
             # to get it (https://developer.github.com/v3/repos/#list-all-topics-for-a-repository)
             headers = {"Accept": "application/vnd.github.mercy-preview+json"}
@@ -617,11 +2098,17 @@ def get_json_from_url(url):
                 # passed via the header
                 headers["Authorization"] = "token " + str(github_token)
 
-            request = urllib.request.Request(url=url, headers=headers)
         else:
-            request = urllib.request.Request(url=url)
+            headers = {}
+        if data is None:
+            method = "GET"
+            request_body = None
+        else:
+            method = "POST"
+            request_body = json.dumps(data).encode(file_encoding)
+            headers["Content-Type"] = "application/json"
         try:
-            with urllib.request.urlopen(request) as url_data:
+            with open_url(url=url, headers=headers, method=method, data=request_body) as url_data:
                 try:
                     json_data = json.loads(url_data.read().decode(file_encoding, "ignore"))
                 except json.decoder.JSONDecodeError as exception:
@@ -657,196 +2144,1405 @@ def get_json_from_url(url):
                                 break
 
                 # get the number of GitHub API requests from the response header
-                if url.startswith("https://api.github.com") and url_data.info()["X-RateLimit-Remaining"] is not None:
-                    global last_api_requests_remaining_value
-                    if url.startswith("https://api.github.com/search"):
-                        last_api_requests_remaining_value["search"] = int(url_data.info()["X-RateLimit-Remaining"])
-                    else:
-                        last_api_requests_remaining_value["core"] = int(url_data.info()["X-RateLimit-Remaining"])
+                if url.startswith(github_api_url):
+                    rate_limit_scheduler.update_from_headers(url=url, headers=url_data.info())
 
                 return {"json_data": json_data, "additional_pages": additional_pages, "page_count": page_count}
         except Exception as exception:
-            if not determine_urlopen_retry(exception=exception):
+            if not determine_urlopen_retry(exception=exception, retry_policy=retry_policy):
+                if retry_policy.exhausted_error_class is not None:
+                    # maximum retries reached without successfully opening URL
+                    raise TimeoutError("Maximum number of URL load retries exceeded")
+                raise exception
+
+
+class URLResponse:
+    """The response to an HTTP request, as returned by open_url(). Provides the parts of the interface of the object
+    returned by urllib.request.urlopen() used by this script.
+    """
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        return False
+
+    def info(self):
+        return self.headers
+
+    def read(self):
+        return self.body
+
+
+def open_url(url, headers=None, method="GET", data=None):
+    """Do an HTTP request and return a URLResponse object. An HTTP error status raises urllib.error.HTTPError,
+    regardless of which HTTP transport is used.
+    If the HTTP response cache is enabled, GET requests for cached URLs are made conditional on the response having
+    changed. If it hasn't (HTTP 304), the cached response is returned. GitHub doesn't count these against the API rate
+    limit.
+
+    Keyword arguments:
+    url -- the URL to load (must already be normalized)
+    headers -- dictionary of request headers (default value: None)
+    method -- the HTTP request method (default value: "GET")
+    data -- bytes to send as the request body (default value: None)
+    """
+    if headers is None:
+        headers = {}
+
+    cache_entry = None
+    if url_is_cacheable(url=url, method=method):
+        cache_entry = load_cache_entry(url=url, headers=headers)
+        if cache_entry is not None:
+            # don't modify the caller's dictionary
+            headers = dict(headers)
+            if cache_entry["etag"] is not None:
+                headers["If-None-Match"] = cache_entry["etag"]
+            if cache_entry["last_modified"] is not None:
+                headers["If-Modified-Since"] = cache_entry["last_modified"]
+
+    try:
+        response = send_request(url=url, headers=headers, method=method, data=data)
+    except urllib.error.HTTPError as exception:
+        # urllib treats 304 as an error
+        if exception.code == 304 and cache_entry is not None:
+            return get_cached_response(cache_entry=cache_entry, response_headers=exception.headers)
+        raise exception
+
+    if response.status == 304 and cache_entry is not None:
+        return get_cached_response(cache_entry=cache_entry, response_headers=response.info())
+
+    if url_is_cacheable(url=url, method=method):
+        save_cache_entry(url=url, headers=headers, response=response)
+
+    return response
+
+
+def send_request(url, headers, method, data):
+    """Do an HTTP request using the configured HTTP transport and return a URLResponse object.
+
+    Keyword arguments:
+    url -- the URL to load
+    headers -- dictionary of request headers
+    method -- the HTTP request method
+    data -- bytes to send as the request body (None for no body)
+    """
+    start_time = time.time()
+    status = None
+    bytes_received = 0
+    try:
+        if async_http_transport is not None:
+            response = async_http_transport.request(url=url, headers=headers, method=method, data=data)
+        else:
+            request = urllib.request.Request(url=url, headers=headers, method=method, data=data)
+            with urllib.request.urlopen(request) as url_data:
+                response = URLResponse(url=url_data.geturl(),
+                                       status=url_data.status,
+                                       headers=url_data.info(),
+                                       body=url_data.read())
+        status = response.status
+        bytes_received = len(response.body)
+        return response
+    except urllib.error.HTTPError as exception:
+        status = exception.code
+        raise exception
+    finally:
+        metrics.record_request(url=url,
+                               status=status,
+                               bytes_sent=0 if data is None else len(data),
+                               bytes_received=bytes_received,
+                               latency=time.time() - start_time)
+
+
+def url_is_cacheable(url, method):
+    """Return whether responses from the URL should be stored in the HTTP response cache.
+
+    Keyword arguments:
+    url -- the URL
+    method -- the HTTP request method
+    """
+    if cache_folder is None or method != "GET":
+        return False
+    for uncached_github_api_path in uncached_github_api_paths:
+        if url.startswith(github_api_url + uncached_github_api_path):
+            return False
+    return True
+
+
+def get_cache_path(url, headers):
+    """Return the path of the cache file for the URL.
+
+    Keyword arguments:
+    url -- the URL
+    headers -- the request headers. The Accept header is part of the key because the GitHub API returns a different
+               response depending on the media type.
+    """
+    key = url + "\n" + str(headers.get("Accept"))
+    return os.path.join(cache_folder, hashlib.sha256(key.encode(file_encoding)).hexdigest())
+
+
+def load_cache_entry(url, headers):
+    """Return a dictionary containing the cached response for the URL, or None if there is no cached response:
+    path -- path of the cache file
+    url -- the URL of the response
+    etag -- value of the response's ETag header (None if not present)
+    last_modified -- value of the response's Last-Modified header (None if not present)
+    headers -- the response headers
+    body -- the response body
+
+    Keyword arguments:
+    url -- the URL
+    headers -- the request headers
+    """
+    cache_path = get_cache_path(url=url, headers=headers)
+    try:
+        with open(cache_path, mode="rb") as cache_file:
+            metadata = json.loads(cache_file.readline().decode(file_encoding))
+            body = cache_file.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Ignoring corrupted cache file: " + cache_path)
+        return None
+
+    return {"path": cache_path,
+            "url": metadata["url"],
+            "etag": metadata["etag"],
+            "last_modified": metadata["last_modified"],
+            "headers": http.client.parse_headers(io.BytesIO(metadata["headers"].encode("latin-1"))),
+            "body": body}
+
+
+def get_cached_response(cache_entry, response_headers):
+    """Return a URLResponse object for a cached response that was confirmed to be current.
+
+    Keyword arguments:
+    cache_entry -- the dictionary returned by load_cache_entry()
+    response_headers -- headers of the 304 response. The rate limiting headers are taken from these instead of the
+                        cached headers.
+    """
+    logger.info("Using cached response")
+    cached_headers = cache_entry["headers"]
+    for header_name in response_headers.keys():
+        if header_name.lower().startswith("x-ratelimit"):
+            del cached_headers[header_name]
+            cached_headers[header_name] = response_headers[header_name]
+    try:
+        # mark the entry as recently used so it is the last to be evicted
+        os.utime(cache_entry["path"])
+    except FileNotFoundError:
+        # the entry was evicted in the meantime
+        pass
+    return URLResponse(url=cache_entry["url"], status=200, headers=cached_headers, body=cache_entry["body"])
+
+
+def save_cache_entry(url, headers, response):
+    """Store the response in the HTTP response cache if it has a validator that allows a conditional request.
+
+    Keyword arguments:
+    url -- the URL
+    headers -- the request headers
+    response -- the URLResponse object
+    """
+    global cache_size
+    etag = response.info()["ETag"]
+    last_modified = response.info()["Last-Modified"]
+    if etag is None and last_modified is None:
+        return
+
+    metadata = {"url": url, "etag": etag, "last_modified": last_modified, "headers": str(response.info())}
+    cache_path = get_cache_path(url=url, headers=headers)
+    # write to a temporary file first so that an interrupted write or a concurrent reader never sees a partial file
+    temporary_path = cache_path + "." + str(threading.get_ident()) + ".tmp"
+    with open(temporary_path, mode="wb") as cache_file:
+        cache_file.write(json.dumps(metadata).encode(file_encoding) + b"\n")
+        cache_file.write(response.read())
+
+    with cache_lock:
+        try:
+            # the entry being replaced no longer counts towards the cache size
+            replaced_size = os.path.getsize(cache_path)
+        except FileNotFoundError:
+            replaced_size = 0
+        os.replace(temporary_path, cache_path)
+        if cache_size is None:
+            cache_size = get_folder_size(folder=cache_folder)
+        else:
+            cache_size += os.path.getsize(cache_path) - replaced_size
+        if cache_size > maximum_cache_size:
+            evict_cache_entries()
+
+
+def get_folder_size(folder):
+    """Return the total size of the files in the folder, not including its subfolders.
+
+    Keyword arguments:
+    folder -- path of the folder
+    """
+    folder_size = 0
+    with os.scandir(folder) as folder_listing:
+        for folder_item in folder_listing:
+            if folder_item.is_file():
+                folder_size += folder_item.stat().st_size
+    return folder_size
+
+
+def evict_cache_entries():
+    """Delete the least recently used entries from the HTTP response cache until its size is below the eviction target.
+    The files in the state folder are never deleted. cache_lock must be held by the caller.
+    """
+    global cache_size
+    cache_files = []
+    with os.scandir(cache_folder) as folder_listing:
+        for folder_item in folder_listing:
+            if folder_item.is_file() and not folder_item.name.endswith(".tmp"):
+                cache_file_stat = folder_item.stat()
+                cache_files.append((cache_file_stat.st_mtime, cache_file_stat.st_size, folder_item.path))
+    cache_files.sort()
+
+    cache_size = sum(cache_file[1] for cache_file in cache_files)
+    for modification_time, file_size, path in cache_files:
+        if cache_size <= maximum_cache_size * cache_eviction_target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        cache_size -= file_size
+
+
+class AsyncHTTPTransport:
+    """HTTP/1.1 client built on asyncio streams. The event loop runs in a background thread so the transport can be used
+    from the synchronous code (and the repository processing workers) via request(). Connections are kept alive and
+    pooled per host, so the DNS lookup and TCP/TLS handshake are only done once per connection rather than once per
+    request, and the number of requests in flight is capped.
+    """
+
+    def __init__(self, maximum_requests):
+        self.loop = asyncio.new_event_loop()
+        # (scheme, host, port): list of idle (reader, writer) tuples
+        self.idle_connections = {}
+        self.ssl_context = ssl.create_default_context()
+        self.thread = threading.Thread(target=self.run_loop, daemon=True)
+        self.thread.start()
+        # the semaphore must be created from the event loop's thread
+        self.request_slots = self.run(self.create_semaphore(value=maximum_requests))
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coroutine):
+        """Run the coroutine in the event loop and wait for the result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    @staticmethod
+    async def create_semaphore(value):
+        return asyncio.Semaphore(value)
+
+    def close(self):
+        """Close all pooled connections and stop the event loop."""
+        self.run(self.close_connections())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def close_connections(self):
+        for connections in self.idle_connections.values():
+            for reader, writer in connections:
+                writer.close()
+        self.idle_connections = {}
+
+    def request(self, url, headers, method, data=None):
+        """Do an HTTP request and return a URLResponse object.
+
+        Keyword arguments:
+        url -- the URL to load
+        headers -- dictionary of request headers
+        method -- the HTTP request method
+        data -- bytes to send as the request body (default value: None)
+        """
+        return self.run(self.request_async(url=url, headers=headers, method=method, data=data))
+
+    async def request_async(self, url, headers, method, data):
+        async with self.request_slots:
+            for redirect_count in range(maximum_http_redirects + 1):
+                status, reason, response_headers, body = await asyncio.wait_for(
+                    self.send(url=url, headers=headers, method=method, data=data),
+                    timeout=async_http_timeout
+                )
+                if status in [301, 302, 303, 307, 308] and response_headers["Location"] is not None:
+                    url = urllib.parse.urljoin(url, response_headers["Location"])
+                    if status in [301, 302, 303]:
+                        # as with urllib.request.HTTPRedirectHandler, the request is changed to a GET without a body.
+                        # 307 and 308 keep the method and body.
+                        if method != "HEAD":
+                            method = "GET"
+                        data = None
+                        headers = {header_name: header_value for header_name, header_value in headers.items()
+                                   if header_name.lower() not in ["content-length", "content-type"]}
+                    continue
+                if status >= 400:
+                    raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+                return URLResponse(url=url, status=status, headers=response_headers, body=body)
+
+        raise urllib.error.HTTPError(url, status, "Maximum number of redirects exceeded", response_headers,
+                                     io.BytesIO(body))
+
+    async def send(self, url, headers, method, data):
+        """Send the request over a pooled connection if one is available, otherwise over a new connection.
+        Return a tuple of the status, reason, headers and body of the response.
+        """
+        url_parts = urllib.parse.urlsplit(url)
+        if url_parts.port is not None:
+            port = url_parts.port
+        elif url_parts.scheme == "https":
+            port = 443
+        else:
+            port = 80
+        host_key = (url_parts.scheme, url_parts.hostname, port)
+        target = url_parts.path or "/"
+        if url_parts.query:
+            target += "?" + url_parts.query
+
+        request_lines = [method + " " + target + " HTTP/1.1",
+                         "Host: " + url_parts.netloc,
+                         "User-Agent: " + http_user_agent,
+                         "Accept-Encoding: identity",
+                         "Connection: keep-alive"]
+        if data is not None:
+            request_lines.append("Content-Length: " + str(len(data)))
+        for header_name, header_value in headers.items():
+            request_lines.append(header_name + ": " + header_value)
+        request_data = ("\r\n".join(request_lines) + "\r\n\r\n").encode("latin-1")
+        if data is not None:
+            request_data += data
+
+        while True:
+            if self.idle_connections.get(host_key):
+                reader, writer = self.idle_connections[host_key].pop()
+                reused_connection = True
+            else:
+                reader, writer = await self.connect(host_key=host_key)
+                reused_connection = False
+
+            try:
+                writer.write(request_data)
+                await writer.drain()
+                status, reason, response_headers, body, keep_alive = await self.read_response(reader=reader,
+                                                                                              method=method)
+            except (ConnectionError, asyncio.IncompleteReadError, http.client.RemoteDisconnected):
+                writer.close()
+                if reused_connection:
+                    # the server closed the idle connection, try again on a new connection
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self.idle_connections.setdefault(host_key, []).append((reader, writer))
+            else:
+                writer.close()
+            return status, reason, response_headers, body
+
+    async def connect(self, host_key):
+        scheme, host, port = host_key
+        if scheme == "https":
+            ssl_context = self.ssl_context
+        else:
+            ssl_context = None
+        try:
+            return await asyncio.open_connection(host=host, port=port, ssl=ssl_context)
+        except OSError as exception:
+            # match the exception raised by urllib
+            raise urllib.error.URLError(exception)
+
+    @staticmethod
+    async def read_response(reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        status_line = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        http_version = status_line[0]
+        status = int(status_line[1])
+        if len(status_line) > 2:
+            reason = status_line[2]
+        else:
+            reason = ""
+
+        header_data = b""
+        while True:
+            line = await reader.readline()
+            if line in [b"\r\n", b"\n", b""]:
+                break
+            header_data += line
+        response_headers = http.client.parse_headers(io.BytesIO(header_data + b"\r\n"))
+
+        keep_alive = http_version == "HTTP/1.1"
+        if response_headers["Connection"] is not None:
+            keep_alive = response_headers["Connection"].lower() != "close"
+
+        if method == "HEAD" or status in [204, 304] or 100 <= status < 200:
+            body = b""
+        elif (response_headers["Transfer-Encoding"] is not None and
+              response_headers["Transfer-Encoding"].lower() == "chunked"):
+            body = b""
+            while True:
+                chunk_size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if chunk_size == 0:
+                    # skip the trailer
+                    while (await reader.readline()) not in [b"\r\n", b"\n", b""]:
+                        pass
+                    break
+                body += await reader.readexactly(chunk_size)
+                # the CRLF following the chunk data
+                await reader.readline()
+        elif response_headers["Content-Length"] is not None:
+            body = await reader.readexactly(int(response_headers["Content-Length"]))
+        else:
+            # the end of the body is indicated by the server closing the connection
+            body = await reader.read()
+            keep_alive = False
+
+        return status, reason, response_headers, body, keep_alive
+
+
+def determine_urlopen_retry(exception, retry_policy):
+    """Determine whether the exception warrants another attempt at opening the URL.
+    If so, delay then return True. Otherwise, return False.
+
+    Keyword arguments:
+    exception -- the exception
+    retry_policy -- the RetryPolicy of the request
+    """
+    exception_string = str(exception.__class__.__name__) + ": " + str(exception)
+    logger.info(exception_string)
+    for urlopen_retry_exception, error_class in urlopen_retry_exceptions:
+        if str(exception_string).startswith(urlopen_retry_exception):
+            # these errors may only be temporary, retry
+            print("Temporarily unable to open URL (" + str(exception) + ")")
+            response_headers = None
+            if isinstance(exception, urllib.error.HTTPError):
+                response_headers = exception.headers
+                if exception.url.startswith(github_api_url):
+                    # the rate limiting headers show whether the rate limit was exceeded
+                    rate_limit_scheduler.update_from_headers(url=exception.url, headers=response_headers)
+            if (exception_string.startswith(check_rate_limiting_after_exception) and
+                    not exception.url.startswith(github_api_url + rate_limit_api_path)):
+                # ideally this would only be done if the URL opened was api.github.com and use the correct API type but
+                # it should do no real harm as is
+                # a failed request to the rate_limit API is only retried, because it is made while checking the rate
+                # limit and check_rate_limiting() would wait for that check to finish
+                # the request is only retried once the allotments are available, which doesn't use them up
+                check_rate_limiting(api_type="core", charge=False)
+                check_rate_limiting(api_type="search", charge=False)
+            return retry_policy.retry(error_class=error_class, response_headers=response_headers)
+
+    # other errors are probably permanent so give up
+    if str(exception_string).startswith("urllib.error.HTTPError: HTTP Error 401"):
+        print(exception)
+        print("HTTP Error 401 may be caused by providing an incorrect GitHub personal access token.")
+    return False
+
+
+def normalize_url(url):
+    """Replace problematic characters in the URL and return it.
+
+    Keyword arguments:
+    url -- the URL to process
+    """
+    url_parts = urllib.parse.urlparse(url)
+    # url_parts is a tuple but I need to change values so it's necessary to convert it to list
+    url_parts = list(url_parts)
+    for url_part in enumerate(url_parts):
+        # do percent-encoding on the URL (e.g. change space to %20) and replace any occurrences of multiple slashes with
+        # a single slash
+        if url_part[0] == 1:
+            # the network location may contain a port number
+            safe_characters = "&=?/+:"
+        else:
+            safe_characters = "&=?/+"
+        url_parts[url_part[0]] = urllib.parse.quote(url_part[1].replace("///", "/").replace("//", "/"),
+                                                    safe=safe_characters)
+    return urllib.parse.urlunparse(url_parts)
+
+
+def download_library_index():
+    """Download the Arduino Library Manager index to a file and return the path of the file. If the cache is enabled,
+    the request is conditional on the index having changed since the copy in the state folder was downloaded. The
+    response is written to the file in chunks so the index is never in memory as a whole.
+    """
+    if cache_folder is None:
+        library_index_folder = output_folder_name
+    else:
+        library_index_folder = state_folder
+    library_index_path = library_index_folder + "/" + library_index_filename
+    validators_path = library_index_folder + "/" + library_index_validators_filename
+
+    headers = {}
+    if cache_folder is not None and os.path.exists(library_index_path):
+        try:
+            with open(file=validators_path, mode="r", encoding=file_encoding) as validators_file:
+                validators = json.load(validators_file)
+            if validators["etag"] is not None:
+                headers["If-None-Match"] = validators["etag"]
+            if validators["last_modified"] is not None:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            logger.warning("Ignoring corrupted file: " + validators_path)
+
+    logger.info("Opening URL: " + library_index_url)
+    retry_policy = RetryPolicy()
+    while True:
+        start_time = time.time()
+        status = None
+        bytes_received = 0
+        try:
+            request = urllib.request.Request(url=library_index_url, headers=headers)
+            with urllib.request.urlopen(request) as url_data:
+                status = url_data.status
+                # write to a temporary file first so an interrupted download doesn't replace the previous copy
+                with open(file=library_index_path + ".tmp", mode="wb") as library_index_file:
+                    while True:
+                        chunk = url_data.read(library_index_chunk_size)
+                        if not chunk:
+                            break
+                        library_index_file.write(chunk)
+                        bytes_received += len(chunk)
+                os.replace(library_index_path + ".tmp", library_index_path)
+                validators = {"etag": url_data.info()["ETag"], "last_modified": url_data.info()["Last-Modified"]}
+            if cache_folder is not None:
+                with open(file=validators_path + ".tmp", mode="w", encoding=file_encoding) as validators_file:
+                    json.dump(validators, validators_file)
+                os.replace(validators_path + ".tmp", validators_path)
+            return library_index_path
+        except Exception as exception:
+            if isinstance(exception, urllib.error.HTTPError):
+                status = exception.code
+                if exception.code == 304:
+                    logger.info("Using cached Library Manager index")
+                    return library_index_path
+            if not determine_urlopen_retry(exception=exception, retry_policy=retry_policy):
+                if retry_policy.exhausted_error_class is not None:
+                    # maximum retries reached without successfully opening URL
+                    raise TimeoutError("Maximum number of URL load retries exceeded")
                 raise exception
+        finally:
+            metrics.record_request(url=library_index_url,
+                                   status=status,
+                                   bytes_sent=0,
+                                   bytes_received=bytes_received,
+                                   latency=time.time() - start_time)
+
+
+class LibraryIndexParser:
+    """Parses the Arduino Library Manager index incrementally. The file is read in chunks and the objects of the
+    library releases are decoded one at a time, so the memory usage doesn't depend on the size of the index.
+    """
+    whitespace_regex = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, library_index_file):
+        """Keyword arguments:
+        library_index_file -- the Library Manager index file, opened in text mode
+        """
+        self.library_index_file = library_index_file
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        # position of the first character of the buffer that has not been parsed
+        self.position = 0
+        self.end_of_file = False
+
+    def read_chunk(self):
+        """Replace the parsed part of the buffer with the next chunk of the file."""
+        chunk = self.library_index_file.read(library_index_chunk_size)
+        if not chunk:
+            self.end_of_file = True
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Skip whitespace and return the next character, without consuming it. Return "" at the end of the file."""
+        while True:
+            self.position = self.whitespace_regex.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or self.end_of_file:
+                return self.buffer[self.position:self.position + 1]
+            self.read_chunk()
+
+    def expect(self, character):
+        """Consume the next character, which must be the specified one.
+
+        Keyword arguments:
+        character -- the expected character
+        """
+        if self.peek() != character:
+            raise ValueError("Unable to parse the Library Manager index: expected " + character)
+        self.position += 1
+
+    def decode_value(self):
+        """Decode the next JSON value and return it."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.position)
+                # a value that ends at the end of the buffer (e.g. a number) might continue in the next chunk
+                if end < len(self.buffer) or self.end_of_file:
+                    self.position = end
+                    return value
+            except json.decoder.JSONDecodeError:
+                if self.end_of_file:
+                    raise
+            self.read_chunk()
+
+    def generate_libraries(self):
+        """Generate the object of each library release in the index."""
+        self.expect(character="{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(character=":")
+            if key == "libraries":
+                self.expect(character="[")
+                if self.peek() == "]":
+                    self.position += 1
+                else:
+                    while True:
+                        yield self.decode_value()
+                        if self.peek() != ",":
+                            self.expect(character="]")
+                            break
+                        self.position += 1
+            else:
+                self.decode_value()
+            if self.peek() != ",":
+                self.expect(character="}")
+                return
+            self.position += 1
+
+
+def generate_library_index_releases(library_index_path):
+    """Generate the object of each library release in the Library Manager index file.
+
+    Keyword arguments:
+    library_index_path -- path of the Library Manager index file
+    """
+    with open(file=library_index_path, mode="r", encoding=file_encoding) as library_index_file:
+        yield from LibraryIndexParser(library_index_file=library_index_file).generate_libraries()
+
+
+def collect_library_manager_candidates(library_releases, candidates):
+    """Add the repositories of the libraries in the Arduino Library Manager index to the candidates.
+
+    Keyword arguments:
+    library_releases -- iterable of the objects of the library releases in the Library Manager index
+    candidates -- dictionary of the candidates (see add_candidate())
+    """
+    for library_manager_data in group_library_releases(library_releases=library_releases).values():
+        add_candidate(candidates=candidates,
+                      repository_url="https://github.com/" + library_manager_data["full_name"],
+                      full_name=library_manager_data["full_name"],
+                      repository_object=None,
+                      source="library_manager_index",
+                      in_library_manager=True,
+                      verify=False,
+                      log_verification_failures=False,
+                      library_manager_data=library_manager_data)
+
+
+def group_library_releases(library_releases):
+    """Group the releases of the Library Manager index by repository, in a single pass. The releases of a library don't
+    need to be next to each other in the index. Return a dictionary (repository key: dictionary), in the order the
+    repositories first appear in the index:
+    full_name -- the repository's full name (e.g. "arduino/Arduino")
+    release_count -- number of releases of the library
+    newest_release -- the library_index_release_fields of the release with the highest version
+
+    Keyword arguments:
+    library_releases -- iterable of the objects of the library releases in the Library Manager index
+    """
+    libraries = {}
+    for library_release in library_releases:
+        full_name = get_repository_full_name(repository_url=library_release["repository"])
+        if full_name is None:
+            # for now I'm only listing GitHub repos
+            continue
+        # the repository URL as listed in the Library Manager index may be different from the GitHub URL if the
+        # repository has been renamed, due to GitHub automatically redirecting the URL
+        repository_key = get_repository_key(repository_url="https://github.com/" + full_name)
+        library = libraries.get(repository_key)
+        if library is None:
+            libraries[repository_key] = {"full_name": full_name,
+                                         "release_count": 1,
+                                         "newest_release": library_release}
+        else:
+            library["release_count"] += 1
+            if (get_version_key(version=str(library_release.get("version"))) >
+                    get_version_key(version=str(library["newest_release"].get("version")))):
+                library["newest_release"] = library_release
+
+    # only the fields that are used are kept
+    for library in libraries.values():
+        library["newest_release"] = {field: library["newest_release"].get(field)
+                                     for field in library_index_release_fields}
+    return libraries
+
+
+def get_repository_full_name(repository_url):
+    """Return the full name (e.g. "arduino/Arduino") of the GitHub repository of a URL from the Library Manager index,
+    or None if it's not the URL of a GitHub repository. The URL may use http, have the www subdomain, a .git suffix, or
+    a trailing slash.
+
+    Keyword arguments:
+    repository_url -- the repository URL
+    """
+    url_parts = urllib.parse.urlsplit(repository_url.strip())
+    if url_parts.hostname not in ["github.com", "www.github.com"]:
+        return None
+    path_segments = [path_segment for path_segment in url_parts.path.split("/") if path_segment != ""]
+    if len(path_segments) < 2:
+        return None
+    repository_name = path_segments[1]
+    if repository_name.endswith(".git"):
+        repository_name = repository_name[:-4]
+    if repository_name == "":
+        return None
+    return path_segments[0] + "/" + repository_name
+
+
+def get_version_key(version):
+    """Return the key used to order the versions of a library. The versions are compared as in semantic versioning,
+    e.g. 1.10.0 is higher than 1.9.0 and 1.0.0 is higher than 1.0.0-beta. Parts that are not numbers are compared as
+    text.
+
+    Keyword arguments:
+    version -- the version
+    """
+    release, separator, pre_release = version.strip().partition("-")
+    release_parts = []
+    for release_part in release.split("."):
+        if release_part.isdigit():
+            release_parts.append((int(release_part), ""))
+        else:
+            release_parts.append((-1, release_part))
+    return release_parts, pre_release == "", pre_release
+
+
+def get_repository_objects(full_names):
+    """Generate the repos API objects of the repositories, in order. When the GraphQL API is enabled, the data is
+    fetched in batches, otherwise each repository is fetched via the REST API when it's needed.
+
+    Keyword arguments:
+    full_names -- list of the repositories' full names (e.g. "arduino/Arduino")
+    """
+    if graphql_api_url is None:
+        for full_name in full_names:
+            yield get_github_api_response(request="repos/" + full_name)["json_data"]
+        return
+
+    for batch_start in range(0, len(full_names), graphql_batch_size):
+        batch_full_names = full_names[batch_start:batch_start + graphql_batch_size]
+        graphql_repository_objects = get_graphql_repository_objects(full_names=batch_full_names)
+        for full_name, repository_object in zip(batch_full_names, graphql_repository_objects):
+            if repository_object is None:
+                # GraphQL didn't return the repository (e.g. it was renamed) so fall back to the REST API, which follows
+                # the redirect
+                repository_object = get_github_api_response(request="repos/" + full_name)["json_data"]
+            yield repository_object
+
+
+@measure_stage(name="repository_data")
+def get_graphql_repository_objects(full_names):
+    """Fetch the data of multiple repositories with a single GitHub GraphQL API request. Return a list of objects in the
+    format of the repos API, with the commit status of the default branch added as "combined_status". The item is None
+    for any repository that could not be fetched.
+
+    Keyword arguments:
+    full_names -- list of the repositories' full names (e.g. "arduino/Arduino")
+    """
+    if graphql_api_url.startswith(github_api_url):
+        check_rate_limiting(api_type="graphql")
+
+    # the repositories are passed as variables so the names don't need to be escaped
+    variable_definitions = []
+    repository_queries = []
+    variables = {}
+    for index, full_name in enumerate(full_names):
+        index_string = str(index)
+        variable_definitions.append("$owner" + index_string + ": String!, $name" + index_string + ": String!")
+        repository_queries.append("repository" + index_string + ": repository(owner: $owner" + index_string +
+                                  ", name: $name" + index_string + ") { ...RepositoryFields }")
+        variables["owner" + index_string] = full_name.split('/')[0]
+        variables["name" + index_string] = full_name.split('/')[1]
+    query = ("query(" + ", ".join(variable_definitions) + ") {\n" + "\n".join(repository_queries) + "\n}\n" +
+             graphql_repository_fields)
+
+    json_data = get_json_from_url(url=graphql_api_url, data={"query": query, "variables": variables})["json_data"]
+    for error in json_data.get("errors", []):
+        # e.g. a repository was not found
+        logger.info("GraphQL error: " + str(error.get("message")))
+    graphql_data = json_data.get("data")
+    if graphql_data is None:
+        graphql_data = {}
+
+    repository_objects = []
+    for index in range(len(full_names)):
+        graphql_repository = graphql_data.get("repository" + str(index))
+        if graphql_repository is None or graphql_repository["defaultBranchRef"] is None:
+            # the REST API is used for empty repositories because they don't have a default branch ref
+            repository_objects.append(None)
+        else:
+            repository_objects.append(get_repository_object_from_graphql(graphql_repository=graphql_repository))
+    return repository_objects
+
+
+def get_repository_object_from_graphql(graphql_repository):
+    """Convert a repository object returned by the GraphQL API to the format of the repos API.
+
+    Keyword arguments:
+    graphql_repository -- the repository's GraphQL JSON, containing the fields of graphql_repository_fields
+    """
+    repository_object = {"name": graphql_repository["name"],
+                         "full_name": graphql_repository["nameWithOwner"],
+                         "html_url": graphql_repository["url"],
+                         "owner": {"login": graphql_repository["owner"]["login"]},
+                         "default_branch": graphql_repository["defaultBranchRef"]["name"],
+                         "archived": graphql_repository["isArchived"],
+                         "fork": graphql_repository["isFork"],
+                         "pushed_at": graphql_repository["pushedAt"],
+                         "forks_count": graphql_repository["forkCount"],
+                         "stargazers_count": graphql_repository["stargazers"]["totalCount"],
+                         "license": None,
+                         "language": None,
+                         "description": graphql_repository["description"],
+                         "topics": [topic_node["topic"]["name"]
+                                    for topic_node in graphql_repository["repositoryTopics"]["nodes"]]}
+    if graphql_repository["parent"] is not None:
+        repository_object["parent"] = {"full_name": graphql_repository["parent"]["nameWithOwner"]}
+    if graphql_repository["licenseInfo"] is not None:
+        # the REST API uses "NOASSERTION" for unrecognized licenses
+        spdx_id = graphql_repository["licenseInfo"]["spdxId"]
+        if spdx_id is None:
+            spdx_id = "NOASSERTION"
+        repository_object["license"] = {"spdx_id": spdx_id}
+    if graphql_repository["primaryLanguage"] is not None:
+        repository_object["language"] = graphql_repository["primaryLanguage"]["name"]
+
+    # a commit with no statuses has a null status in GraphQL and a "pending" combined status in the REST API
+    commit_status = None
+    if graphql_repository["defaultBranchRef"]["target"] is not None:
+        commit_status = graphql_repository["defaultBranchRef"]["target"].get("status")
+    if commit_status is None:
+        repository_object["combined_status"] = {"state": "pending"}
+    else:
+        repository_object["combined_status"] = {"state": graphql_status_states.get(commit_status["state"], "pending")}
+    return repository_object
+
+
+def add_graphql_data(repository_objects):
+    """Add the fork parent and the combined status to the repository objects of search results, fetched in batches via
+    the GraphQL API. This saves the separate REST API requests for each repository in populate_row().
+    Repositories that are already on the list are skipped since populate_row() will not need the data.
+
+    Keyword arguments:
+    repository_objects -- list of repository objects from the search API
+    """
+    unlisted_repository_objects = [repository_object for repository_object in repository_objects
+                                   if not repository_is_listed(repository_url=repository_object["html_url"])]
+    for batch_start in range(0, len(unlisted_repository_objects), graphql_batch_size):
+        batch_repository_objects = unlisted_repository_objects[batch_start:batch_start + graphql_batch_size]
+        graphql_repository_objects = get_graphql_repository_objects(
+            full_names=[repository_object["full_name"] for repository_object in batch_repository_objects]
+        )
+        for repository_object, graphql_repository_object in zip(batch_repository_objects,
+                                                                graphql_repository_objects):
+            if graphql_repository_object is not None:
+                repository_object["combined_status"] = graphql_repository_object["combined_status"]
+                if "parent" in graphql_repository_object:
+                    repository_object["parent"] = graphql_repository_object["parent"]
+
+
+class LazyRepositoryObject(dict):
+    """A repository object from the search results. The items missing from search results (search_result_missing_keys)
+    are fetched via the repos API the first time one of them is read, so the request is only done for the repositories
+    that need them. Only reading an item with the [] operator causes the request, not get() or the in operator.
+    """
+
+    def __init__(self, repository_object):
+        """Keyword arguments:
+        repository_object -- the repository's JSON from the search API
+        """
+        super().__init__(repository_object)
+        self.details_loaded = False
+
+    def __missing__(self, key):
+        """Fetch the full repository object if the key is one of the items missing from search results.
+
+        Keyword arguments:
+        key -- the item key
+        """
+        if key not in search_result_missing_keys or self.details_loaded:
+            raise KeyError(key)
+        logger.info("Fetching the full repository data of " + self["full_name"])
+        repository_object = get_github_api_response(request="repos/" + self["full_name"])["json_data"]
+        for item_key, item_value in repository_object.items():
+            self.setdefault(item_key, item_value)
+        self.details_loaded = True
+        return self[key]
+
+
+def load_fork_parents():
+    """Load the fork parents saved by the previous run from the state folder."""
+    global fork_parents
+    fork_parents = {}
+    if cache_folder is None:
+        return
+    try:
+        with open(file=state_folder + "/" + fork_parents_filename,
+                  mode="r",
+                  encoding=file_encoding
+                  ) as fork_parents_file:
+            fork_parents = json.load(fork_parents_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        pass
+
+
+def save_fork_parents():
+    """Save the fork parents to the state folder for use by the next run."""
+    if cache_folder is None:
+        return
+    fork_parents_path = state_folder + "/" + fork_parents_filename
+    with fork_parents_lock:
+        with open(file=fork_parents_path + ".tmp", mode="w", encoding=file_encoding) as fork_parents_file:
+            json.dump(fork_parents, fork_parents_file)
+    os.replace(fork_parents_path + ".tmp", fork_parents_path)
+
+
+def get_fork_parent(repository_object):
+    """Return the full name of the parent of a forked repository. The parent of a fork doesn't change, so the parents
+    found by previous runs are used when the repository object doesn't contain it. This avoids the repos API request
+    for forks found by the searches.
+
+    Keyword arguments:
+    repository_object -- object containing the GitHub API data for the repository
+    """
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    if "parent" in repository_object:
+        fork_parent = str(repository_object["parent"]["full_name"])
+    else:
+        with fork_parents_lock:
+            fork_parent = fork_parents.get(repository_key)
+        if fork_parent is None:
+            previous_row = previous_rows.get(repository_object["html_url"])
+            if previous_row is not None and previous_row[Column.fork_of] != "":
+                fork_parent = previous_row[Column.fork_of]
+            else:
+                # the repository data in search results doesn't contain the parent so this does the repos API request
+                fork_parent = str(repository_object["parent"]["full_name"])
+
+    with fork_parents_lock:
+        fork_parents[repository_key] = fork_parent
+    return fork_parent
+
+
+def collect_search_candidates(search_query, created_argument_list, fork_argument, verify, log_verification_failures,
+                              candidates, source_number=None):
+    """Use the GitHub API to search for repositories and add the results to the candidates.
+    The search results of the created date segments are fetched in parallel when the search job count is more than 1.
+    The results are always added in the order of the segments and pages.
+    When a checkpoint is used, the progress of the search is saved after each segment as a list of dictionaries, one
+    for each segment:
+    created_argument -- the segment's created qualifier value
+    total_count -- number of search results of the segment
+    collected -- whether the segment's search results have been added (True, False)
+    search_results_count -- number of search results added
+
+    Keyword arguments:
+    search_query -- the search query
+    created_argument_list -- repository creation date range to filter results by
+                             (see: https://help.github.com/articles/understanding-the-search-syntax/#query-for-dates)
+    fork_argument -- fork filter. Valid values are "true", "false", "only".
+                     (see: https://help.github.com/articles/searching-in-forks/)
+    verify -- whether to verify that results contain an Arduino library (allowed values: True, False)
+    log_verification_failures -- whether to save a list of the repositories that failed verification
+    candidates -- dictionary of the candidates (see add_candidate())
+    source_number -- the position of the search in the order of collect_candidates(). None if the progress should not
+                     be checkpointed. (default value: None)
+    """
+    if source_number is not None and not collection_source_is_pending(source_number=source_number):
+        logger.info("Skipping the search collected before the checkpoint: " + search_query)
+        return
+
+    search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=search_job_count)
+    segment_futures = []
+    try:
+        if source_number is not None and checkpoint is not None and checkpoint["search_progress"] is not None:
+            # continue the search interrupted after the last checkpoint
+            search_progress = checkpoint["search_progress"]
+            first_pages = [None] * len(search_progress)
+        else:
+            search_segments = plan_search_segments(search_query=search_query,
+                                                   created_argument_list=created_argument_list,
+                                                   fork_argument=fork_argument,
+                                                   search_executor=search_executor)
+            search_progress = [{"created_argument": get_created_argument(date_range=date_range),
+                                "total_count": first_page[0]["total_count"],
+                                "collected": False,
+                                "search_results_count": 0}
+                               for date_range, first_page in search_segments]
+            first_pages = [first_page for date_range, first_page in search_segments]
+
+        for segment_progress, first_page in zip(search_progress, first_pages):
+            if not segment_progress["collected"]:
+                segment_futures.append((segment_progress,
+                                        search_executor.submit(get_search_segment_repository_objects,
+                                                               search_query=search_query,
+                                                               created_argument=segment_progress["created_argument"],
+                                                               fork_argument=fork_argument,
+                                                               first_page=first_page)))
+
+        for segment_progress, segment_future in segment_futures:
+            created_argument = segment_progress["created_argument"]
+            segment_repository_keys = []
+            for repository_object in segment_future.result():
+                add_candidate(candidates=candidates,
+                              repository_url=repository_object["html_url"],
+                              full_name=repository_object["full_name"],
+                              repository_object=repository_object,
+                              source=search_query + "+fork:" + fork_argument,
+                              in_library_manager=False,
+                              verify=verify,
+                              log_verification_failures=log_verification_failures)
+                segment_repository_keys.append(get_repository_key(repository_url=repository_object["html_url"]))
+            segment_progress["search_results_count"] = len(segment_repository_keys)
+            segment_progress["collected"] = True
+            if source_number is not None:
+                save_candidates(candidates=candidates,
+                                repository_keys=segment_repository_keys,
+                                collected_source_count=source_number,
+                                search_progress=search_progress)
+
+            if segment_progress["search_results_count"] < segment_progress["total_count"]:
+                # GitHub's search API provides data for a maximum of 1000 search results
+                # https://developer.github.com/v3/search/#about-the-search-api
+                # plan_search_segments() splits the segments to work around this so this only happens if more than the
+                # maximum number of matching repositories were created on a single day
+                logger.warning(
+                    "Maximum search results count reached for search segment: " + created_argument +
+                    " in query: " + search_query
+                )
+
+            logger.info("Found " + str(segment_progress["search_results_count"]) +
+                        " search results for search segment: " + created_argument +
+                        " in query: " + search_query
+                        )
+
+        search_segments = [(parse_created_argument(created_argument=segment_progress["created_argument"]),
+                            segment_progress["total_count"])
+                           for segment_progress in search_progress]
+        save_search_segments(search_query=search_query, fork_argument=fork_argument, search_segments=search_segments)
+        if source_number is not None:
+            save_candidates(candidates=candidates, repository_keys=[], collected_source_count=source_number + 1)
+    finally:
+        # if collection was interrupted by an exception, don't fetch the segments that haven't been started
+        for segment_progress, segment_future in segment_futures:
+            segment_future.cancel()
+        search_executor.shutdown(wait=True)
+
+
+def plan_search_segments(search_query, created_argument_list, fork_argument, search_executor):
+    """Determine the created date segments to search so that none has more results than the search API provides.
+    Start from the segments saved by the previous run, or from created_argument_list if there are none. The first page
+    of each segment is fetched and segments with too many results are split in two, recursively.
+    Return a list of tuples of the date range and its first page, in date order.
+
+    Keyword arguments:
+    search_query -- the search query
+    created_argument_list -- repository creation date ranges to start from if no segments were saved
+    fork_argument -- fork filter
+    search_executor -- the first pages are fetched concurrently using this executor
+    """
+    date_ranges = load_search_segments(search_query=search_query, fork_argument=fork_argument)
+    if date_ranges is None:
+        date_ranges = [parse_created_argument(created_argument=created_argument)
+                       for created_argument in created_argument_list]
+
+    search_segments = []
+    probed_date_ranges = date_ranges
+    while probed_date_ranges:
+        first_pages = search_executor.map(
+            lambda date_range: get_search_page(search_query=search_query,
+                                               created_argument=get_created_argument(date_range=date_range),
+                                               fork_argument=fork_argument,
+                                               page_number=1),
+            probed_date_ranges
+        )
+        split_date_ranges = []
+        for date_range, first_page in zip(probed_date_ranges, first_pages):
+            if first_page[0]["total_count"] > maximum_search_results_count and date_range[0] != date_range[1]:
+                logger.info("Splitting search segment: " + get_created_argument(date_range=date_range) +
+                            " in query: " + search_query)
+                split_date_ranges += split_date_range(date_range=date_range)
+            else:
+                search_segments.append((date_range, first_page))
+        probed_date_ranges = split_date_ranges
+
+    search_segments.sort(key=lambda search_segment: get_date_range_bounds(date_range=search_segment[0])[0])
+    return search_segments
+
+
+def parse_created_argument(created_argument):
+    """Return the date range of a search created qualifier as a tuple of the first and last dates (None for no
+    bound).
+
+    Keyword arguments:
+    created_argument -- created qualifier value in one of the formats: "<=YYYY-MM-DD", ">=YYYY-MM-DD",
+                        "YYYY-MM-DD..YYYY-MM-DD"
+    """
+    if created_argument.startswith("<="):
+        return None, parse_date(date_string=created_argument[2:])
+    if created_argument.startswith(">="):
+        return parse_date(date_string=created_argument[2:]), None
+    first_date, last_date = created_argument.split("..")
+    return parse_date(date_string=first_date), parse_date(date_string=last_date)
+
+
+def parse_date(date_string):
+    """Return the date object of a YYYY-MM-DD string.
+
+    Keyword arguments:
+    date_string -- the date
+    """
+    return datetime.datetime.strptime(date_string, "%Y-%m-%d").date()
+
+
+def get_created_argument(date_range):
+    """Return the search created qualifier value of a date range.
 
-    # maximum retries reached without successfully opening URL
-    raise TimeoutError("Maximum number of URL load retries exceeded")
+    Keyword arguments:
+    date_range -- tuple of the first and last dates (None for no bound)
+    """
+    if date_range[0] is None and date_range[1] is None:
+        # sparse segments covering all dates are merged into an unbounded range, which has no "<=" or ">=" form
+        return ">=" + search_minimum_created_date.isoformat()
+    if date_range[0] is None:
+        return "<=" + date_range[1].isoformat()
+    if date_range[1] is None:
+        return ">=" + date_range[0].isoformat()
+    return date_range[0].isoformat() + ".." + date_range[1].isoformat()
 
 
-def determine_urlopen_retry(exception):
-    """Determine whether the exception warrants another attempt at opening the URL.
-    If so, delay then return True. Otherwise, return False.
+def get_date_range_bounds(date_range):
+    """Return the first and last dates of the date range, using the earliest possible creation date and the current
+    date for the missing bounds.
 
     Keyword arguments:
-    exception -- the exception
+    date_range -- tuple of the first and last dates (None for no bound)
     """
-    exception_string = str(exception.__class__.__name__) + ": " + str(exception)
-    logger.info(exception_string)
-    for urlopen_retry_exception in urlopen_retry_exceptions:
-        if str(exception_string).startswith(urlopen_retry_exception):
-            # these errors may only be temporary, retry
-            print("Temporarily unable to open URL (" + str(exception) + "), retrying")
-            if exception_string.startswith(check_rate_limiting_after_exception):
-                # ideally this would only be done if the URL opened was api.github.com and use the correct API type but
-                # it should do no real harm as is
-                check_rate_limiting(api_type="core")
-                check_rate_limiting(api_type="search")
-            time.sleep(urlopen_retry_delay)
-            return True
+    first_date, last_date = date_range
+    if first_date is None:
+        first_date = search_minimum_created_date
+    if last_date is None:
+        last_date = max(datetime.date.today(), first_date)
+    return first_date, last_date
 
-    # other errors are probably permanent so give up
-    if str(exception_string).startswith("urllib.error.HTTPError: HTTP Error 401"):
-        print(exception)
-        print("HTTP Error 401 may be caused by providing an incorrect GitHub personal access token.")
-    return False
 
+def split_date_range(date_range):
+    """Split the date range in two at its middle and return a list of the two date ranges.
+
+    Keyword arguments:
+    date_range -- tuple of the first and last dates (None for no bound)
+    """
+    first_date, last_date = get_date_range_bounds(date_range=date_range)
+    middle_date = first_date + (last_date - first_date) // 2
+    return [(date_range[0], middle_date), (middle_date + datetime.timedelta(days=1), date_range[1])]
 
-def normalize_url(url):
-    """Replace problematic characters in the URL and return it.
+
+def load_search_segments(search_query, fork_argument):
+    """Return the list of date ranges of the search segments saved by the previous run, with adjacent sparse segments
+    merged. Return None if no segments were saved.
 
     Keyword arguments:
-    url -- the URL to process
+    search_query -- the search query
+    fork_argument -- fork filter
     """
-    url_parts = urllib.parse.urlparse(url)
-    # url_parts is a tuple but I need to change values so it's necessary to convert it to list
-    url_parts = list(url_parts)
-    for url_part in enumerate(url_parts):
-        # do percent-encoding on the URL (e.g. change space to %20) and replace any occurrences of multiple slashes with
-        # a single slash
-        url_parts[url_part[0]] = urllib.parse.quote(url_part[1].replace("///", "/").replace("//", "/"), safe="&=?/+")
-    return urllib.parse.urlunparse(url_parts)
+    if cache_folder is None:
+        return None
+    try:
+        with open(file=state_folder + "/" + search_segments_filename,
+                  mode="r",
+                  encoding=file_encoding
+                  ) as search_segments_file:
+            saved_search_segments = json.load(search_segments_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return None
+    saved_search_segments = saved_search_segments.get(search_query + "+fork:" + fork_argument)
+    if not saved_search_segments:
+        return None
+
+    date_ranges = []
+    merged_count = 0
+    for first_date, last_date, search_results_count in saved_search_segments:
+        date_range = (None if first_date is None else parse_date(date_string=first_date),
+                      None if last_date is None else parse_date(date_string=last_date))
+        if date_ranges and merged_count + search_results_count <= search_segment_merge_limit:
+            # merge with the previous segment
+            date_ranges[-1] = (date_ranges[-1][0], date_range[1])
+            merged_count += search_results_count
+        else:
+            date_ranges.append(date_range)
+            merged_count = search_results_count
+    return date_ranges
 
 
-def process_library_manager_index(json_data):
-    """Parse the Arduino Library Manager index's JSON and add all libraries to the list.
-    This function is split out from populate_table() for unit tests.
+def save_search_segments(search_query, fork_argument, search_segments):
+    """Save the date ranges and result counts of the search segments to the state folder for use by the next run.
+
+    Keyword arguments:
+    search_query -- the search query
+    fork_argument -- fork filter
+    search_segments -- list of tuples of the date range and its number of search results
     """
-    # step through all the libraries in the Library Manager index
-    last_repository_url = ""
-    for library_data in json_data["libraries"]:
-        # get the repository URL as listed in the Library Manager index (which may be different from the GitHub URL if
-        # the repository has been renamed, due to GitHub automatically redirecting the URL
-        repository_url = library_data["repository"]
-        # don't add duplicate rows for libraries with multiple tags. Although I check for duplicates in populate_row(),
-        # this prevents unnecessary GitHub API calls.
-        if repository_url != last_repository_url:
-            # for now I'm only listing GitHub repos
-            if repository_url.split('/')[2] == "github.com":
-                repository_name = repository_url.split('/')[3] + '/' + repository_url.split('/')[4][:-4]
-                populate_row(repository_object=get_github_api_response(request="repos/" + repository_name)["json_data"],
-                             in_library_manager=True,
-                             verify=False,
-                             log_verification_failures=False)
-            last_repository_url = repository_url
+    if cache_folder is None:
+        return
+    search_segments_path = state_folder + "/" + search_segments_filename
+    try:
+        with open(file=search_segments_path, mode="r", encoding=file_encoding) as search_segments_file:
+            saved_search_segments = json.load(search_segments_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        saved_search_segments = {}
 
+    saved_segments = []
+    for date_range, search_results_count in search_segments:
+        saved_segments.append([None if date_range[0] is None else date_range[0].isoformat(),
+                               None if date_range[1] is None else date_range[1].isoformat(),
+                               search_results_count])
+    saved_search_segments[search_query + "+fork:" + fork_argument] = saved_segments
 
-def search_repositories(search_query, created_argument_list, fork_argument, verify, log_verification_failures):
-    """Use the GitHub API to search for repositories and pass the results to populate_row()
-    (see: https://developer.github.com/v3/search/#search-repositories)
+    with open(file=search_segments_path + ".tmp", mode="w", encoding=file_encoding) as search_segments_file:
+        json.dump(saved_search_segments, search_segments_file, indent=2)
+    os.replace(search_segments_path + ".tmp", search_segments_path)
+
+
+def get_search_segment_repository_objects(search_query, created_argument, fork_argument, first_page):
+    """Fetch all the search results pages of a created date segment and return the list of the repository objects,
+    reduced by get_compact_repository_object().
 
     Keyword arguments:
     search_query -- the search query
-    created_argument_list -- repository creation date range to filter results by
-                             (see: https://help.github.com/articles/understanding-the-search-syntax/#query-for-dates)
-    fork_argument -- fork filter. Valid values are "true", "false", "only".
-                     (see: https://help.github.com/articles/searching-in-forks/)
-    verify -- whether to verify that results contain an Arduino library (allowed values: True, False)
-    log_verification_failures -- whether to save a list of the repositories that failed verification
+    created_argument -- repository creation date range to filter results by
+    fork_argument -- fork filter
+    first_page -- the first page, already fetched by plan_search_segments(). None if it must be fetched.
     """
-    for created_argument in created_argument_list:
-        search_results_count = 0
-        # handle pagination
-        page_number = 1
-        additional_pages = True
-        while additional_pages:
-            # sort by forks because this is the least frequently changing sort property (can't sort by creation date)
-            # changing properties (esp. updated) will cause the search results order to change between pages,
-            # leading to duplicates and skips
-
-            do_github_api_request_return = ()
-            json_data = ()
-
-            incomplete_results = True
-            search_retry_count = 0
-            while incomplete_results and search_retry_count < maximum_search_retries:
-                search_retry_count += 1
-                do_github_api_request_return = get_github_api_response(request="search/repositories",
-                                                                       request_parameters="q=" + search_query +
-                                                                                          "+created:" +
-                                                                                          created_argument +
-                                                                                          "+fork:" + fork_argument +
-                                                                                          "&sort=forks&order=desc",
-                                                                       page_number=page_number)
-                json_data = dict(do_github_api_request_return["json_data"])
-
-                if json_data["incomplete_results"]:
-                    # I have seen this happen, then on the next try it was fine
-                    print("Search results are incomplete due to a timeout. Retrying. " +
-                          "See: https://developer.github.com/v3/search/#timeouts-and-incomplete-results")
-                    time.sleep(search_retry_delay)
-                elif json_data["total_count"] == 0:
-                    # I'm don't know if this would occur for any reason that would be resolved by retrying
-                    print("Search returned 0 results. Retrying.")
-                    # don't delay since this causes a super long delay during the unit test and it's not clear this
-                    # retry even serves any purpose
-                else:
-                    incomplete_results = False
+    repository_objects = []
+    page_number = 1
+    page = first_page
+    while True:
+        if page is None:
+            page = get_search_page(search_query=search_query,
+                                   created_argument=created_argument,
+                                   fork_argument=fork_argument,
+                                   page_number=page_number)
+        json_data, additional_pages = page
+        for repository_object in json_data["items"]:
+            repository_objects.append(get_compact_repository_object(repository_object=repository_object))
+        if not additional_pages:
+            return repository_objects
+        page_number += 1
+        page = None
 
-            additional_pages = do_github_api_request_return["additional_pages"]
-            page_number += 1
-            for repository_object in json_data["items"]:
-                search_results_count += 1
 
-                populate_row(repository_object=repository_object,
-                             in_library_manager=False,
-                             verify=verify,
-                             log_verification_failures=log_verification_failures)
+def get_search_page(search_query, created_argument, fork_argument, page_number):
+    """Fetch a search results page. Return a tuple of the JSON data and whether more pages remain.
 
-            if not additional_pages and search_results_count < json_data["total_count"]:
-                # GitHub's search API provides data for a maximum of 1000 search results
-                # https://developer.github.com/v3/search/#about-the-search-api
-                # to work around this I have broken the searches into created date segments
-                # but these will need to be updated over time as more repositories are added that match the searches
-                logger.warning(
-                    "Maximum search results count reached for search segment: " + created_argument +
-                    " in query: " + search_query
-                )
+    Keyword arguments:
+    search_query -- the search query
+    created_argument -- repository creation date range to filter results by
+    fork_argument -- fork filter
+    page_number -- the page to fetch
+    """
+    # sort by forks because this is the least frequently changing sort property (can't sort by creation date)
+    # changing properties (esp. updated) will cause the search results order to change between pages,
+    # leading to duplicates and skips
+
+    do_github_api_request_return = ()
+    json_data = ()
+
+    with metrics.stage(name="search: " + search_query):
+        retry_policy = RetryPolicy()
+        while True:
+            do_github_api_request_return = get_github_api_response(request="search/repositories",
+                                                                   request_parameters="q=" + search_query +
+                                                                                      "+created:" +
+                                                                                      created_argument +
+                                                                                      "+fork:" + fork_argument +
+                                                                                      "&sort=forks&order=desc",
+                                                                   page_number=page_number)
+            json_data = dict(do_github_api_request_return["json_data"])
 
-        logger.info("Found " + str(search_results_count) +
-                    " search results for search segment: " + created_argument +
-                    " in query: " + search_query
-                    )
+            if json_data["incomplete_results"]:
+                # I have seen this happen, then on the next try it was fine
+                print("Search results are incomplete due to a timeout. " +
+                      "See: https://developer.github.com/v3/search/#timeouts-and-incomplete-results")
+                if not retry_policy.retry(error_class="incomplete_search"):
+                    break
+            elif json_data["total_count"] == 0 and page_number > 1:
+                # the earlier pages had results so this is a glitch
+                # the first page of a date segment can legitimately have no results so that is not retried
+                print("Search returned 0 results.")
+                if not retry_policy.retry(error_class="empty_search"):
+                    break
+            else:
+                break
+
+    return json_data, do_github_api_request_return["additional_pages"]
 
 
-def populate_row(repository_object, in_library_manager, verify, log_verification_failures):
+def populate_row(repository_object, in_library_manager, verify, log_verification_failures, source_count_increment=1,
+                 library_manager_data=None):
     """Populate a row of the list with data for the repository.
+    If the worker pool has been started, the repository is handed to a worker after the blacklist and duplicate checks
+    and the row is added to the table once the worker has finished.
 
     Keyword arguments:
     repository_object -- object containing the GitHub API data for a repository
     in_library_manager -- value to store in the "In Library Manager" column (True, False)
     verify -- whether to verify the repository contains an Arduino library (allowed values: True, False)
     log_verification_failures -- whether to save a list of the repositories that failed verification
+    source_count_increment -- number of sources the repository was found in (default value: 1)
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases() (default value: None)
     """
-    global table
+    # the counters are only accessed from the thread running the sources so they don't need to be protected by a lock
     global source_count
     global non_blacklisted_source_count
     global non_blacklisted_unique_source_count
 
     logger.info("Attempting to populate row for: " + repository_object["html_url"])
 
-    source_count += 1
+    source_count += source_count_increment
+
+    # check if it's already on the list
+    # this is done before the blacklist checks since it's cheaper and many of the sources are duplicates
+    if repository_is_listed(repository_url=repository_object["html_url"]):
+        # it's already on the list
+        logger.info("Skipping duplicate: " + repository_object["html_url"])
+        # it was not skipped as blacklisted when it was added to the list
+        non_blacklisted_source_count += source_count_increment
+        return
 
     # check if the repo name is blacklisted
     if verify:
-        repository_name_is_blacklisted = False
-        for blacklisted_repository_name_regex in repository_name_blacklist:
-            blacklisted_repository_name_regex = re.compile(blacklisted_repository_name_regex,
-                                                           flags=re.IGNORECASE
-                                                           )
-            if blacklisted_repository_name_regex.fullmatch(repository_object["name"]):
-                repository_name_is_blacklisted = True
-                break
-        if repository_name_is_blacklisted:
+        if repository_name_blacklist_matcher.matches(name=repository_object["name"]):
             # skip this repository
             logger.info("Skipping blacklisted repository name: " + repository_object["html_url"])
             return
@@ -862,34 +3558,184 @@ def populate_row(repository_object, in_library_manager, verify, log_verification
                 )
                 return
 
-    non_blacklisted_source_count += 1
+    non_blacklisted_source_count += source_count_increment
+    non_blacklisted_unique_source_count += 1
 
-    # check if it's already on the list
-    for readRow in table:
-        if readRow[Column.repository_url] == repository_object["html_url"]:
-            # it's already on the list
-            logger.info("Skipping duplicate: " + repository_object["html_url"])
-            return
+    if repository_executor is None:
+        add_repository_row(repository_object=repository_object,
+                           in_library_manager=in_library_manager,
+                           verify=verify,
+                           log_verification_failures=log_verification_failures,
+                           library_manager_data=library_manager_data)
+    else:
+        submit_repository(repository_object=repository_object,
+                          in_library_manager=in_library_manager,
+                          verify=verify,
+                          log_verification_failures=log_verification_failures,
+                          library_manager_data=library_manager_data)
+
+
+def repository_is_listed(repository_url):
+    """Return whether the repository is already on the list.
+    If the repository is still being processed by a worker, wait for it to finish so that the result is the same as it
+    would be in a serial run (the repository might yet fail verification).
+
+    Keyword arguments:
+    repository_url -- the repository's html_url
+    """
+    repository_key = get_repository_key(repository_url=repository_url)
+    with table_lock:
+        pending_future = pending_repositories.get(repository_key)
+    if pending_future is not None:
+        concurrent.futures.wait([pending_future])
+
+    with table_lock:
+        return repository_key in table_index
+
+
+def get_repository_key(repository_url):
+    """Return the normalized form of the repository URL used to identify the repository in the table index.
+    GitHub repository names are not case sensitive and the URL may have a trailing slash or .git suffix.
+
+    Keyword arguments:
+    repository_url -- the repository's URL
+    """
+    repository_key = repository_url.strip().lower().rstrip("/")
+    if repository_key.endswith(".git"):
+        repository_key = repository_key[:-4]
+    return repository_key
+
+
+def add_row_to_table(row_list):
+    """Append the row to the spool file and the table and add it to the table index.
+
+    Keyword arguments:
+    row_list -- the populated row
+    """
+    with table_lock:
+        # the spool file is flushed immediately so the rows are not lost if the script is interrupted
+        csv.writer(spool_file).writerow(row_list)
+        spool_file.flush()
+        index_row(row_list=row_list)
+
+
+def index_row(row_list):
+    """Add the row to the table index, and to the table unless low memory mode is enabled. Must be called with
+    table_lock acquired.
+
+    Keyword arguments:
+    row_list -- the populated row
+    """
+    repository_key = get_repository_key(repository_url=row_list[Column.repository_url])
+    if enable_low_memory:
+        table_index[repository_key] = None
+    else:
+        # the rows are kept in the compact form
+        row = Row(row_list=row_list)
+        table.append(row)
+        table_index[repository_key] = row
+
+
+def submit_repository(repository_object, in_library_manager, verify, log_verification_failures,
+                      library_manager_data=None):
+    """Hand the repository to the worker pool. Block while the pool's queue is full.
+
+    Keyword arguments:
+    repository_object -- object containing the GitHub API data for a repository
+    in_library_manager -- value to store in the "In Library Manager" column (True, False)
+    verify -- whether to verify the repository contains an Arduino library (allowed values: True, False)
+    log_verification_failures -- whether to save a list of the repositories that failed verification
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases() (default value: None)
+    """
+    if repository_exception is not None:
+        # a worker failed so there is no point in continuing
+        finish_repository_processing()
+
+    repository_executor_slots.acquire()
+    future = repository_executor.submit(add_repository_row,
+                                        repository_object=repository_object,
+                                        in_library_manager=in_library_manager,
+                                        verify=verify,
+                                        log_verification_failures=log_verification_failures,
+                                        library_manager_data=library_manager_data)
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    with table_lock:
+        pending_repositories[repository_key] = future
+    future.add_done_callback(
+        lambda done_future: repository_processing_done(repository_key=repository_key, future=done_future)
+    )
+
+
+def repository_processing_done(repository_key, future):
+    """Called by the worker pool when a repository has been processed.
+
+    Keyword arguments:
+    repository_key -- the repository's key, as returned by get_repository_key()
+    future -- the future of the finished add_repository_row() call
+    """
+    global repository_exception
+    with table_lock:
+        if pending_repositories.get(repository_key) is future:
+            del pending_repositories[repository_key]
+        if future.exception() is not None and repository_exception is None:
+            repository_exception = future.exception()
+    repository_executor_slots.release()
 
-    non_blacklisted_unique_source_count += 1
 
+@measure_stage(name="repository_data")
+def add_repository_row(repository_object, in_library_manager, verify, log_verification_failures,
+                       library_manager_data=None):
+    """Gather the repository's data, verify it contains a library, and add the row to the table.
+    This is the part of populate_row() done by the workers when the worker pool has been started.
+
+    Keyword arguments:
+    repository_object -- object containing the GitHub API data for a repository
+    in_library_manager -- value to store in the "In Library Manager" column (True, False)
+    verify -- whether to verify the repository contains an Arduino library (allowed values: True, False)
+    log_verification_failures -- whether to save a list of the repositories that failed verification
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases() (default value: None)
+    """
     # initialize the row list
     row_list = [""] * Column.count
 
-    library_folder = find_library_folder(repository_object=repository_object,
-                                         row_list=row_list,
-                                         verify=verify)
+    previous_row = get_reusable_previous_row(repository_object=repository_object, verify=verify)
+    if previous_row is not None:
+        # the repository hasn't been pushed to since the previous list was generated so the library folder and metadata
+        # found then are still valid
+        logger.info("Reusing library data from the previous list")
+        for column in incremental_reused_columns:
+            row_list[column] = previous_row[column]
+        library_folder = previous_row[Column.library_path]
+    elif library_index_metadata_is_current(repository_object=repository_object,
+                                           library_manager_data=library_manager_data):
+        # the repository hasn't been pushed to since its library.properties was verified to be the newest release's so
+        # it is the same as the metadata in the Library Manager index. Libraries in the Library Manager are always in
+        # the repository root.
+        logger.info("Using the library metadata from the Library Manager index")
+        fill_library_index_metadata(row_list=row_list, newest_release=library_manager_data["newest_release"])
+        parse_library_dot_json(metadata_folder="/", repository_object=repository_object, row_list=row_list)
+        library_folder = "/"
+    else:
+        library_folder = find_library_folder(repository_object=repository_object,
+                                             row_list=row_list,
+                                             verify=verify)
+        if use_library_index_metadata and library_manager_data is not None:
+            record_verified_library_release(repository_object=repository_object,
+                                            library_manager_data=library_manager_data,
+                                            row_list=row_list)
     if library_folder is None:
         if verify:
             # verification is required and a library was not found so skip the repo
             logger.info("Skipping (library verification failed)")
             if log_verification_failures:
                 # add the repo's URL to the failed verification list
-                with open(output_folder_name + "/" + verification_failed_list_filename,
-                          mode="a",
-                          encoding=file_encoding,
-                          newline=''
-                          ) as failed_verification_list:
+                with output_file_lock, open(output_folder_name + "/" + verification_failed_list_filename,
+                                            mode="a",
+                                            encoding=file_encoding,
+                                            newline=''
+                                            ) as failed_verification_list:
                     failed_verification_list.write(str(repository_object["html_url"]) + '\n')
             return
         library_folder = ""
@@ -903,40 +3749,35 @@ def populate_row(repository_object, in_library_manager, verify, log_verification
     row_list[Column.archived] = str(repository_object["archived"])
     row_list[Column.is_fork] = str(repository_object["fork"])
 
-    if repository_object["fork"]:
-        try:
-            row_list[Column.fork_of] = str(repository_object["parent"]["full_name"])
-        except KeyError:
-            # the repository data in the search results is missing some items:
-            # "parent", "source", "network_count", "subscribers_count"
-            # I need the "parent" object to get the fork parent so I need to to a whole other API request to get the
-            # full repository object to pass to populate_row
-            # this is not necessary for the repos from the Library Manager index since their repository_object already
-            # comes from the repos API
-            do_github_api_request_return = get_github_api_response(request="repos/" +
-                                                                           repository_object["full_name"]
-                                                                   )
-            # replace search API version of repository_object with the full repos API version
-            repository_object = dict(do_github_api_request_return["json_data"])
-            row_list[Column.fork_of] = str(repository_object["parent"]["full_name"])
+    if repository_object["fork"] and previous_row is None:
+        row_list[Column.fork_of] = get_fork_parent(repository_object=repository_object)
 
     row_list[Column.last_push_date] = str(repository_object["pushed_at"])
     row_list[Column.fork_count] = str(repository_object["forks_count"])
     row_list[Column.star_count] = str(repository_object["stargazers_count"])
-    row_list[Column.contributor_count] = get_contributor_count(repository_object=repository_object)
-
-    do_github_api_request_return = get_github_api_response(request="repos/" +
-                                                                   repository_object["full_name"] +
-                                                                   "/commits/" +
-                                                                   repository_object["default_branch"] +
-                                                                   "/status"
-                                                           )
-    status_data = dict(do_github_api_request_return["json_data"])
-    if str(status_data["state"]) != "pending":
-        row_list[Column.tip_status] = str(status_data["state"])
+    if previous_row is not None and not refresh_volatile_columns:
+        # save the API requests
+        row_list[Column.contributor_count] = previous_row[Column.contributor_count]
+        row_list[Column.tip_status] = previous_row[Column.tip_status]
     else:
-        # the term "pending" used by GitHub for commits with no status would be confusing
-        row_list[Column.tip_status] = ""
+        row_list[Column.contributor_count] = get_contributor_count(repository_object=repository_object)
+
+        if "combined_status" in repository_object:
+            # the status was already fetched via the GraphQL API
+            status_data = repository_object["combined_status"]
+        else:
+            do_github_api_request_return = get_github_api_response(request="repos/" +
+                                                                           repository_object["full_name"] +
+                                                                           "/commits/" +
+                                                                           repository_object["default_branch"] +
+                                                                           "/status"
+                                                                   )
+            status_data = dict(do_github_api_request_return["json_data"])
+        if str(status_data["state"]) != "pending":
+            row_list[Column.tip_status] = str(status_data["state"])
+        else:
+            # the term "pending" used by GitHub for commits with no status would be confusing
+            row_list[Column.tip_status] = ""
 
     row_list[Column.repository_license] = get_repository_license(repository_object=repository_object)
     row_list[Column.repository_language] = str(repository_object["language"])
@@ -947,6 +3788,8 @@ def populate_row(repository_object, in_library_manager, verify, log_verification
     # comma-separated list of topics
     row_list[Column.github_topics] = ', '.join(repository_object["topics"])
     row_list[Column.in_library_manager_index] = str(in_library_manager)
+    if library_manager_data is not None:
+        row_list[Column.library_manager_release_count] = str(library_manager_data["release_count"])
     # Not currently implemented. Neither the PlatformIO API or platformio lib provide the URL of the library so I'm not
     # sure this will even be possible.
     # row_list[Column.in_platformio_library_registry] =
@@ -964,9 +3807,101 @@ def populate_row(repository_object, in_library_manager, verify, log_verification
         print(row_list[Column.repository_url])
 
     # add the new row to the table
-    table.append(row_list)
+    add_row_to_table(row_list=row_list)
+
+
+def library_index_metadata_is_current(repository_object, library_manager_data):
+    """Return whether the Library Manager metadata columns of the row can be filled from the Library Manager index. This
+    is the case when it is enabled and the repository hasn't been pushed to since its library.properties was verified
+    to be the newest release's by record_verified_library_release().
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases(). None if the repository is not in the index.
+    """
+    if not use_library_index_metadata or library_manager_data is None:
+        return False
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    version = str(library_manager_data["newest_release"]["version"])
+    with verified_library_releases_lock:
+        verified_release = verified_library_releases.get(repository_key)
+    if verified_release is None or verified_release["version"] != version:
+        # this release hasn't been verified so library.properties must be fetched
+        return False
+    return str(repository_object["pushed_at"]) == verified_release["pushed_at"]
+
+
+def record_verified_library_release(repository_object, library_manager_data, row_list):
+    """Record the push time of the repository if the version in its library.properties file is the version of the
+    newest release of the library in the Library Manager index, so the release's metadata can be used by the next runs
+    as long as the repository isn't pushed to. Otherwise, the repository has changed since the release, so the metadata
+    in the index is outdated.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    library_manager_data -- the library's releases in the Library Manager index, as returned by
+                            group_library_releases()
+    row_list -- the list populated by find_library_folder()
+    """
+    version = str(library_manager_data["newest_release"]["version"])
+    if row_list[Column.library_manager_version].strip() != version:
+        return
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    with verified_library_releases_lock:
+        verified_library_releases[repository_key] = {"version": version,
+                                                     "pushed_at": str(repository_object["pushed_at"])}
+
+
+def fill_library_index_metadata(row_list, newest_release):
+    """Fill the Library Manager metadata columns of the row from the newest release of the library in the Library
+    Manager index.
+
+    Keyword arguments:
+    row_list -- the list being populated by populate_row()
+    newest_release -- the newest release, as returned by group_library_releases()
+    """
+    for field, column in library_index_release_columns.items():
+        value = newest_release.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            # the architectures are a list in the index but comma-separated in library.properties
+            value = ",".join(str(item) for item in value)
+        row_list[column] = str(value)
+
+
+def load_verified_library_releases():
+    """Load the verified library releases recorded by the previous runs from the state folder."""
+    global verified_library_releases
+    verified_library_releases = {}
+    if cache_folder is None:
+        return
+    try:
+        with open(file=state_folder + "/" + verified_library_releases_filename,
+                  mode="r",
+                  encoding=file_encoding
+                  ) as verified_library_releases_file:
+            verified_library_releases = json.load(verified_library_releases_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        pass
+
+
+def save_verified_library_releases():
+    """Save the verified library releases to the state folder for use by the next run."""
+    if cache_folder is None:
+        return
+    verified_library_releases_path = state_folder + "/" + verified_library_releases_filename
+    with verified_library_releases_lock:
+        with open(file=verified_library_releases_path + ".tmp",
+                  mode="w",
+                  encoding=file_encoding
+                  ) as verified_library_releases_file:
+            json.dump(verified_library_releases, verified_library_releases_file)
+    os.replace(verified_library_releases_path + ".tmp", verified_library_releases_path)
 
 
+@measure_stage(name="verification")
 def find_library_folder(repository_object, row_list, verify):
     """Scan a repository to try to find the location of the library.
     Return the folder name where the library was found or None if not found.
@@ -1001,27 +3936,24 @@ def find_library_folder(repository_object, row_list, verify):
     # metadata file was not found in the repo root folder
 
     if not verify:
-        # attempt a blind attempt to open /{repo name}.h to reduce API requests
-        url = normalize_url(url="https://raw.githubusercontent.com/" +
-                                repository_object["full_name"] + "/" +
-                                repository_object["default_branch"] + "/" +
-                                repository_object["name"] + ".h"
-                            )
-        logger.info("Opening URL: " + url)
-        try:
-            with urllib.request.urlopen(url):
-                pass
+        # attempt a blind attempt to find /{repo name}.h to reduce API requests
+        if raw_file_exists(repository_object=repository_object, path=repository_object["name"] + ".h"):
             # header file found
             return "/"
-        except (urllib.error.HTTPError, http.client.RemoteDisconnected) as exception:
-            # don't bother retrying on possibly recoverable exceptions
-            logger.info(str(exception.__class__.__name__) + ": " + str(exception))
-            pass
+
+    tree_folder_listings = None
+    if enable_git_tree:
+        tree_folder_listings = get_tree_folder_listings(repository_object=repository_object)
 
     # get a listing of the root folder contents
     page_number = 1
-    additional_pages = True
-    root_folder_listing = []
+    if tree_folder_listings is None:
+        additional_pages = True
+        root_folder_listing = []
+    else:
+        # the listing is already known so no contents API requests are needed
+        additional_pages = False
+        root_folder_listing = tree_folder_listings["/"]
     while additional_pages:
         try:
             do_github_api_request_return = get_github_api_response(request="repos/" +
@@ -1059,20 +3991,17 @@ def find_library_folder(repository_object, row_list, verify):
     for root_folder_item in root_folder_listing:
         if root_folder_item["type"] == "dir":
             # skip blacklisted subfolder names
-            folder_is_blacklisted = False
-            for blacklisted_subfolder_regex in library_subfolder_blacklist:
-                blacklisted_subfolder_regex = re.compile(blacklisted_subfolder_regex, flags=re.IGNORECASE)
-                if blacklisted_subfolder_regex.fullmatch(root_folder_item["name"]):
-                    # the folder name matched the blacklist regular expression
-                    folder_is_blacklisted = True
-                    break
-            if folder_is_blacklisted:
+            if library_subfolder_blacklist_matcher.matches(name=root_folder_item["name"]):
                 continue
 
             # get a listing of the subfolder contents
             page_number = 1
-            additional_pages = True
-            subfolder_listing = []
+            if tree_folder_listings is None:
+                additional_pages = True
+                subfolder_listing = []
+            else:
+                additional_pages = False
+                subfolder_listing = tree_folder_listings.get(root_folder_item["name"], [])
             while additional_pages:
                 try:
                     do_github_api_request_return = get_github_api_response(request="repos/" +
@@ -1096,27 +4025,214 @@ def find_library_folder(repository_object, row_list, verify):
 
             if find_library(folder_listing=subfolder_listing, verify=verify):
                 # library was found in this folder
-                # parse metadata files if present
+                # parse metadata files if present. The listing shows which are present so no requests are done for
+                # the others.
                 parse_library_dot_properties(metadata_folder=root_folder_item["name"],
                                              repository_object=repository_object,
-                                             row_list=row_list)
+                                             row_list=row_list,
+                                             folder_listing=subfolder_listing)
                 parse_library_dot_json(metadata_folder=root_folder_item["name"],
                                        repository_object=repository_object,
-                                       row_list=row_list)
+                                       row_list=row_list,
+                                       folder_listing=subfolder_listing)
                 return root_folder_item["name"]
             else:
                 # add the folder name to the list of folders found to not contain libraries
-                with open(output_folder_name + "/" + non_library_folders_list_filename,
-                          mode="a",
-                          encoding=file_encoding,
-                          newline=''
-                          ) as non_library_folders_list:
+                with output_file_lock, open(output_folder_name + "/" + non_library_folders_list_filename,
+                                            mode="a",
+                                            encoding=file_encoding,
+                                            newline=''
+                                            ) as non_library_folders_list:
                     non_library_folders_list.write(str(root_folder_item["name"]) + '\n')
 
     # library folder not found
     return None
 
 
+def get_raw_file_path(folder, filename):
+    """Return the path of the file in the repository.
+
+    Keyword arguments:
+    folder -- the folder of the repository containing the file ("/" for the root folder)
+    filename -- the name of the file
+    """
+    if folder == "/":
+        return filename
+    return folder + "/" + filename
+
+
+def get_raw_file_url(repository_object, path):
+    """Return the URL of the raw content of the file on the repository's default branch.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    path -- the path of the file in the repository
+    """
+    return normalize_url(url=github_raw_url + "/" +
+                         repository_object["full_name"] + "/" +
+                         repository_object["default_branch"] + "/" +
+                         path)
+
+
+def raw_file_is_missing(repository_object, path, folder_listing=None):
+    """Return whether the file is known to be missing from the repository, either because it's not in the listing of
+    its folder or because it was found to be missing by a previous request and the repository hasn't been pushed to
+    since then.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    path -- the path of the file in the repository
+    folder_listing -- the listing of the file's folder, if it has already been loaded (default value: None)
+    """
+    if folder_listing is not None:
+        filename = path.rsplit("/", 1)[-1]
+        for folder_item in folder_listing:
+            if folder_item["name"] == filename:
+                return False
+        return True
+
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    with missing_raw_files_lock:
+        missing_files = missing_raw_files.get(repository_key)
+        return (missing_files is not None and
+                missing_files["pushed_at"] == str(repository_object["pushed_at"]) and
+                missing_files["default_branch"] == repository_object["default_branch"] and
+                path in missing_files["paths"])
+
+
+def add_missing_raw_file(repository_object, path):
+    """Record that the file is missing from the repository so it won't be requested again until the repository has been
+    pushed to.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    path -- the path of the file in the repository
+    """
+    repository_key = get_repository_key(repository_url=repository_object["html_url"])
+    with missing_raw_files_lock:
+        missing_files = missing_raw_files.get(repository_key)
+        if (missing_files is None or
+                missing_files["pushed_at"] != str(repository_object["pushed_at"]) or
+                missing_files["default_branch"] != repository_object["default_branch"]):
+            # the files recorded before the last push might have been added since then
+            missing_files = {"pushed_at": str(repository_object["pushed_at"]),
+                             "default_branch": repository_object["default_branch"],
+                             "paths": []}
+            missing_raw_files[repository_key] = missing_files
+        if path not in missing_files["paths"]:
+            missing_files["paths"].append(path)
+
+
+def raw_file_exists(repository_object, path):
+    """Return whether the file exists in the repository. A HEAD request is used so the content is not downloaded.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    path -- the path of the file in the repository
+    """
+    if raw_file_is_missing(repository_object=repository_object, path=path):
+        logger.info("Skipping file known to be missing: " + path)
+        return False
+    url = get_raw_file_url(repository_object=repository_object, path=path)
+    logger.info("Probing URL: " + url)
+    try:
+        with open_url(url=url, method="HEAD"):
+            pass
+        return True
+    except (urllib.error.HTTPError, http.client.RemoteDisconnected) as exception:
+        # don't bother retrying on possibly recoverable exceptions
+        logger.info(str(exception.__class__.__name__) + ": " + str(exception))
+        if isinstance(exception, urllib.error.HTTPError) and exception.code == 404:
+            add_missing_raw_file(repository_object=repository_object, path=path)
+        return False
+
+
+def load_missing_raw_files():
+    """Load the raw files found to be missing by the previous run from the state folder."""
+    global missing_raw_files
+    missing_raw_files = {}
+    if cache_folder is None:
+        return
+    try:
+        with open(file=state_folder + "/" + missing_raw_files_filename,
+                  mode="r",
+                  encoding=file_encoding
+                  ) as missing_raw_files_file:
+            missing_raw_files = json.load(missing_raw_files_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        pass
+
+
+def save_missing_raw_files():
+    """Save the raw files found to be missing to the state folder for use by the next run."""
+    if cache_folder is None:
+        return
+    missing_raw_files_path = state_folder + "/" + missing_raw_files_filename
+    with missing_raw_files_lock:
+        with open(file=missing_raw_files_path + ".tmp", mode="w", encoding=file_encoding) as missing_raw_files_file:
+            json.dump(missing_raw_files, missing_raw_files_file)
+    os.replace(missing_raw_files_path + ".tmp", missing_raw_files_path)
+
+
+def get_tree_folder_listings(repository_object):
+    """Get the listings of the root folder and its subfolders with a single Git trees API request.
+    Return a dictionary of the listings in the format of the contents API (folder name ("/" for the root): listing), or
+    None if the tree could not be loaded completely, in which case the contents API must be used.
+
+    Keyword arguments:
+    repository_object -- the repository's JSON
+    """
+    try:
+        do_github_api_request_return = get_github_api_response(request="repos/" +
+                                                                       repository_object["full_name"] +
+                                                                       "/git/trees/" +
+                                                                       repository_object["default_branch"],
+                                                               request_parameters="recursive=1")
+    except (json.decoder.JSONDecodeError, urllib.error.HTTPError, TimeoutError) as exception:
+        # e.g. the repository is empty
+        logger.info("Unable to load Git tree: " + str(exception.__class__.__name__) + ": " + str(exception))
+        return None
+
+    json_data = dict(do_github_api_request_return["json_data"])
+    if json_data["truncated"]:
+        # the tree is too large to be returned in a single response so items might be missing
+        logger.info("Git tree is truncated")
+        return None
+
+    return get_folder_listings_from_tree(tree=json_data["tree"])
+
+
+def get_folder_listings_from_tree(tree):
+    """Convert the items of a recursive Git tree to the contents API listings of the root folder and its subfolders.
+    Return a dictionary of the listings (folder name ("/" for the root): listing).
+
+    Keyword arguments:
+    tree -- the "tree" list from the Git trees API response
+    """
+    folder_listings = {"/": []}
+    for tree_item in tree:
+        path_components = tree_item["path"].split('/')
+        if len(path_components) > 2:
+            # only the root folder and its subfolders are searched for the library
+            continue
+
+        if tree_item["type"] == "tree":
+            item_type = "dir"
+        elif tree_item["mode"] == git_tree_symlink_mode:
+            item_type = "symlink"
+        else:
+            # the contents API lists submodules as files
+            item_type = "file"
+
+        if len(path_components) == 1:
+            folder_name = "/"
+        else:
+            folder_name = path_components[0]
+        folder_listings.setdefault(folder_name, []).append({"name": path_components[-1], "type": item_type})
+
+    return folder_listings
+
+
 def find_library(folder_listing, verify):
     """Determine whether the folder contains a library.
 
@@ -1147,35 +4263,21 @@ def find_library(folder_listing, verify):
                 metadata_file_found = True
             elif folder_item["name"] == "keywords.txt":
                 keywords_dot_txt_found = True
-            else:
-                for header_file_extension in header_file_extensions:
-                    if folder_item["name"].endswith(str(header_file_extension)):
-                        header_file_found = True
+            elif folder_item["name"].endswith(header_file_extension_tuple):
+                header_file_found = True
         # these checks are only required for verification
         if verify:
             # check for sketch files in repo root
             if folder_item["type"] == "file":
-                if (
-                        folder_item["name"].endswith(".ino") or
-                        folder_item["name"].endswith(".pde")
-                ):
+                if folder_item["name"].endswith((".ino", ".pde")):
                     sketch_file_found = True
 
-                is_administrative_file = False
-                for administrative_file_regex in administrative_file_whitelist:
-                    administrative_file_regex = re.compile(administrative_file_regex, flags=re.IGNORECASE)
-                    if administrative_file_regex.fullmatch(folder_item["name"]):
-                        is_administrative_file = True
-                        break
-                if not is_administrative_file:
+                if not administrative_file_whitelist_matcher.matches(name=folder_item["name"]):
                     only_administrative_files_found = False
             # check for examples folder in repo root
             elif folder_item["type"] == "dir":
-                for examples_folder_name_regex in examples_folder_names:
-                    examples_folder_name_regex = re.compile(examples_folder_name_regex, flags=re.IGNORECASE)
-                    if examples_folder_name_regex.fullmatch(folder_item["name"]):
-                        examples_folder_found = True
-                        break
+                if examples_folder_names_matcher.matches(name=folder_item["name"]):
+                    examples_folder_found = True
 
     if verify:
         # to pass verification, the repo must meet one of the following:
@@ -1210,7 +4312,8 @@ def find_library(folder_listing, verify):
             return False
 
 
-def parse_library_dot_properties(metadata_folder, repository_object, row_list):
+@measure_stage(name="metadata")
+def parse_library_dot_properties(metadata_folder, repository_object, row_list, folder_listing=None):
     """Attempt to open the file library.properties from the specified folder of the repository.
     If successful, parse the contents, fill cells of the row with the data, return True.
     If unsuccessful, return False.
@@ -1219,19 +4322,18 @@ def parse_library_dot_properties(metadata_folder, repository_object, row_list):
     metadata_folder -- the folder of the repository containing library.properties
     repository_object -- the JSON object containing the repository data
     row_list -- the list to populate with data from the parsed library.properties
+    folder_listing -- the listing of the folder, if it has already been loaded (default value: None)
     """
+    path = get_raw_file_path(folder=metadata_folder, filename="library.properties")
+    if raw_file_is_missing(repository_object=repository_object, path=path, folder_listing=folder_listing):
+        return False
     # library.properties is not JSON so I can't use my functions
-    retry_count = 0
-    while retry_count <= maximum_urlopen_retries:
-        retry_count += 1
-        url = normalize_url(url="https://raw.githubusercontent.com/" +
-                                repository_object["full_name"] + "/" +
-                                repository_object["default_branch"] + "/" +
-                                metadata_folder +
-                                "/library.properties")
+    retry_policy = RetryPolicy()
+    while True:
+        url = get_raw_file_url(repository_object=repository_object, path=path)
         logger.info("Opening URL: " + url)
         try:
-            with urllib.request.urlopen(url) as url_data:
+            with open_url(url=url) as url_data:
                 # step through each line of library.properties
                 for line in url_data.read().decode(file_encoding, "ignore").splitlines():
                     # split the line by the first =
@@ -1260,11 +4362,14 @@ def parse_library_dot_properties(metadata_folder, repository_object, row_list):
                             row_list[Column.library_manager_architectures] = str(field_value)
             return True
         except Exception as exception:
-            if not determine_urlopen_retry(exception=exception):
+            if not determine_urlopen_retry(exception=exception, retry_policy=retry_policy):
+                if isinstance(exception, urllib.error.HTTPError) and exception.code == 404:
+                    add_missing_raw_file(repository_object=repository_object, path=path)
                 return False
 
 
-def parse_library_dot_json(metadata_folder, repository_object, row_list):
+@measure_stage(name="metadata")
+def parse_library_dot_json(metadata_folder, repository_object, row_list, folder_listing=None):
     """Attempt to open the file library.json from the specified folder of the repository.
     If successful at opening the file at opening the file, attempt to parse the contents, fill cells of the row with the
     data, return True (even if decoding the JSON failed). If unsuccessful at opening the file, return False.
@@ -1273,19 +4378,22 @@ def parse_library_dot_json(metadata_folder, repository_object, row_list):
     metadata_folder -- the folder of the repository containing library.json
     repository_object -- the JSON object containing the repository data
     row_list -- the list to populate with data from the parsed library.properties
+    folder_listing -- the listing of the folder, if it has already been loaded (default value: None)
     """
-    url = ("https://raw.githubusercontent.com/" +
-           repository_object["full_name"] + "/" +
-           repository_object["default_branch"] + "/" +
-           metadata_folder + "/library.json")
+    path = get_raw_file_path(folder=metadata_folder, filename="library.json")
+    if raw_file_is_missing(repository_object=repository_object, path=path, folder_listing=folder_listing):
+        return False
+    url = get_raw_file_url(repository_object=repository_object, path=path)
     try:
         get_json_from_url_return = get_json_from_url(url=url)
     except json.decoder.JSONDecodeError:
         logger.warning("Unable to decode JSON of: " + url)
         # library.json was found but could not be decoded so skip parsing but return True because the file does exist
         return True
-    except (urllib.error.HTTPError, TimeoutError):
+    except (urllib.error.HTTPError, TimeoutError) as exception:
         # the file doesn't exist
+        if isinstance(exception, urllib.error.HTTPError) and exception.code == 404:
+            add_missing_raw_file(repository_object=repository_object, path=path)
         return False
 
     json_data = dict(get_json_from_url_return["json_data"])
@@ -1419,9 +4527,9 @@ def get_contributor_count(repository_object):
     # so the most efficient way to get the count is to set per_page=1 and then the number of pages of results will be
     # the contributor count
     try:
-        get_json_from_url_return = get_json_from_url(url="https://api.github.com/repos/" +
-                                                         repository_object["full_name"] +
-                                                         "/contributors?per_page=1")
+        get_json_from_url_return = get_json_from_url(url=github_api_url + "/repos/" +
+                                                     repository_object["full_name"] +
+                                                     "/contributors?per_page=1")
         return str(get_json_from_url_return["page_count"])
     except (json.decoder.JSONDecodeError, TimeoutError):
         # it's unknown under which conditions this would occur
@@ -1429,32 +4537,207 @@ def get_contributor_count(repository_object):
         return ""
 
 
+def get_sort_key(row):
+    """Return the key used to order the row in the output file, according to the sort_key_columns setting. The counts
+    and last push dates are compared as numbers. The repository URL is always the last part of the key so the order is
+    the same for every run.
+
+    Keyword arguments:
+    row -- the Row to get the key of
+    """
+    sort_key = []
+    for column, descending in sort_key_columns:
+        value = row.get_value(column=column)
+        if column == Column.last_push_date:
+            value = value.translate(timestamp_separators_table)
+            if value.isdigit():
+                value = int(value)
+            else:
+                # the repository has never been pushed to
+                value = 0
+        elif column in Row.integer_columns and not isinstance(value, int):
+            # the count is unknown (e.g. the contributor count request failed)
+            value = -1
+        if descending:
+            value = -value
+        sort_key.append(value)
+    sort_key.append(row.repository_url)
+    return tuple(sort_key)
+
+
+@measure_stage(name="output")
 def create_output_file():
-    """Do final formatting of the table. Write it as a tab separated file."""
+    """Do final formatting of the table. Sort the rows as configured by set_sort_by() and write them as a tab separated
+    file.
+    """
     print("Number of sources: " + str(source_count))
     print("Number of sources with non-blacklisted repository name: " + str(non_blacklisted_source_count))
     print("Number of non-blacklisted, unique sources: " + str(non_blacklisted_unique_source_count))
-    list_count = len(table) - 1
+    list_count = len(table_index)
     print("\nNumber of libraries found: " + str(list_count))
     if list_count == 0:
         logger.warning("Canceling output file creation because the list has no libraries.")
         # no reason to write an empty file, and it might be overwriting a good one
         return
 
-    # alphabetize table by the first column
-    table.sort()
+    # the rows are sorted in chunks, which are then merged, so the whole list never needs to be in memory at once
+    # the chunks are sorted in the compact form, by the typed values of the sort keys
+    spool_path = output_folder_name + "/" + spool_filename
+    run_paths = []
+    with open(file=spool_path, mode="r", encoding=file_encoding, newline=file_newline) as spool_file:
+        spool_reader = csv.reader(spool_file)
+        while True:
+            rows = [Row(row_list=row_list) for row_list in itertools.islice(spool_reader, spool_sort_chunk_size)]
+            if not rows:
+                break
+            rows.sort(key=get_sort_key)
+            run_path = spool_path + "." + str(len(run_paths))
+            with open(file=run_path, mode="w", encoding=file_encoding, newline=file_newline) as run_file:
+                csv.writer(run_file).writerows(row.get_text_list() for row in rows)
+            run_paths.append(run_path)
+
+    run_files = [open(file=run_path, mode="r", encoding=file_encoding, newline=file_newline) for run_path in run_paths]
+    try:
+        sorted_rows = heapq.merge(*[(Row(row_list=row_list) for row_list in csv.reader(run_file))
+                                    for run_file in run_files],
+                                  key=get_sort_key)
+        # create the CSV file
+        # if the file already exists, this will clear it of previous data
+        with open(file=output_folder_name + "/" + output_filename,
+                  mode="w",
+                  encoding=file_encoding,
+                  newline=file_newline
+                  ) as csv_file:
+            # create the writer object
+            csv_writer = csv.writer(csv_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
+            # write the table to the CSV file
+            # the heading row is written separately so it's not sorted with the rest
+            csv_writer.writerow(get_heading_row())
+            csv_writer.writerows(row.get_text_list() for row in sorted_rows)
+    finally:
+        for run_file in run_files:
+            run_file.close()
+        for run_path in run_paths:
+            os.remove(run_path)
+
+
+class QueryIndex:
+    """Secondary indexes and an inverted full text index of the rows of a list, for filtering and searching them
+    without scanning every row. Each index maps a value or word to the numbers of the rows that contain it, in the
+    order of the rows.
+
+    Keyword arguments:
+    rows -- iterable of the Row objects to index, e.g. get_table()[1:] or read_list_file()
+    """
+
+    def __init__(self, rows):
+        self.rows = []
+        self.filter_indexes = {filter_name: {} for filter_name in query_filter_columns}
+        self.text_index = {}
+        for row in rows:
+            self.add_row(row=row)
+
+    def add_row(self, row):
+        """Add the row to the indexes.
+
+        Keyword arguments:
+        row -- the Row to add
+        """
+        row_number = len(self.rows)
+        self.rows.append(row)
+        for filter_name, column in query_filter_columns.items():
+            for value in self.get_filter_values(column=column, cell=row[column]):
+                self.filter_indexes[filter_name].setdefault(value, []).append(row_number)
+
+        words = set()
+        for column in query_text_columns:
+            words.update(self.get_words(text=row[column]))
+        for word in words:
+            self.text_index.setdefault(word, []).append(row_number)
+
+    @staticmethod
+    def get_filter_values(column, cell):
+        """Return the set of normalized values of the cell the row is indexed by in the secondary index of the column.
+
+        Keyword arguments:
+        column -- the column of the cell
+        cell -- the text of the cell
+        """
+        if column in query_list_columns:
+            values = cell.split(",")
+        else:
+            values = [cell]
+        return set(value.strip().lower() for value in values if value.strip() != "")
+
+    @staticmethod
+    def get_words(text):
+        """Return the list of normalized words of the text.
+
+        Keyword arguments:
+        text -- the text to split into words
+        """
+        return query_word_regular_expression.findall(text.lower())
+
+    def query(self, filters=None, search=None, limit=None):
+        """Return the list of the rows that match all the filters and contain all the words of the search text, in the
+        order of the list.
+
+        Keyword arguments:
+        filters -- dictionary of the values the rows must have (filter name: value). The filter names are the keys of
+                   query_filter_columns. (default value: None)
+        search -- the rows must contain all the words of this text in their description, Library Manager sentence or
+                  paragraph, or PlatformIO keywords (default value: None)
+        limit -- maximum number of rows to return. None returns all the matching rows. (default value: None)
+        """
+        row_number_lists = []
+        if filters is not None:
+            for filter_name, value in filters.items():
+                if filter_name not in self.filter_indexes:
+                    raise ValueError("Unknown filter: " + filter_name)
+                row_number_lists.append(self.filter_indexes[filter_name].get(value.strip().lower(), []))
+        if search is not None:
+            for word in self.get_words(text=search):
+                row_number_lists.append(self.text_index.get(word, []))
+
+        if not row_number_lists:
+            row_numbers = range(len(self.rows))
+        else:
+            # start with the shortest list so the intersection is as small as possible from the beginning
+            row_number_lists.sort(key=len)
+            row_number_set = set(row_number_lists[0])
+            for row_number_list in row_number_lists[1:]:
+                if not row_number_set:
+                    break
+                row_number_set.intersection_update(row_number_list)
+            row_numbers = sorted(row_number_set)
+
+        if limit is not None:
+            row_numbers = row_numbers[:limit]
+        return [self.rows[row_number] for row_number in row_numbers]
+
+
+def query_list(list_path, filters, search, limit):
+    """Load a list file, query it, and write the heading and the matching rows to standard output as tab separated
+    values.
+
+    Keyword arguments:
+    list_path -- path of the list file
+    filters -- dictionary of the values the rows must have (see QueryIndex.query())
+    search -- the rows must contain all the words of this text (see QueryIndex.query())
+    limit -- maximum number of rows to write. None writes all the matching rows.
+    """
+    start_time = time.time()
+    query_index = QueryIndex(rows=read_list_file(list_path=list_path))
+    index_time = time.time()
+    rows = query_index.query(filters=filters, search=search, limit=limit)
+    query_time = time.time()
+    logger.info("Indexed " + str(len(query_index.rows)) + " rows in " +
+                format((index_time - start_time) * 1000, ".1f") + " ms")
+    logger.info("Found " + str(len(rows)) + " rows in " + format((query_time - index_time) * 1000, ".1f") + " ms")
 
-    # create the CSV file
-    # if the file already exists, this will clear it of previous data
-    with open(file=output_folder_name + "/" + output_filename,
-              mode="w",
-              encoding=file_encoding,
-              newline=file_newline
-              ) as csv_file:
-        # create the writer object
-        csv_writer = csv.writer(csv_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
-        # write the table to the CSV file
-        csv_writer.writerows(table)
+    csv_writer = csv.writer(sys.stdout, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
+    csv_writer.writerow(get_heading_row())
+    csv_writer.writerows(row.get_text_list() for row in rows)
 
 
 # only execute the following code if the script is run directly, not imported
@@ -1464,6 +4747,59 @@ if __name__ == '__main__':
     argument_parser.add_argument("--ghtoken", dest="github_token", help="GitHub personal access token", metavar="TOKEN")
     argument_parser.add_argument("--verbose", dest="enable_verbosity", help="Enable verbose output",
                                  action="store_true")
+    argument_parser.add_argument("--async-http", dest="enable_async_http",
+                                 help="Use the asynchronous HTTP transport, which reuses connections",
+                                 action="store_true")
+    argument_parser.add_argument("--graphql", dest="enable_graphql",
+                                 help="Fetch the repository data in batches via the GitHub GraphQL API",
+                                 action="store_true")
+    argument_parser.add_argument("--git-tree", dest="enable_git_tree",
+                                 help="Get the folder listings used to find the library with a single Git tree request",
+                                 action="store_true")
+    argument_parser.add_argument("--low-memory", dest="enable_low_memory",
+                                 help="Only store the rows in the spool file instead of also keeping them in memory",
+                                 action="store_true")
+    argument_parser.add_argument("--resume", dest="resume",
+                                 help="Continue an interrupted run from the last checkpoint", action="store_true")
+    argument_parser.add_argument("--cache-dir", dest="cache_folder", help="Folder for the HTTP response cache",
+                                 default=default_cache_folder_name, metavar="DIR")
+    argument_parser.add_argument("--no-cache", dest="disable_cache", help="Disable the HTTP response cache",
+                                 action="store_true")
+    argument_parser.add_argument("--incremental", dest="previous_list_path",
+                                 help="Reuse data from the previous list for repositories that haven't been pushed to",
+                                 metavar="PREVIOUS_CSV")
+    argument_parser.add_argument("--reuse-volatile", dest="reuse_volatile_columns",
+                                 help="In incremental mode, also reuse the contributor count and status",
+                                 action="store_true")
+    argument_parser.add_argument("--lm-index-metadata", dest="use_library_index_metadata",
+                                 help="Fill the Library Manager metadata from the index when the repository hasn't "
+                                      "been pushed to since the newest release",
+                                 action="store_true")
+    argument_parser.add_argument("--jobs", dest="job_count", help="Number of repositories to process concurrently",
+                                 type=int, default=default_job_count, metavar="N")
+    argument_parser.add_argument("--search-jobs", dest="search_job_count",
+                                 help="Number of search segments to fetch concurrently", type=int,
+                                 default=default_search_job_count, metavar="N")
+    argument_parser.add_argument("--sort-by", dest="sort_key_names",
+                                 help="Order of the rows of the list, most significant key first", nargs='+',
+                                 choices=sorted(sort_keys), default=default_sort_key_names, metavar="KEY")
+    argument_parser.add_argument("--prometheus", dest="prometheus_file_path",
+                                 help="Also write the run's statistics to this file in the Prometheus text format",
+                                 metavar="FILE")
+    # the list generation is the default command
+    subparsers = argument_parser.add_subparsers(dest="command")
+    query_argument_parser = subparsers.add_parser("query", help="Filter and search a generated list")
+    query_argument_parser.add_argument("--list", dest="query_list_path", help="Path of the list file",
+                                       default=output_folder_name + "/" + output_filename, metavar="FILE")
+    for query_filter_name in sorted(query_filter_columns):
+        query_argument_parser.add_argument("--" + query_filter_name, dest="query_" + query_filter_name,
+                                           help="Only rows with this " + query_filter_name, metavar="VALUE")
+    query_argument_parser.add_argument("--search", dest="query_search",
+                                       help="Only rows containing all these words in their description, LM sentence "
+                                            "or paragraph, or PIO keywords",
+                                       metavar="TEXT")
+    query_argument_parser.add_argument("--limit", dest="query_limit", help="Maximum number of rows", type=int,
+                                       metavar="N")
     argument = argument_parser.parse_args()
 
     # run program
@@ -0,0 +1,865 @@
+# for command line arguments
+import argparse
+# for finding the search results of a created date range
+import bisect
+# for running the list generation benchmark in a separate process
+import concurrent.futures
+# for the row storage benchmark
+import csv
+# for the fixture dates
+import datetime
+# for the fixture server
+import http.server
+# for the row storage benchmark
+import io
+# for the fixture JSON
+import json
+# for running the fixture server in a separate process
+import multiprocessing
+# for the list generation benchmark output folder
+import os
+# for the regular expression matching benchmark
+import re
+# for measuring the peak memory usage of the list generation benchmark
+import resource
+# for shuffling the rows of the sort benchmark
+import random
+# for removing the benchmark output folder
+import shutil
+# for the fixture server
+import socketserver
+# for modifying the module search path
+import sys
+# for the list generation benchmark output folder
+import tempfile
+# for the fixture server latency and the rate limit headers
+import time
+# for timing the benchmarks
+import timeit
+# for measuring the memory usage of the row storage benchmark
+import tracemalloc
+# for parsing the fixture server request URLs
+import urllib.parse
+
+# add the parent folder to the module search path
+sys.path.append('../')
+import inoliblist  # nopep8
+
+# numbers of synthetic rows to run the benchmarks with
+default_row_counts = [10000, 100000]
+# values of the synthetic rows' columns that have few distinct values
+synthetic_licenses = ["MIT", "GPL-3.0", "LGPL-2.1", "Apache-2.0", "none", "unrecognized"]
+synthetic_languages = ["C++", "C", "Arduino", "None"]
+synthetic_statuses = ["success", "failure", ""]
+synthetic_categories = ["Communication", "Display", "Sensors", "Device Control", "Timing", "Other", ""]
+synthetic_architectures = ["*", "avr", "avr,megaavr", "esp8266,esp32", "samd", ""]
+synthetic_topics = ["arduino", "arduino-library", "sensor", "display", "esp8266", "iot", "robotics"]
+# number of lookups done by the duplicate detection benchmark
+duplicate_lookup_count = 1000
+# names classified by the regular expression matching benchmark
+matching_benchmark_names = ["README.md", "library.properties", "keywords.txt", "src", "examples", "Foo.h", "Foo.cpp",
+                            ".travis.yml", "LICENSE", "docs", "extras", "sketch.ino", "platformio.ini", "test.png"]
+# number of times the names are classified
+matching_benchmark_repetitions = 1000
+# numbers of synthetic repositories to run the list generation benchmark with
+default_repository_counts = [1000, 10000, 50000]
+# (s) default delay before the fixture server responds to each request
+default_fixture_latency = 0
+# default GitHub API request allotment reported by the rate limiting headers of the fixture server. It's not enforced.
+default_fixture_rate_limit = 1000000
+# (s) length of the fixture server's rate limit window
+fixture_rate_limit_window = 3600
+# the synthetic repositories are created evenly spread over this date range
+fixture_first_created_date = datetime.date(2008, 1, 1)
+fixture_last_created_date = datetime.date(2018, 6, 30)
+# GitHub's search API provides data for a maximum of this many search results
+fixture_maximum_search_results_count = 1000
+
+
+def create_synthetic_row(row_number):
+    """Return a row list for a synthetic repository.
+
+    Keyword arguments:
+    row_number -- used to generate unique data for the row
+    """
+    row_list = [""] * inoliblist.Column.count
+    row_list[inoliblist.Column.repository_url] = ("https://github.com/owner" + str(row_number % 1000) +
+                                                  "/repository" + str(row_number))
+    row_list[inoliblist.Column.repository_owner] = "owner" + str(row_number % 1000)
+    row_list[inoliblist.Column.repository_name] = "repository" + str(row_number)
+    row_list[inoliblist.Column.repository_default_branch] = "master"
+    row_list[inoliblist.Column.library_path] = "/"
+    row_list[inoliblist.Column.archived] = str(row_number % 20 == 0)
+    row_list[inoliblist.Column.is_fork] = str(row_number % 3 == 0)
+    row_list[inoliblist.Column.last_push_date] = "2018-06-" + format(row_number % 30 + 1, "02") + "T12:00:00Z"
+    row_list[inoliblist.Column.fork_count] = str(row_number % 50)
+    row_list[inoliblist.Column.star_count] = str(row_number * 7 % 5000)
+    row_list[inoliblist.Column.contributor_count] = str(row_number % 10 + 1)
+    row_list[inoliblist.Column.tip_status] = synthetic_statuses[row_number % len(synthetic_statuses)]
+    row_list[inoliblist.Column.repository_license] = synthetic_licenses[row_number % len(synthetic_licenses)]
+    row_list[inoliblist.Column.repository_language] = synthetic_languages[row_number % len(synthetic_languages)]
+    row_list[inoliblist.Column.repository_description] = "Arduino library number " + str(row_number)
+    row_list[inoliblist.Column.github_topics] = ", ".join(synthetic_topics[:row_number % 4])
+    row_list[inoliblist.Column.in_library_manager_index] = str(row_number % 4 == 0)
+    row_list[inoliblist.Column.library_manager_category] = synthetic_categories[row_number % len(synthetic_categories)]
+    row_list[inoliblist.Column.library_manager_architectures] = synthetic_architectures[row_number %
+                                                                                        len(synthetic_architectures)]
+    return row_list
+
+
+def populate_synthetic_table(row_count):
+    """Fill the table with synthetic rows.
+
+    Keyword arguments:
+    row_count -- number of rows to add to the table
+    """
+    inoliblist.initialize_table()
+    inoliblist.initialize_output_files()
+    inoliblist.start_repository_processing()
+    for row_number in range(row_count):
+        inoliblist.add_row_to_table(row_list=create_synthetic_row(row_number=row_number))
+    inoliblist.finish_repository_processing()
+
+
+def benchmark_duplicate_detection(row_count):
+    """Compare the time taken by the duplicate check of populate_row() using the table index to the time taken by a
+    scan of the whole table.
+
+    Keyword arguments:
+    row_count -- number of rows in the table
+    """
+    populate_synthetic_table(row_count=row_count)
+    # half of the lookups are for repositories spread through the list and half are for repositories not on the list
+    row_numbers = []
+    for lookup_number in range(duplicate_lookup_count // 2):
+        row_numbers.append(lookup_number * row_count // (duplicate_lookup_count // 2))
+        row_numbers.append(row_count + lookup_number)
+    repository_urls = [create_synthetic_row(row_number=row_number)[inoliblist.Column.repository_url]
+                       for row_number in row_numbers]
+
+    def scan_table():
+        for repository_url in repository_urls:
+            for readRow in inoliblist.get_table():
+                if readRow[inoliblist.Column.repository_url] == repository_url:
+                    break
+
+    def look_up_index():
+        for repository_url in repository_urls:
+            inoliblist.repository_is_listed(repository_url=repository_url)
+
+    scan_time = timeit.timeit(scan_table, number=1)
+    index_time = timeit.timeit(look_up_index, number=1)
+    print("Duplicate detection, " + str(row_count) + " rows, " + str(duplicate_lookup_count) + " lookups: " +
+          "table scan: " + format(scan_time, ".3f") + " s, " +
+          "index: " + format(index_time, ".3f") + " s, " +
+          "speedup: " + format(scan_time / index_time, ".0f") + "x")
+
+
+def benchmark_row_storage(row_count):
+    """Compare the memory usage and filtering time of the rows stored as lists of text, as they are read from a list
+    file, to the rows stored in the compact form used by the script.
+
+    Keyword arguments:
+    row_count -- number of rows
+    """
+    list_file = io.StringIO()
+    csv.writer(list_file).writerows(create_synthetic_row(row_number=row_number) for row_number in range(row_count))
+
+    def read_rows(row_class):
+        list_file.seek(0)
+        tracemalloc.start()
+        try:
+            rows = [row_class(row_list) for row_list in csv.reader(list_file)]
+            memory = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return rows, memory
+
+    list_rows, list_memory = read_rows(row_class=list)
+    compact_rows, compact_memory = read_rows(row_class=lambda row_list: inoliblist.Row(row_list=row_list))
+
+    # the popular repositories that are not forks
+    def filter_list_rows():
+        return [row for row in list_rows
+                if int(row[inoliblist.Column.star_count]) > 1000 and row[inoliblist.Column.is_fork] == "False"]
+
+    def filter_compact_rows():
+        return [row for row in compact_rows if row.star_count > 1000 and not row.is_fork]
+
+    list_time = timeit.timeit(filter_list_rows, number=10)
+    compact_time = timeit.timeit(filter_compact_rows, number=10)
+    print("Row storage, " + str(row_count) + " rows: " +
+          "memory: lists: " + format(list_memory / 2 ** 20, ".1f") + " MiB, " +
+          "compact: " + format(compact_memory / 2 ** 20, ".1f") + " MiB, " +
+          "filter x10: lists: " + format(list_time, ".3f") + " s, " +
+          "compact: " + format(compact_time, ".3f") + " s")
+
+
+def benchmark_sort(row_count):
+    """Compare the time taken to sort the rows by comparing the text of all their columns, as was done before the sort
+    keys were added, to the time taken to sort the compact rows by the typed sort keys.
+
+    Keyword arguments:
+    row_count -- number of rows
+    """
+    list_rows = [create_synthetic_row(row_number=row_number) for row_number in range(row_count)]
+    random.Random(0).shuffle(list_rows)
+    compact_rows = [inoliblist.Row(row_list=row_list) for row_list in list_rows]
+
+    def sort_by_keys(sort_key_names):
+        inoliblist.set_sort_by(sort_key_names_input=sort_key_names)
+        try:
+            return timeit.timeit(lambda: sorted(compact_rows, key=inoliblist.get_sort_key), number=1)
+        finally:
+            inoliblist.set_sort_by(sort_key_names_input=inoliblist.default_sort_key_names)
+
+    full_row_time = timeit.timeit(lambda: sorted(list_rows), number=1)
+    url_time = sort_by_keys(sort_key_names=["url"])
+    multiple_key_time = sort_by_keys(sort_key_names=["stars", "last-push", "owner", "name"])
+    print("Sort, " + str(row_count) + " rows: " +
+          "full row comparison: " + format(full_row_time, ".3f") + " s, " +
+          "url key: " + format(url_time, ".3f") + " s, " +
+          "stars, last-push, owner, name keys: " + format(multiple_key_time, ".3f") + " s")
+
+
+def benchmark_query(row_count):
+    """Compare the time taken by queries of the query engine's indexes to the time taken by a scan of all the rows, and
+    measure the time taken to load and index a list file.
+
+    Keyword arguments:
+    row_count -- number of rows
+    """
+    list_file_descriptor, list_path = tempfile.mkstemp()
+    os.close(list_file_descriptor)
+    try:
+        with open(list_path, mode="w", encoding=inoliblist.file_encoding, newline=inoliblist.file_newline) as list_file:
+            csv_writer = csv.writer(list_file,
+                                    delimiter=inoliblist.output_file_delimiter,
+                                    quotechar=inoliblist.output_file_quotechar)
+            csv_writer.writerow(inoliblist.get_heading_row())
+            csv_writer.writerows(create_synthetic_row(row_number=row_number) for row_number in range(row_count))
+
+        start_time = time.time()
+        query_index = inoliblist.QueryIndex(rows=inoliblist.read_list_file(list_path=list_path))
+        index_time = time.time() - start_time
+    finally:
+        os.remove(list_path)
+
+    # a word that is only in one description
+    search = "number " + str(row_count // 2)
+
+    def scan_rows():
+        return [row for row in query_index.rows
+                if row.repository_license.lower() == "mit" and
+                "display" in [topic.strip().lower() for topic in row.github_topics.split(",")] and
+                set(search.split()) <= set(query_index.get_words(text=row.repository_description))]
+
+    def query_rows():
+        return query_index.query(filters={"license": "MIT", "topic": "display"}, search=search)
+
+    if scan_rows() != query_rows():
+        raise RuntimeError("The query results don't match the scan results")
+    scan_time = timeit.timeit(scan_rows, number=10) / 10
+    query_time = timeit.timeit(query_rows, number=10) / 10
+    filter_time = timeit.timeit(lambda: query_index.query(filters={"owner": "owner1", "architecture": "avr"}),
+                                number=10) / 10
+    print("Query, " + str(row_count) + " rows: " +
+          "load and index: " + format(index_time, ".3f") + " s, " +
+          "license, topic and search: scan: " + format(scan_time * 1000, ".2f") + " ms, " +
+          "index: " + format(query_time * 1000, ".2f") + " ms, " +
+          "owner and architecture: index: " + format(filter_time * 1000, ".2f") + " ms")
+
+
+def benchmark_library_index_parsing(release_count):
+    """Compare the peak memory usage and time of loading the whole Library Manager index with json.load() to parsing it
+    incrementally, as done by the script.
+
+    Keyword arguments:
+    release_count -- number of library releases in the synthetic index
+    """
+    library_index_file_descriptor, library_index_path = tempfile.mkstemp()
+    os.close(library_index_file_descriptor)
+    try:
+        with open(library_index_path, mode="w", encoding="utf-8") as library_index_file:
+            libraries = []
+            for release_number in range(release_count):
+                repository_name = "repository" + str(release_number // 2)
+                libraries.append({"name": repository_name,
+                                  "version": "1." + str(release_number % 2) + ".0",
+                                  "author": "Author " + str(release_number // 2),
+                                  "maintainer": "Maintainer <maintainer@example.com>",
+                                  "sentence": "A library for the synthetic device number " + str(release_number // 2),
+                                  "paragraph": "Supports all the features of the device. " * 4,
+                                  "website": "https://github.com/owner/" + repository_name,
+                                  "category": "Sensors",
+                                  "architectures": ["*"],
+                                  "types": ["Contributed"],
+                                  "repository": "https://github.com/owner/" + repository_name + ".git",
+                                  "url": "https://downloads.arduino.cc/libraries/github.com/owner/" + repository_name +
+                                         "-1." + str(release_number % 2) + ".0.zip",
+                                  "archiveFileName": repository_name + "-1." + str(release_number % 2) + ".0.zip",
+                                  "size": 12345,
+                                  "checksum": "SHA-256:" + "0" * 64})
+            json.dump({"libraries": libraries}, library_index_file, indent=2)
+            del libraries
+
+        def load_whole_index():
+            with open(library_index_path, mode="r", encoding="utf-8") as library_index_file:
+                return [library_data["repository"] for library_data in json.load(library_index_file)["libraries"]]
+
+        def parse_index_incrementally():
+            library_releases = inoliblist.generate_library_index_releases(library_index_path=library_index_path)
+            return [library_data["repository"] for library_data in library_releases]
+
+        results = []
+        for parse_index in [load_whole_index, parse_index_incrementally]:
+            tracemalloc.start()
+            try:
+                start_time = time.time()
+                parse_index()
+                seconds = time.time() - start_time
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            results.append((seconds, peak_memory))
+        library_index_size = os.path.getsize(library_index_path)
+    finally:
+        os.remove(library_index_path)
+
+    print("Library Manager index parsing, " + str(release_count) + " releases (" +
+          format(library_index_size / 2 ** 20, ".0f") + " MiB): " +
+          "json.load(): " + format(results[0][0], ".2f") + " s, peak memory: " +
+          format(results[0][1] / 2 ** 20, ".1f") + " MiB, " +
+          "incremental: " + format(results[1][0], ".2f") + " s, peak memory: " +
+          format(results[1][1] / 2 ** 20, ".1f") + " MiB")
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server that handles each request in a separate thread so the requests of the worker pool are handled
+    concurrently.
+    """
+    daemon_threads = True
+
+
+def get_fixture_repository(repository_number, repository_count):
+    """Return the repos API object of a synthetic repository, with the additional items used by the fixture server:
+    search_query_number -- which of the searches of populate_table() finds the repository (0: topic:arduino-library,
+                           1: topic:arduino, 2: arduino library search)
+    created_date -- the date the repository was created
+    layout -- where the library is in the repository (0: library.properties in the root, 1: library.json in the root,
+              2: header file in the root, 3: library.properties in a subfolder, 4: sketch)
+
+    Keyword arguments:
+    repository_number -- used to generate unique data for the repository
+    repository_count -- total number of synthetic repositories
+    """
+    owner = "owner" + str(repository_number % 100)
+    name = "library" + str(repository_number)
+    created_day_count = (fixture_last_created_date - fixture_first_created_date).days
+    repository_object = {"name": name,
+                         "full_name": owner + "/" + name,
+                         "html_url": "https://github.com/" + owner + "/" + name,
+                         "owner": {"login": owner},
+                         "default_branch": "master",
+                         "archived": False,
+                         "fork": repository_number % 7 == 6,
+                         "pushed_at": "2018-06-30T12:00:00Z",
+                         "forks_count": repository_number % 50,
+                         "stargazers_count": repository_number % 200,
+                         "license": {"spdx_id": "MIT"} if repository_number % 2 == 0 else None,
+                         "language": "C++",
+                         "description": "Synthetic library " + str(repository_number),
+                         "search_query_number": repository_number % 3,
+                         "created_date": fixture_first_created_date + datetime.timedelta(
+                             days=repository_number * created_day_count // repository_count
+                         ),
+                         "layout": repository_number % 4 if repository_number % 13 != 12 else 4}
+    repository_object["topics"] = [["arduino-library"], ["arduino"], []][repository_object["search_query_number"]]
+    if repository_object["fork"]:
+        repository_object["parent"] = {"full_name": "upstream/" + name}
+    return repository_object
+
+
+def get_fixture_folder_listings(repository_object):
+    """Return a dictionary of the contents API listings of the synthetic repository's root folder and its subfolders
+    (folder name ("/" for the root): listing).
+
+    Keyword arguments:
+    repository_object -- the synthetic repository's object
+    """
+    root_folder_listing = [{"name": "README.md", "type": "file"}, {"name": "examples", "type": "dir"}]
+    folder_listings = {"/": root_folder_listing, "examples": [{"name": "Example", "type": "dir"}]}
+    layout = repository_object["layout"]
+    if layout == 0:
+        root_folder_listing.append({"name": "library.properties", "type": "file"})
+    elif layout == 1:
+        root_folder_listing.append({"name": "library.json", "type": "file"})
+    elif layout == 2:
+        root_folder_listing.append({"name": repository_object["name"] + ".h", "type": "file"})
+    elif layout == 3:
+        root_folder_listing.append({"name": "src", "type": "dir"})
+        folder_listings["src"] = [{"name": "library.properties", "type": "file"},
+                                  {"name": repository_object["name"] + ".h", "type": "file"}]
+    else:
+        root_folder_listing.append({"name": repository_object["name"] + ".ino", "type": "file"})
+    return folder_listings
+
+
+class FixtureRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Local stand-in for the GitHub API, the raw content of GitHub repositories, and the Library Manager index,
+    serving the synthetic repositories. The API paths are under /api and the raw content paths are under /raw.
+    """
+    protocol_version = "HTTP/1.1"
+    # the headers and body are written separately so without this, the response to each request on a kept-alive
+    # connection would be delayed by the interaction of Nagle's algorithm and delayed ACKs
+    disable_nagle_algorithm = True
+    # list of the synthetic repository objects
+    repositories = []
+    # search query number: list of tuples of the created date and repository number, in date order
+    search_indexes = {}
+    # (s) delay before responding to each request
+    latency = default_fixture_latency
+    # request allotment reported by the rate limiting headers
+    rate_limit = default_fixture_rate_limit
+    rate_limit_reset = 0
+    # API type: number of requests made in the current rate limit window
+    rate_limit_used = {}
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def log_message(self, format, *args):
+        # don't clutter the benchmark output
+        pass
+
+    def handle_request(self, send_body):
+        time.sleep(self.latency)
+        url_parts = urllib.parse.urlsplit(self.path)
+        parameters = dict(urllib.parse.parse_qsl(url_parts.query))
+        path = urllib.parse.unquote(url_parts.path)
+        headers = {}
+        if path == "/library_index.json":
+            status, body = 200, self.get_library_index()
+        elif path.startswith("/raw/"):
+            status, body = self.get_raw_file(path=path[len("/raw/"):])
+        elif path.startswith("/api/"):
+            status, body = self.get_api_response(path=path[len("/api/"):],
+                                                 query=urllib.parse.unquote(url_parts.query),
+                                                 parameters=parameters,
+                                                 headers=headers)
+        else:
+            status, body = 404, b"404: Not Found"
+
+        self.send_response(status)
+        for header_name, header_value in headers.items():
+            self.send_header(header_name, header_value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def get_repository(self, owner, name):
+        """Return the synthetic repository object, or None if there is no such repository."""
+        if not name.startswith("library") or not name[len("library"):].isdigit():
+            return None
+        repository_number = int(name[len("library"):])
+        if repository_number >= len(self.repositories):
+            return None
+        repository_object = self.repositories[repository_number]
+        if repository_object["owner"]["login"] != owner:
+            return None
+        return repository_object
+
+    def get_library_index(self):
+        """Return the Library Manager index, which lists every fifth repository, with two releases each. The newest
+        release is the version in the library.properties files.
+        """
+        libraries = []
+        for repository_object in self.repositories[::5]:
+            for version in ["1.0.0", "1.1.0"]:
+                libraries.append({"name": repository_object["name"],
+                                  "version": version,
+                                  "repository": repository_object["html_url"] + ".git"})
+        return json.dumps({"libraries": libraries}).encode("utf-8")
+
+    def get_raw_file(self, path):
+        """Return a tuple of the status and body of a raw content request.
+
+        Keyword arguments:
+        path -- owner/name/branch/file path
+        """
+        path_components = path.split("/")
+        repository_object = self.get_repository(owner=path_components[0], name=path_components[1])
+        if repository_object is None or len(path_components) < 4:
+            return 404, b"404: Not Found"
+        if len(path_components) == 4:
+            folder_name = "/"
+        else:
+            folder_name = path_components[3]
+        filename = path_components[-1]
+        folder_listing = get_fixture_folder_listings(repository_object=repository_object).get(folder_name, [])
+        if filename not in [folder_item["name"] for folder_item in folder_listing]:
+            return 404, b"404: Not Found"
+        if filename == "library.properties":
+            return 200, ("name=" + repository_object["name"] + "\nversion=1.1.0\nauthor=Synthetic\n" +
+                         "sentence=" + repository_object["description"] + "\narchitectures=*\n").encode("utf-8")
+        if filename == "library.json":
+            return 200, json.dumps({"name": repository_object["name"],
+                                    "version": "1.0.0",
+                                    "frameworks": "arduino",
+                                    "platforms": ["atmelavr"]}).encode("utf-8")
+        return 200, b"// synthetic file\n"
+
+    def get_api_response(self, path, query, parameters, headers):
+        """Return a tuple of the status and body of a GitHub API request, and add its response headers.
+
+        Keyword arguments:
+        path -- the path following /api/
+        query -- the query string of the request URL
+        parameters -- dictionary of the request parameters
+        headers -- dictionary the response headers are added to
+        """
+        if path.startswith("search"):
+            api_type = "search"
+        else:
+            api_type = "core"
+        now = time.time()
+        if now >= self.rate_limit_reset:
+            FixtureRequestHandler.rate_limit_reset = int(now) + fixture_rate_limit_window
+            FixtureRequestHandler.rate_limit_used = {}
+        if path != "rate_limit":
+            self.rate_limit_used[api_type] = self.rate_limit_used.get(api_type, 0) + 1
+        headers["X-RateLimit-Limit"] = str(self.rate_limit)
+        headers["X-RateLimit-Remaining"] = str(max(self.rate_limit - self.rate_limit_used.get(api_type, 0), 0))
+        headers["X-RateLimit-Reset"] = str(self.rate_limit_reset)
+        headers["X-RateLimit-Resource"] = api_type
+
+        path_components = path.split("/")
+        if path == "rate_limit":
+            resources = {}
+            for resource_api_type in ["core", "search", "graphql"]:
+                resources[resource_api_type] = {
+                    "limit": self.rate_limit,
+                    "remaining": max(self.rate_limit - self.rate_limit_used.get(resource_api_type, 0), 0),
+                    "reset": self.rate_limit_reset
+                }
+            return 200, json.dumps({"resources": resources}).encode("utf-8")
+        if path == "search/repositories":
+            return self.get_search_page(query=query, parameters=parameters, headers=headers)
+        if len(path_components) < 3 or path_components[0] != "repos":
+            return 404, b"{}"
+        repository_object = self.get_repository(owner=path_components[1], name=path_components[2])
+        if repository_object is None:
+            return 404, b"{}"
+
+        if len(path_components) == 3:
+            return 200, json.dumps(get_api_repository_object(repository_object=repository_object)).encode("utf-8")
+        if path_components[3] == "contents":
+            if len(path_components) == 4:
+                folder_name = "/"
+            else:
+                folder_name = path_components[4]
+            folder_listing = get_fixture_folder_listings(repository_object=repository_object).get(folder_name)
+            if folder_listing is None:
+                return 404, b"{}"
+            return 200, json.dumps(folder_listing).encode("utf-8")
+        if path_components[3] == "git":
+            tree = []
+            for folder_name, folder_listing in get_fixture_folder_listings(repository_object=repository_object).items():
+                for folder_item in folder_listing:
+                    tree.append({"path": folder_item["name"] if folder_name == "/" else
+                                 folder_name + "/" + folder_item["name"],
+                                 "mode": "040000" if folder_item["type"] == "dir" else "100644",
+                                 "type": "tree" if folder_item["type"] == "dir" else "blob"})
+            return 200, json.dumps({"truncated": False, "tree": tree}).encode("utf-8")
+        if path_components[3] == "commits":
+            return 200, json.dumps({"state": "success"}).encode("utf-8")
+        if path_components[3] == "contributors":
+            contributor_count = int(repository_object["name"][len("library"):]) % 10 + 1
+            headers["Link"] = ("<" + self.get_page_url(parameters=parameters, page_number=2) + ">; rel=\"next\", <" +
+                               self.get_page_url(parameters=parameters, page_number=contributor_count) +
+                               ">; rel=\"last\"")
+            return 200, json.dumps([{"login": "contributor"}]).encode("utf-8")
+        return 404, b"{}"
+
+    def get_page_url(self, parameters, page_number):
+        """Return the URL of a page of the paginated response to the current request."""
+        parameters = dict(parameters)
+        parameters["page"] = str(page_number)
+        return ("http://" + self.headers["Host"] + urllib.parse.urlsplit(self.path).path + "?" +
+                urllib.parse.urlencode(parameters))
+
+    def get_search_page(self, query, parameters, headers):
+        """Return a tuple of the status and body of a search results page, and add the Link header.
+
+        Keyword arguments:
+        query -- the query string of the request URL
+        parameters -- dictionary of the request parameters
+        headers -- dictionary the response headers are added to
+        """
+        # the q parameter is search_query+created:created_argument+fork:fork_argument
+        search_argument = query.split("q=", 1)[1].split("&", 1)[0]
+        search_argument, fork_argument = search_argument.rsplit("+fork:", 1)
+        search_query, created_argument = search_argument.rsplit("+created:", 1)
+        search_query_number = {"topic:arduino-library": 0, "topic:arduino": 1}.get(search_query, 2)
+        date_range = inoliblist.parse_created_argument(created_argument=created_argument)
+        search_index = self.search_indexes[search_query_number]
+        first_index = 0
+        last_index = len(search_index)
+        if date_range[0] is not None:
+            first_index = bisect.bisect_left(search_index, (date_range[0], -1))
+        if date_range[1] is not None:
+            last_index = bisect.bisect_left(search_index, (date_range[1] + datetime.timedelta(days=1), -1))
+        repository_objects = [self.repositories[repository_number]
+                              for created_date, repository_number in search_index[first_index:last_index]]
+        if fork_argument == "false":
+            repository_objects = [repository_object for repository_object in repository_objects
+                                  if not repository_object["fork"]]
+        elif fork_argument == "only":
+            repository_objects = [repository_object for repository_object in repository_objects
+                                  if repository_object["fork"]]
+        # the results are sorted by forks
+        repository_objects.sort(key=lambda repository_object: -repository_object["forks_count"])
+
+        page_number = int(parameters.get("page", "1"))
+        results_per_page = int(parameters.get("per_page", "30"))
+        available_count = min(len(repository_objects), fixture_maximum_search_results_count)
+        page_count = max((available_count + results_per_page - 1) // results_per_page, 1)
+        items = []
+        for repository_object in repository_objects[(page_number - 1) * results_per_page:
+                                                    min(page_number * results_per_page, available_count)]:
+            search_result = get_api_repository_object(repository_object=repository_object)
+            # the search results are missing some items of the repos API objects
+            search_result.pop("parent", None)
+            items.append(search_result)
+        if page_number < page_count:
+            headers["Link"] = ("<" + self.get_page_url(parameters=parameters, page_number=page_number + 1) +
+                               ">; rel=\"next\", <" + self.get_page_url(parameters=parameters, page_number=page_count) +
+                               ">; rel=\"last\"")
+        return 200, json.dumps({"total_count": len(repository_objects),
+                                "incomplete_results": False,
+                                "items": items}).encode("utf-8")
+
+
+def get_api_repository_object(repository_object):
+    """Return the synthetic repository object without the items only used by the fixture server.
+
+    Keyword arguments:
+    repository_object -- the synthetic repository's object
+    """
+    return {item_key: item_value for item_key, item_value in repository_object.items()
+            if item_key not in ["search_query_number", "created_date", "layout"]}
+
+
+def serve_fixtures(repository_count, latency, rate_limit, port_queue):
+    """Run the fixture server. The port it listens on is put in the queue.
+
+    Keyword arguments:
+    repository_count -- number of synthetic repositories
+    latency -- (s) delay before responding to each request
+    rate_limit -- request allotment reported by the rate limiting headers
+    port_queue -- multiprocessing.Queue the port is put in
+    """
+    FixtureRequestHandler.repositories = [get_fixture_repository(repository_number=repository_number,
+                                                                 repository_count=repository_count)
+                                          for repository_number in range(repository_count)]
+    FixtureRequestHandler.search_indexes = {0: [], 1: [], 2: []}
+    for repository_number, repository_object in enumerate(FixtureRequestHandler.repositories):
+        FixtureRequestHandler.search_indexes[repository_object["search_query_number"]].append(
+            (repository_object["created_date"], repository_number)
+        )
+    FixtureRequestHandler.latency = latency
+    FixtureRequestHandler.rate_limit = rate_limit
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureRequestHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def run_populate_table(base_url, cache_folder, job_count, search_job_count, enable_async_http, enable_git_tree,
+                       enable_low_memory, use_library_index_metadata):
+    """Generate the list from the fixture server. This is run in a separate process so the peak memory usage is only
+    that of the list generation. Return a dictionary of the results:
+    seconds -- wall time
+    request_count -- number of HTTP requests
+    peak_memory -- (MiB) peak resident memory usage of the process
+    library_count -- number of libraries found
+
+    Keyword arguments:
+    base_url -- URL of the fixture server
+    cache_folder -- the cache folder
+    job_count -- number of repositories to process concurrently
+    search_job_count -- number of search segments to fetch concurrently
+    enable_async_http -- whether to use the asynchronous HTTP transport (True, False)
+    enable_git_tree -- whether to use the Git trees API (True, False)
+    enable_low_memory -- whether to only store the rows in the spool file (True, False)
+    use_library_index_metadata -- whether to fill the Library Manager metadata from the index (True, False)
+    """
+    inoliblist.output_folder_name = tempfile.mkdtemp()
+    inoliblist.set_base_urls(github_api_url_input=base_url + "/api",
+                             github_raw_url_input=base_url + "/raw",
+                             library_index_url_input=base_url + "/library_index.json")
+    inoliblist.set_cache_folder(cache_folder_input=cache_folder)
+    inoliblist.set_job_count(job_count_input=job_count)
+    inoliblist.set_search_job_count(search_job_count_input=search_job_count)
+    inoliblist.set_git_tree(enable_git_tree_input=enable_git_tree)
+    inoliblist.set_low_memory(enable_low_memory_input=enable_low_memory)
+    inoliblist.set_library_index_metadata(use_library_index_metadata_input=use_library_index_metadata)
+    inoliblist.initialize_table()
+    inoliblist.initialize_output_files()
+    # populate_row() prints the URL of each repository
+    with open(os.devnull, mode="w") as null_file:
+        standard_output = sys.stdout
+        sys.stdout = null_file
+        try:
+            start_time = time.time()
+            inoliblist.set_async_http(enable_async_http_input=enable_async_http)
+            inoliblist.start_repository_processing()
+            inoliblist.populate_table()
+            inoliblist.finish_repository_processing()
+            inoliblist.save_fork_parents()
+            inoliblist.save_missing_raw_files()
+            inoliblist.save_verified_library_releases()
+            inoliblist.set_async_http(enable_async_http_input=False)
+            seconds = time.time() - start_time
+        finally:
+            sys.stdout = standard_output
+
+    request_count = 0
+    for statistics in inoliblist.metrics.get_report()["stages"].values():
+        request_count += sum(statistics["requests"].values())
+    return {"seconds": seconds,
+            "request_count": request_count,
+            # ru_maxrss is in KiB on Linux
+            "peak_memory": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "library_count": len(inoliblist.table_index)}
+
+
+def benchmark_populate_table(repository_count):
+    """Measure the wall time, number of requests, and peak memory usage of populate_table() with a local fixture server
+    in place of GitHub. The list is generated twice. The second run uses the data the first run saved to the state
+    folder, but not its HTTP response cache, as a run after a previous run would.
+
+    Keyword arguments:
+    repository_count -- number of synthetic repositories
+    """
+    port_queue = multiprocessing.Queue()
+    server_process = multiprocessing.Process(target=serve_fixtures,
+                                             kwargs={"repository_count": repository_count,
+                                                     "latency": argument.latency,
+                                                     "rate_limit": argument.rate_limit,
+                                                     "port_queue": port_queue},
+                                             daemon=True)
+    server_process.start()
+    cache_folder = tempfile.mkdtemp()
+    try:
+        base_url = "http://127.0.0.1:" + str(port_queue.get())
+        for run_name in ["first run", "second run"]:
+            # each run has its own process so the metrics and peak memory usage are only those of the run
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_populate_table,
+                                         base_url=base_url,
+                                         cache_folder=cache_folder,
+                                         job_count=argument.job_count,
+                                         search_job_count=argument.search_job_count,
+                                         enable_async_http=argument.enable_async_http,
+                                         enable_git_tree=argument.enable_git_tree,
+                                         enable_low_memory=argument.enable_low_memory,
+                                         use_library_index_metadata=argument.use_library_index_metadata).result()
+            print("List generation, " + str(repository_count) + " repositories, " + run_name + ": " +
+                  "wall time: " + format(result["seconds"], ".1f") + " s, " +
+                  "requests: " + str(result["request_count"]) + ", " +
+                  "peak memory: " + format(result["peak_memory"], ".0f") + " MiB, " +
+                  "libraries found: " + str(result["library_count"]))
+            # only the state folder is shared with the second run
+            for file_name in os.listdir(cache_folder):
+                if file_name != inoliblist.state_folder_name:
+                    os.remove(os.path.join(cache_folder, file_name))
+    finally:
+        server_process.terminate()
+        server_process.join()
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+
+def benchmark_name_matching():
+    """Compare the time taken to classify folder item names using the compiled matchers to the time taken by compiling
+    and matching each regular expression of the lists separately.
+    """
+    regular_expression_lists = [inoliblist.administrative_file_whitelist,
+                                inoliblist.library_subfolder_blacklist,
+                                inoliblist.examples_folder_names]
+    matchers = [inoliblist.administrative_file_whitelist_matcher,
+                inoliblist.library_subfolder_blacklist_matcher,
+                inoliblist.examples_folder_names_matcher]
+
+    def match_separately():
+        for name in matching_benchmark_names:
+            for regular_expression_list in regular_expression_lists:
+                for regular_expression in regular_expression_list:
+                    if re.compile(regular_expression, flags=re.IGNORECASE).fullmatch(name):
+                        break
+
+    def match_compiled():
+        for name in matching_benchmark_names:
+            for matcher in matchers:
+                matcher.matches(name=name)
+
+    separate_time = timeit.timeit(match_separately, number=matching_benchmark_repetitions)
+    compiled_time = timeit.timeit(match_compiled, number=matching_benchmark_repetitions)
+    print("Name matching, " + str(len(matching_benchmark_names) * matching_benchmark_repetitions) + " names: " +
+          "separate regular expressions: " + format(separate_time, ".3f") + " s, " +
+          "compiled matchers: " + format(compiled_time, ".3f") + " s, " +
+          "speedup: " + format(separate_time / compiled_time, ".0f") + "x")
+
+
+def main():
+    """The primary function."""
+    # the rows added to the table are also written to the spool file in the output folder
+    inoliblist.output_folder_name = tempfile.mkdtemp()
+    try:
+        for row_count in argument.row_counts:
+            benchmark_duplicate_detection(row_count=row_count)
+            benchmark_row_storage(row_count=row_count)
+            benchmark_sort(row_count=row_count)
+            benchmark_query(row_count=row_count)
+            benchmark_library_index_parsing(release_count=row_count)
+    finally:
+        shutil.rmtree(inoliblist.output_folder_name, ignore_errors=True)
+    benchmark_name_matching()
+    for repository_count in argument.repository_counts:
+        benchmark_populate_table(repository_count=repository_count)
+
+
+# only execute the following code if the script is run directly, not imported
+if __name__ == '__main__':
+    # parse command line arguments
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--rows", dest="row_counts", help="Numbers of synthetic rows to benchmark with",
+                                 type=int, nargs='+', default=default_row_counts, metavar="COUNT")
+    argument_parser.add_argument("--repositories", dest="repository_counts",
+                                 help="Numbers of synthetic repositories to benchmark the list generation with",
+                                 type=int, nargs='*', default=default_repository_counts, metavar="COUNT")
+    argument_parser.add_argument("--latency", dest="latency", help="Delay before the fixture server responds",
+                                 type=float, default=default_fixture_latency, metavar="SECONDS")
+    argument_parser.add_argument("--rate-limit", dest="rate_limit",
+                                 help="API request allotment reported by the fixture server", type=int,
+                                 default=default_fixture_rate_limit, metavar="COUNT")
+    argument_parser.add_argument("--jobs", dest="job_count", help="Number of repositories to process concurrently",
+                                 type=int, default=inoliblist.default_job_count, metavar="N")
+    argument_parser.add_argument("--search-jobs", dest="search_job_count",
+                                 help="Number of search segments to fetch concurrently", type=int,
+                                 default=inoliblist.default_search_job_count, metavar="N")
+    argument_parser.add_argument("--async-http", dest="enable_async_http",
+                                 help="Use the asynchronous HTTP transport", action="store_true")
+    argument_parser.add_argument("--git-tree", dest="enable_git_tree", help="Use the Git trees API",
+                                 action="store_true")
+    argument_parser.add_argument("--low-memory", dest="enable_low_memory",
+                                 help="Only store the rows in the spool file", action="store_true")
+    argument_parser.add_argument("--lm-index-metadata", dest="use_library_index_metadata",
+                                 help="Fill the Library Manager metadata from the index", action="store_true")
+    argument = argument_parser.parse_args()
+
+    # run benchmarks
+    main()
@@ -1,5 +1,9 @@
 # must specify UTF-8 encoding due to the non-ASCII characters in the ArduinoJSON description
 # encoding: utf-8
+# for the mock GraphQL API and Library Manager index servers
+import http.server
+# for removing the output and cache folders created by the tests
+import shutil
 # for making custom command line arguments work in conjunction with the unittest module
 import sys
 # for unit testing
@@ -23,6 +27,104 @@ argument = argument_parser.parse_args()
 sys.argv[1:] = argument.unittest_args
 
 
+class MockGraphQLRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Responds to GraphQL repository queries with the same data for every repository, except for repositories named
+    "missing", which are not found.
+    """
+
+    def do_POST(self):
+        request_data = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode(file_encoding))
+        response_data = {}
+        for variable_name, variable_value in request_data["variables"].items():
+            if variable_name.startswith("name"):
+                index_string = variable_name[len("name"):]
+                if variable_value == "missing":
+                    response_data["repository" + index_string] = None
+                else:
+                    owner = request_data["variables"]["owner" + index_string]
+                    response_data["repository" + index_string] = {
+                        "name": variable_value,
+                        "nameWithOwner": owner + "/" + variable_value,
+                        "url": "https://github.com/" + owner + "/" + variable_value,
+                        "owner": {"login": owner},
+                        "defaultBranchRef": {"name": "master", "target": {"status": {"state": "EXPECTED"}}},
+                        "isArchived": False,
+                        "isFork": True,
+                        "parent": {"nameWithOwner": "arduino/Arduino"},
+                        "pushedAt": "2018-01-01T00:00:00Z",
+                        "forkCount": 1,
+                        "stargazers": {"totalCount": 2},
+                        "licenseInfo": {"spdxId": "MIT"},
+                        "primaryLanguage": None,
+                        "description": None,
+                        "repositoryTopics": {"nodes": [{"topic": {"name": "arduino-library"}}]}
+                    }
+        response_body = json.dumps({"data": response_data}).encode(file_encoding)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, *arguments):
+        pass
+
+
+class MockLibraryIndexRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the abbreviated local copy of the Library Manager index with an ETag, so it can be requested
+    conditionally.
+    """
+    etag = "\"library-index\""
+    not_modified_count = 0
+
+    def do_GET(self):
+        if self.headers["If-None-Match"] == self.etag:
+            MockLibraryIndexRequestHandler.not_modified_count += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open("data/library_index.json", mode="rb") as library_index_file:
+            response_body = library_index_file.read()
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, *arguments):
+        pass
+
+
+class MockRedirectRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Redirects requests for /<status> to /target with that status. Responds to requests for /target with the method,
+    Content-Type and body of the request.
+    """
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        if self.path != "/target":
+            self.send_response(int(self.path[1:]))
+            self.send_header("Location", "/target")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        request_body = self.rfile.read(int(self.headers["Content-Length"] or 0)).decode(file_encoding)
+        response_body = json.dumps({"method": self.command,
+                                    "content_type": self.headers["Content-Type"],
+                                    "body": request_body}).encode(file_encoding)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, *arguments):
+        pass
+
+
 class TestInoliblist(unittest.TestCase):
     # NOTE: the tests are run in order sorted by method name, not in the order below
 
@@ -247,6 +349,12 @@ class TestInoliblist(unittest.TestCase):
         set_github_token(github_token_input=argument.github_token)
         initialize_table()
         initialize_output_files()
+        start_repository_processing()
+
+    def tearDown(self):
+        finish_repository_processing()
+        shutil.rmtree(output_folder_name, ignore_errors=True)
+        shutil.rmtree("cache_test", ignore_errors=True)
 
     # @unittest.skip("")
     def test_set_github_token(self):
@@ -268,15 +376,66 @@ class TestInoliblist(unittest.TestCase):
         self.assertEqual(get_table()[0][Column.repository_url], "Repository URL \x1b \x1b")
 
     @unittest.skip("")
-    def test_process_library_manager_index(self):
+    def test_collect_library_manager_candidates(self):
         # open an abbreviated local copy of the Library Manager index
         with open('data/library_index.json', encoding=file_encoding) as json_file:
             json_data = json.load(json_file)
-        process_library_manager_index(json_data=json_data)
+        candidates = {}
+        collect_library_manager_candidates(library_releases=json_data["libraries"], candidates=candidates)
+        process_candidates(candidates=candidates)
         self.assertEqual(get_table()[1][Column.repository_name], "Esplora")
         # check that duplicate removal works (there are two Esplora items in the index file)
         self.assertEqual(get_table()[2][Column.repository_name], "Audio")
 
+    def test_library_index_parser(self):
+        with open('data/library_index.json', encoding=file_encoding) as json_file:
+            libraries = json.load(json_file)["libraries"]
+        # values split between chunks must be parsed correctly
+        for chunk_size in [library_index_chunk_size, 1, 7]:
+            sys.modules["inoliblist"].library_index_chunk_size = chunk_size
+            try:
+                with open('data/library_index.json', encoding=file_encoding) as json_file:
+                    self.assertEqual(list(LibraryIndexParser(library_index_file=json_file).generate_libraries()),
+                                     libraries)
+            finally:
+                sys.modules["inoliblist"].library_index_chunk_size = library_index_chunk_size
+        json_file = io.StringIO('{"version": 1.5, "libraries": [], "updated": {"date": "2018-09-13"}}')
+        self.assertEqual(list(LibraryIndexParser(library_index_file=json_file).generate_libraries()), [])
+        with self.assertRaises(ValueError):
+            list(LibraryIndexParser(library_index_file=io.StringIO('{"libraries": [{}')).generate_libraries())
+
+    def test_download_library_index(self):
+        mock_server = http.server.HTTPServer(("127.0.0.1", 0), MockLibraryIndexRequestHandler)
+        threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+        set_base_urls(library_index_url_input="http://127.0.0.1:" + str(mock_server.server_port) +
+                                              "/library_index.json")
+        set_cache_folder(cache_folder_input="cache_test")
+        try:
+            library_index_path = download_library_index()
+            self.assertEqual(next(generate_library_index_releases(library_index_path=library_index_path))["name"],
+                             "Esplora")
+            # evicting the HTTP response cache entries doesn't delete the index
+            sys.modules["inoliblist"].maximum_cache_size = 0
+            try:
+                save_cache_entry(url="https://example.com/entry", headers={},
+                                 response=URLResponse(url="https://example.com/entry", status=200,
+                                                      headers=http.client.parse_headers(io.BytesIO(b"ETag: \"1\"\r\n"
+                                                                                                   b"\r\n")),
+                                                      body=b"x"))
+            finally:
+                sys.modules["inoliblist"].maximum_cache_size = maximum_cache_size
+            self.assertIsNone(load_cache_entry(url="https://example.com/entry", headers={}))
+            # the index has not changed so it should not be downloaded again
+            self.assertEqual(download_library_index(), library_index_path)
+            self.assertEqual(MockLibraryIndexRequestHandler.not_modified_count, 1)
+            with open('data/library_index.json', mode="rb") as json_file:
+                with open(library_index_path, mode="rb") as library_index_file:
+                    self.assertEqual(library_index_file.read(), json_file.read())
+        finally:
+            set_cache_folder(cache_folder_input=None)
+            set_base_urls()
+            mock_server.shutdown()
+
     @unittest.skip("")
     def test_get_github_api_response(self):
         # requirements: none
@@ -290,6 +449,86 @@ class TestInoliblist(unittest.TestCase):
         check_rate_limiting(api_type="search")
         check_rate_limiting(api_type="core")
 
+    def test_rate_limit_scheduler(self):
+        rate_limit_scheduler_object = RateLimitScheduler()
+        headers = http.client.parse_headers(io.BytesIO(b"X-RateLimit-Remaining: 10\r\n" +
+                                                       b"X-RateLimit-Reset: " + str(int(time.time()) + 3600).encode() +
+                                                       b"\r\n\r\n"))
+        rate_limit_scheduler_object.update_from_headers(url="https://api.github.com/search/repositories",
+                                                        headers=headers)
+        self.assertEqual(rate_limit_scheduler_object.budgets["search"]["remaining"], 10)
+        # the request can be made immediately
+        rate_limit_scheduler_object.acquire(api_type="search")
+        self.assertEqual(rate_limit_scheduler_object.budgets["search"]["remaining"], 9)
+        self.assertNotIn("core", rate_limit_scheduler_object.budgets)
+
+    def test_rate_limit_scheduler_rate_limit_api_error(self):
+        reset_time = int(time.time()) + 3600
+        rate_limit_body = json.dumps({"resources": {
+            "core": {"limit": 5000, "remaining": 4999, "reset": reset_time},
+            "search": {"limit": 30, "remaining": 30, "reset": reset_time}
+        }}).encode(file_encoding)
+        request_urls = []
+
+        def mock_send_request(url, headers, method, data):
+            request_urls.append(url)
+            if len(request_urls) == 1:
+                raise urllib.error.HTTPError(url, 503, "Service Unavailable",
+                                             http.client.parse_headers(io.BytesIO(b"Retry-After: 0\r\n\r\n")), None)
+            return URLResponse(url=url, status=200, headers=http.client.parse_headers(io.BytesIO(b"\r\n")),
+                               body=rate_limit_body)
+
+        sys.modules["inoliblist"].send_request = mock_send_request
+        sys.modules["inoliblist"].rate_limit_scheduler = RateLimitScheduler()
+        try:
+            # the failed rate_limit API request is retried instead of waiting for the check it is part of
+            check_thread = threading.Thread(target=check_rate_limiting, kwargs={"api_type": "core"}, daemon=True)
+            check_thread.start()
+            check_thread.join(timeout=10)
+            self.assertFalse(check_thread.is_alive())
+            self.assertEqual(request_urls, [github_api_url + rate_limit_api_path] * 2)
+            self.assertEqual(sys.modules["inoliblist"].rate_limit_scheduler.budgets["core"]["remaining"], 4998)
+        finally:
+            sys.modules["inoliblist"].send_request = send_request
+            sys.modules["inoliblist"].rate_limit_scheduler = rate_limit_scheduler
+
+    def test_rate_limit_scheduler_reset(self):
+        reset_time = int(time.time()) + 3600
+        rate_limit_body = json.dumps({"resources": {
+            "core": {"limit": 5000, "remaining": 5000, "reset": reset_time},
+            "search": {"limit": 30, "remaining": 30, "reset": reset_time}
+        }}).encode(file_encoding)
+        request_urls = []
+
+        def mock_send_request(url, headers, method, data):
+            request_urls.append(url)
+            return URLResponse(url=url, status=200, headers=http.client.parse_headers(io.BytesIO(b"\r\n")),
+                               body=rate_limit_body)
+
+        sys.modules["inoliblist"].send_request = mock_send_request
+        sys.modules["inoliblist"].rate_limit_scheduler = RateLimitScheduler()
+        try:
+            scheduler = sys.modules["inoliblist"].rate_limit_scheduler
+            # the reset time of the allotment has passed while requests remained
+            headers = http.client.parse_headers(io.BytesIO(b"X-RateLimit-Remaining: 10\r\n" +
+                                                           b"X-RateLimit-Reset: " + str(int(time.time()) - 1).encode() +
+                                                           b"\r\n\r\n"))
+            scheduler.update_from_headers(url=github_api_url + "/repos/arduino/Arduino", headers=headers)
+            # the allotment is checked and refilled
+            check_rate_limiting(api_type="core")
+            self.assertEqual(request_urls, [github_api_url + rate_limit_api_path])
+            self.assertEqual(scheduler.budgets["core"]["remaining"], 4999)
+            self.assertEqual(scheduler.budgets["core"]["reset"], reset_time)
+            # waiting for the allotments before retrying a request doesn't use them up
+            check_rate_limiting(api_type="core", charge=False)
+            check_rate_limiting(api_type="search", charge=False)
+            self.assertEqual(scheduler.budgets["core"]["remaining"], 4999)
+            self.assertEqual(scheduler.budgets["search"]["remaining"], 30)
+            self.assertEqual(len(request_urls), 1)
+        finally:
+            sys.modules["inoliblist"].send_request = send_request
+            sys.modules["inoliblist"].rate_limit_scheduler = rate_limit_scheduler
+
     @unittest.skip("")
     def test_get_json_from_url(self):
         # requirements: none
@@ -316,13 +555,152 @@ class TestInoliblist(unittest.TestCase):
         self.assertEqual(TestInoliblist.repository_object_veberarnaud_shiftregister__arduinolibrary["page_count"],
                          1)
 
+    def test_get_json_from_url_async_http(self):
+        set_async_http(enable_async_http_input=True)
+        try:
+            json_object = get_json_from_url(url="https://api.github.com/repos/arduino/forum-issues")
+            # the response should be the same as with urllib
+            self.assertEqual(json_object, TestInoliblist.repository_object_arduino_forum_issues)
+            with self.assertRaises(urllib.error.HTTPError):
+                open_url(url="https://raw.githubusercontent.com/arduino/forum-issues/master/library.properties")
+        finally:
+            set_async_http(enable_async_http_input=False)
+
+    def test_async_http_redirect(self):
+        mock_server = http.server.HTTPServer(("127.0.0.1", 0), MockRedirectRequestHandler)
+        threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+        set_async_http(enable_async_http_input=True)
+        try:
+            redirected_requests = {}
+            for status in [301, 302, 303, 307, 308]:
+                response = sys.modules["inoliblist"].async_http_transport.request(
+                    url="http://127.0.0.1:" + str(mock_server.server_port) + "/" + str(status),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                    data=b"{}"
+                )
+                redirected_requests[status] = json.loads(response.read().decode(file_encoding))
+        finally:
+            set_async_http(enable_async_http_input=False)
+            mock_server.shutdown()
+            mock_server.server_close()
+        # the same as urllib.request.HTTPRedirectHandler
+        for status in [301, 302, 303]:
+            self.assertEqual(redirected_requests[status], {"method": "GET", "content_type": None, "body": ""})
+        # the method and body are kept
+        for status in [307, 308]:
+            self.assertEqual(redirected_requests[status],
+                             {"method": "POST", "content_type": "application/json", "body": "{}"})
+
+    def test_open_url_cache(self):
+        set_cache_folder(cache_folder_input="cache_test")
+        try:
+            url = "https://raw.githubusercontent.com/sparkfun/phant-arduino/master/library.properties"
+            uncached_response = open_url(url=url)
+            # the second request is conditional and the response should come from the cache
+            cached_response = open_url(url=url)
+            self.assertEqual(cached_response.read(), uncached_response.read())
+            self.assertEqual(cached_response.status, 200)
+            self.assertTrue(os.path.isfile(get_cache_path(url=url, headers={})))
+        finally:
+            set_cache_folder(cache_folder_input=None)
+
+    def test_url_is_cacheable(self):
+        set_cache_folder(cache_folder_input="cache_test")
+        try:
+            self.assertTrue(url_is_cacheable(url="https://api.github.com/repos/arduino/Arduino", method="GET"))
+            self.assertFalse(url_is_cacheable(url="https://api.github.com/repos/arduino/Arduino", method="HEAD"))
+            self.assertFalse(url_is_cacheable(url="https://api.github.com/rate_limit", method="GET"))
+        finally:
+            set_cache_folder(cache_folder_input=None)
+        self.assertFalse(url_is_cacheable(url="https://api.github.com/repos/arduino/Arduino", method="GET"))
+
+    def test_save_cache_entry(self):
+        set_cache_folder(cache_folder_input="cache_test")
+        sys.modules["inoliblist"].maximum_cache_size = 10000
+        try:
+            headers = {"Accept": "application/json"}
+            response_headers = http.client.parse_headers(io.BytesIO(b"ETag: \"1\"\r\n\r\n"))
+            save_cache_entry(url="https://example.com/other", headers=headers,
+                             response=URLResponse(url="https://example.com/other", status=200,
+                                                  headers=response_headers, body=b"x" * 1000))
+            # replacing an entry must not increase the tracked cache size, so no eviction happens
+            for entry_number in range(100):
+                response_headers = http.client.parse_headers(io.BytesIO(b"ETag: \"" + str(entry_number).encode() +
+                                                                        b"\"\r\n\r\n"))
+                save_cache_entry(url="https://example.com/entry", headers=headers,
+                                 response=URLResponse(url="https://example.com/entry", status=200,
+                                                      headers=response_headers, body=b"x" * 1000))
+            self.assertIsNotNone(load_cache_entry(url="https://example.com/other", headers=headers))
+            self.assertEqual(load_cache_entry(url="https://example.com/entry", headers=headers)["etag"], "\"99\"")
+            self.assertEqual(sys.modules["inoliblist"].cache_size, get_folder_size(folder="cache_test"))
+        finally:
+            sys.modules["inoliblist"].maximum_cache_size = maximum_cache_size
+            set_cache_folder(cache_folder_input=None)
+
+    def test_get_graphql_repository_objects(self):
+        mock_server = http.server.HTTPServer(("127.0.0.1", 0), MockGraphQLRequestHandler)
+        threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+        set_graphql_api_url(graphql_api_url_input="http://127.0.0.1:" + str(mock_server.server_port) + "/graphql")
+        try:
+            repository_objects = get_graphql_repository_objects(full_names=["per1234/inoliblist", "per1234/missing"])
+        finally:
+            set_graphql_api_url(graphql_api_url_input=None)
+            mock_server.shutdown()
+            mock_server.server_close()
+        self.assertEqual(len(repository_objects), 2)
+        self.assertEqual(repository_objects[0]["full_name"], "per1234/inoliblist")
+        self.assertEqual(repository_objects[0]["parent"]["full_name"], "arduino/Arduino")
+        self.assertEqual(repository_objects[0]["license"]["spdx_id"], "MIT")
+        self.assertEqual(repository_objects[0]["combined_status"]["state"], "pending")
+        self.assertEqual(repository_objects[0]["topics"], ["arduino-library"])
+        # the missing repository will be fetched via the REST API
+        self.assertIsNone(repository_objects[1])
+
+    def test_retry_policy(self):
+        retry_policy = RetryPolicy()
+        # the delay is taken from the Retry-After header
+        for retry_number in range(retry_budgets["server_error"]):
+            self.assertTrue(retry_policy.retry(error_class="server_error", response_headers={"Retry-After": "0"}))
+        # the budget is used up
+        self.assertFalse(retry_policy.retry(error_class="server_error", response_headers={"Retry-After": "0"}))
+        self.assertEqual(retry_policy.exhausted_error_class, "server_error")
+        # each class of error has its own budget
+        self.assertTrue(retry_policy.retry(error_class="connection_error", response_headers={"Retry-After": "0"}))
+
+        self.assertEqual(RetryPolicy.get_delay(error_class="rate_limit",
+                                               retry_count=0,
+                                               response_headers={"Retry-After": "120"}), 120)
+        # the Retry-After header can also be an HTTP-date
+        retry_date = email.utils.formatdate(time.time() + 100, usegmt=True)
+        delay = RetryPolicy.get_delay(error_class="rate_limit",
+                                      retry_count=0,
+                                      response_headers={"Retry-After": retry_date})
+        self.assertTrue(90 < delay <= 100)
+        self.assertEqual(RetryPolicy.get_delay(error_class="server_error",
+                                               retry_count=0,
+                                               response_headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0)
+        # the rate limit allotment is used up
+        delay = RetryPolicy.get_delay(error_class="rate_limit",
+                                      retry_count=0,
+                                      response_headers={"X-RateLimit-Remaining": "0",
+                                                        "X-RateLimit-Reset": str(int(time.time()) + 100)})
+        self.assertTrue(90 < delay <= 100)
+        # exponential backoff
+        for retry_count in range(10):
+            delay = RetryPolicy.get_delay(error_class="server_error", retry_count=retry_count, response_headers=None)
+            self.assertTrue(0 <= delay <= min(retry_maximum_delay, retry_base_delay * 2 ** retry_count))
+        self.assertTrue(RetryPolicy.get_delay(error_class="rate_limit",
+                                              retry_count=0,
+                                              response_headers={}) >= secondary_rate_limit_delay)
+
     @unittest.skip("disabled because it causes a delay")
     def test_determine_urlopen_retry_true(self):
-        self.assertTrue(determine_urlopen_retry(exception="HTTP Error 502: Bad Gateway"))
+        self.assertTrue(determine_urlopen_retry(exception="HTTP Error 502: Bad Gateway", retry_policy=RetryPolicy()))
 
     @unittest.skip("")
     def test_determine_urlopen_retry_false(self):
-        self.assertFalse(determine_urlopen_retry(exception="HTTP Error 404: Not Found"))
+        self.assertFalse(determine_urlopen_retry(exception="HTTP Error 404: Not Found", retry_policy=RetryPolicy()))
 
     @unittest.skip("")
     def test_normalize_url_space(self):
@@ -351,55 +729,112 @@ class TestInoliblist(unittest.TestCase):
         self.assertEqual(url, "http://example.org/has/redundant-slashes/")
 
     @unittest.skip("")
-    def test_search_repositories(self):
-        search_repositories(search_query="ethernet+in:name+org:arduino-libraries",
-                            created_argument_list=[">=2013-01-01"],
-                            fork_argument="false",
-                            verify=False,
-                            log_verification_failures=False)
+    def test_collect_search_candidates(self):
+        candidates = {}
+        collect_search_candidates(search_query="ethernet+in:name+org:arduino-libraries",
+                                  created_argument_list=[">=2013-01-01"],
+                                  fork_argument="false",
+                                  verify=False,
+                                  log_verification_failures=False,
+                                  candidates=candidates)
+        process_candidates(candidates=candidates)
         self.assertEqual(get_table()[1][Column.repository_url], "https://github.com/arduino-libraries/Ethernet")
 
     @unittest.skip("")
-    def test_search_repositories_created_argument_list(self):
-        search_repositories(search_query="ethernet+in:name+org:arduino-libraries",
-                            created_argument_list=["<=2012-01-01", "2013-01-01..2014-01-01"],
-                            fork_argument="false",
-                            verify=False,
-                            log_verification_failures=False)
+    def test_collect_search_candidates_created_argument_list(self):
+        candidates = {}
+        collect_search_candidates(search_query="ethernet+in:name+org:arduino-libraries",
+                                  created_argument_list=["<=2012-01-01", "2013-01-01..2014-01-01"],
+                                  fork_argument="false",
+                                  verify=False,
+                                  log_verification_failures=False,
+                                  candidates=candidates)
+        process_candidates(candidates=candidates)
         # created_at == 2015-03-27T09:54:12Z so this will return no results if the created_argument_list handling is
         # correct
         self.assertEqual(len(get_table()), 1)
 
     @unittest.skip("")
-    def test_search_repositories_fork_argument(self):
-        search_repositories(search_query="watchdoglog+in:name+user:per1234",
-                            created_argument_list=[">2013-01-01"],
-                            fork_argument="only",
-                            verify=False,
-                            log_verification_failures=False)
+    def test_collect_search_candidates_fork_argument(self):
+        candidates = {}
+        collect_search_candidates(search_query="watchdoglog+in:name+user:per1234",
+                                  created_argument_list=[">2013-01-01"],
+                                  fork_argument="only",
+                                  verify=False,
+                                  log_verification_failures=False,
+                                  candidates=candidates)
+        process_candidates(candidates=candidates)
         # search defaults to fork:false so if fork_argument handling is not working this search would give no results
         self.assertEqual(len(get_table()), 2)
 
     @unittest.skip("")
-    def test_search_repositories_verify(self):
-        search_repositories(search_query="eepromutility+in:name+user:per1234",
-                            created_argument_list=["<2018-06-06"],
-                            fork_argument="false",
-                            verify=True,
-                            log_verification_failures=False)
+    def test_collect_search_candidates_verify(self):
+        candidates = {}
+        collect_search_candidates(search_query="eepromutility+in:name+user:per1234",
+                                  created_argument_list=["<2018-06-06"],
+                                  fork_argument="false",
+                                  verify=True,
+                                  log_verification_failures=False,
+                                  candidates=candidates)
+        process_candidates(candidates=candidates)
         # repository does not meet the verification requirements so it should not be added to the table
         self.assertEqual(len(get_table()), 1)
 
     @unittest.skip("")
-    def test_search_repositories_verify_blacklist(self):
-        search_repositories(search_query="arduino+in:name+user:Firmata",
-                            created_argument_list=["2012-01-19"],
-                            fork_argument="false",
-                            verify=True,
-                            log_verification_failures=False)
+    def test_collect_search_candidates_verify_blacklist(self):
+        candidates = {}
+        collect_search_candidates(search_query="arduino+in:name+user:Firmata",
+                                  created_argument_list=["2012-01-19"],
+                                  fork_argument="false",
+                                  verify=True,
+                                  log_verification_failures=False,
+                                  candidates=candidates)
+        process_candidates(candidates=candidates)
         # repository name is blacklisted so it should not be added to the table
         self.assertEqual(len(get_table()), 1)
 
+    def test_split_date_range(self):
+        date_range = parse_created_argument(created_argument="2016-03-24..2017-01-07")
+        self.assertEqual(get_created_argument(date_range=date_range), "2016-03-24..2017-01-07")
+        self.assertEqual([get_created_argument(date_range=split_range)
+                          for split_range in split_date_range(date_range=date_range)],
+                         ["2016-03-24..2016-08-15", "2016-08-16..2017-01-07"])
+        date_range = parse_created_argument(created_argument="<=2016-03-23")
+        self.assertEqual([get_created_argument(date_range=split_range)
+                          for split_range in split_date_range(date_range=date_range)],
+                         ["<=2011-12-27", "2011-12-28..2016-03-23"])
+        self.assertEqual(get_created_argument(date_range=parse_created_argument(created_argument=">=2018-06-06")),
+                         ">=2018-06-06")
+
+    def test_load_search_segments(self):
+        set_cache_folder(cache_folder_input="cache_test")
+        try:
+            save_search_segments(search_query="topic:arduino",
+                                 fork_argument="true",
+                                 search_segments=[(parse_created_argument(created_argument="<=2016-03-23"), 300),
+                                                  (parse_created_argument(created_argument="2016-03-24..2017-01-07"),
+                                                   300),
+                                                  (parse_created_argument(created_argument=">=2017-01-08"), 900)])
+            date_ranges = load_search_segments(search_query="topic:arduino", fork_argument="true")
+        finally:
+            set_cache_folder(cache_folder_input=None)
+        # the sparse segments are merged
+        self.assertEqual([get_created_argument(date_range=date_range) for date_range in date_ranges],
+                         ["<=2017-01-07", ">=2017-01-08"])
+
+        set_cache_folder(cache_folder_input="cache_test")
+        try:
+            save_search_segments(search_query="topic:arduino",
+                                 fork_argument="true",
+                                 search_segments=[(parse_created_argument(created_argument="<=2016-03-23"), 300),
+                                                  (parse_created_argument(created_argument=">=2016-03-24"), 300)])
+            date_ranges = load_search_segments(search_query="topic:arduino", fork_argument="true")
+        finally:
+            set_cache_folder(cache_folder_input=None)
+        # all the segments are merged into one without bounds
+        self.assertEqual([get_created_argument(date_range=date_range) for date_range in date_ranges],
+                         [">=2007-10-01"])
+
     @unittest.skip("")
     def test_populate_row(self):
         # requirements: library.properties, library.json, contributor count >0
@@ -532,6 +967,468 @@ class TestInoliblist(unittest.TestCase):
                      log_verification_failures=False)
         self.assertEqual(len(get_table()), 1)
 
+    def test_populate_row_jobs(self):
+        # the result of concurrent processing should be the same as a serial run
+        finish_repository_processing()
+        set_job_count(job_count_input=4)
+        start_repository_processing()
+        populate_row(repository_object=TestInoliblist.repository_object_sparkfun_phant_arduino["json_data"],
+                     in_library_manager=True,
+                     verify=False,
+                     log_verification_failures=False)
+        populate_row(repository_object=TestInoliblist.repository_object_arduino_forum_issues["json_data"],
+                     in_library_manager=False,
+                     verify=True,
+                     log_verification_failures=False)
+        # duplicate
+        populate_row(repository_object=TestInoliblist.repository_object_sparkfun_phant_arduino["json_data"],
+                     in_library_manager=False,
+                     verify=False,
+                     log_verification_failures=False)
+        finish_repository_processing()
+        set_job_count(job_count_input=1)
+        self.assertEqual(len(get_table()), 2)
+        self.assertEqual(get_table()[1][Column.repository_name], "phant-arduino")
+        self.assertEqual(get_table()[1][Column.in_library_manager_index], "True")
+
+    def test_sort_list_files(self):
+        # the workers write the lines in the order the repositories finish processing
+        for line in ["https://github.com/per1234/b\n", "https://github.com/per1234/a\n"]:
+            with open(output_folder_name + "/" + verification_failed_list_filename, mode="a",
+                      encoding=file_encoding) as failed_verification_list:
+                failed_verification_list.write(line)
+        finish_repository_processing()
+        with open(output_folder_name + "/" + verification_failed_list_filename,
+                  encoding=file_encoding) as failed_verification_list:
+            self.assertEqual(failed_verification_list.read(),
+                             "https://github.com/per1234/a\nhttps://github.com/per1234/b\n")
+        self.assertFalse(os.path.exists(output_folder_name + "/" + non_library_folders_list_filename))
+
+    def test_set_job_count_invalid(self):
+        with self.assertRaises(ValueError):
+            set_job_count(job_count_input=0)
+
+    def test_set_search_job_count_invalid(self):
+        with self.assertRaises(ValueError):
+            set_search_job_count(search_job_count_input=0)
+
+    def test_populate_row_incremental(self):
+        repository_object = TestInoliblist.repository_object_sparkfun_phant_arduino["json_data"]
+        # create a previous list containing the repository
+        previous_row = [""] * Column.count
+        previous_row[Column.repository_url] = repository_object["html_url"]
+        previous_row[Column.last_push_date] = repository_object["pushed_at"]
+        previous_row[Column.library_path] = "previous-path"
+        previous_row[Column.library_manager_name] = "previous-name"
+        previous_row[Column.contributor_count] = "42"
+        with open(file=output_folder_name + "/previous_list.csv",
+                  mode="w",
+                  encoding=file_encoding,
+                  newline=file_newline
+                  ) as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
+            csv_writer.writerows([get_heading_row(), previous_row])
+
+        set_incremental_mode(previous_list_path=output_folder_name + "/previous_list.csv",
+                             refresh_volatile_columns_input=False)
+        populate_row(repository_object=repository_object,
+                     in_library_manager=True,
+                     verify=False,
+                     log_verification_failures=False)
+        set_incremental_mode(previous_list_path=None)
+        # the data should come from the previous list since the repository hasn't been pushed to
+        self.assertEqual(get_table()[1][Column.library_path], "previous-path")
+        self.assertEqual(get_table()[1][Column.library_manager_name], "previous-name")
+        self.assertEqual(get_table()[1][Column.contributor_count], "42")
+        self.assertEqual(get_table()[1][Column.in_library_manager_index], "True")
+
+    def test_load_checkpoint(self):
+        row_list = [""] * Column.count
+        row_list[Column.repository_url] = "https://github.com/arduino-libraries/Servo"
+        candidates = {}
+        add_candidate(candidates=candidates,
+                      repository_url=row_list[Column.repository_url],
+                      full_name="arduino-libraries/Servo",
+                      repository_object=None,
+                      source="library_manager_index",
+                      in_library_manager=True,
+                      verify=False,
+                      log_verification_failures=False)
+        initialize_checkpoint()
+        try:
+            save_candidates(candidates=candidates, repository_keys=list(candidates), collected_source_count=4)
+            add_row_to_table(row_list=row_list)
+            with open(output_folder_name + "/" + verification_failed_list_filename, mode="a",
+                      encoding=file_encoding) as failed_verification_list:
+                failed_verification_list.write("https://github.com/per1234/verification-failed\n")
+            save_checkpoint()
+            # a row produced after the checkpoint is discarded when resuming
+            row_list = [""] * Column.count
+            row_list[Column.repository_url] = "https://github.com/arduino-libraries/Ethernet"
+            add_row_to_table(row_list=row_list)
+            # so are the lines written to the list files
+            with open(output_folder_name + "/" + verification_failed_list_filename, mode="a",
+                      encoding=file_encoding) as failed_verification_list:
+                failed_verification_list.write("https://github.com/per1234/verification-failed-again\n")
+            with open(output_folder_name + "/" + non_library_folders_list_filename, mode="a",
+                      encoding=file_encoding) as non_library_folders_list:
+                non_library_folders_list.write("not-a-library\n")
+
+            initialize_table()
+            load_checkpoint()
+            self.assertEqual(len(get_table()), 2)
+            self.assertEqual(get_table()[1][Column.repository_url], "https://github.com/arduino-libraries/Servo")
+            self.assertEqual(sys.modules["inoliblist"].resumed_candidates, candidates)
+            with open(output_folder_name + "/" + verification_failed_list_filename,
+                      encoding=file_encoding) as failed_verification_list:
+                self.assertEqual(failed_verification_list.read(), "https://github.com/per1234/verification-failed\n")
+            self.assertEqual(os.path.getsize(output_folder_name + "/" + non_library_folders_list_filename), 0)
+        finally:
+            disable_checkpoint()
+
+    def test_load_checkpoint_search_progress(self):
+        candidates = {}
+        add_candidate(candidates=candidates,
+                      repository_url="https://github.com/arduino-libraries/Servo",
+                      full_name="arduino-libraries/Servo",
+                      repository_object=None,
+                      source="library_manager_index",
+                      in_library_manager=True,
+                      verify=False,
+                      log_verification_failures=False)
+        initialize_checkpoint()
+        try:
+            save_candidates(candidates=candidates, repository_keys=list(candidates), collected_source_count=1)
+            # a search segment updates a candidate and adds another
+            for full_name in ["arduino-libraries/Servo", "arduino-libraries/Ethernet"]:
+                add_candidate(candidates=candidates,
+                              repository_url="https://github.com/" + full_name,
+                              full_name=full_name,
+                              repository_object={"full_name": full_name, "html_url": "https://github.com/" + full_name},
+                              source="topic:arduino-library+fork:true",
+                              in_library_manager=False,
+                              verify=False,
+                              log_verification_failures=False)
+            search_progress = [{"created_argument": "<=2018-05-29",
+                                "total_count": 150,
+                                "collected": True,
+                                "search_results_count": 150},
+                               {"created_argument": ">=2018-05-30",
+                                "total_count": 10,
+                                "collected": False,
+                                "search_results_count": 0}]
+            save_candidates(candidates=candidates,
+                            repository_keys=list(candidates),
+                            collected_source_count=1,
+                            search_progress=search_progress)
+            # a segment added after the checkpoint is discarded when resuming
+            with open(output_folder_name + "/" + candidates_filename, mode="a",
+                      encoding=file_encoding) as candidates_file:
+                candidates_file.write(json.dumps(["https://github.com/arduino-libraries/wire", {}]) + "\n")
+
+            initialize_table()
+            load_checkpoint()
+            resumed_candidates = sys.modules["inoliblist"].resumed_candidates
+            self.assertEqual(resumed_candidates, candidates)
+            self.assertEqual(list(resumed_candidates), list(candidates))
+            self.assertEqual(resumed_candidates["https://github.com/arduino-libraries/servo"]["sources"],
+                             ["library_manager_index", "topic:arduino-library+fork:true"])
+            # the Library Manager index is not collected again and the search continues from the second segment
+            self.assertFalse(collection_source_is_pending(source_number=0))
+            self.assertTrue(collection_source_is_pending(source_number=1))
+            self.assertEqual(sys.modules["inoliblist"].checkpoint["search_progress"], search_progress)
+        finally:
+            disable_checkpoint()
+
+    def test_get_compact_repository_object(self):
+        repository_object = {"name": "Servo",
+                             "full_name": "arduino-libraries/Servo",
+                             "html_url": "https://github.com/arduino-libraries/Servo",
+                             "owner": {"login": "arduino-libraries", "id": 37507762, "type": "Organization"},
+                             "license": {"key": "lgpl-2.1", "spdx_id": "LGPL-2.1", "name": "GNU LGPL v2.1"},
+                             "language": "C++",
+                             "size": 95,
+                             "watchers_count": 100,
+                             "score": 1.0}
+        self.assertEqual(get_compact_repository_object(repository_object=repository_object),
+                         {"name": "Servo",
+                          "full_name": "arduino-libraries/Servo",
+                          "html_url": "https://github.com/arduino-libraries/Servo",
+                          "owner": {"login": "arduino-libraries"},
+                          "license": {"spdx_id": "LGPL-2.1"},
+                          "language": "C++"})
+        repository_object["license"] = None
+        self.assertIsNone(get_compact_repository_object(repository_object=repository_object)["license"])
+
+    def test_add_candidate(self):
+        candidates = {}
+        add_candidate(candidates=candidates,
+                      repository_url="https://github.com/arduino-libraries/Servo.git",
+                      full_name="arduino-libraries/Servo",
+                      repository_object=None,
+                      source="library_manager_index",
+                      in_library_manager=True,
+                      verify=False,
+                      log_verification_failures=False)
+        repository_object = {"html_url": "https://github.com/Arduino-Libraries/Servo"}
+        add_candidate(candidates=candidates,
+                      repository_url=repository_object["html_url"],
+                      full_name="Arduino-Libraries/Servo",
+                      repository_object=repository_object,
+                      source="topic:arduino+fork:true",
+                      in_library_manager=False,
+                      verify=True,
+                      log_verification_failures=True)
+        # the different case and .git suffix refer to the same repository
+        self.assertEqual(len(candidates), 1)
+        candidate = candidates["https://github.com/arduino-libraries/servo"]
+        self.assertEqual(candidate["sources"], ["library_manager_index", "topic:arduino+fork:true"])
+        self.assertTrue(candidate["in_library_manager"])
+        self.assertFalse(candidate["verify"])
+        self.assertTrue(candidate["log_verification_failures"])
+        self.assertIs(candidate["repository_object"], repository_object)
+
+    def test_group_library_releases(self):
+        library_releases = [{"name": "Servo",
+                             "version": "1.1.2",
+                             "repository": "https://github.com/arduino-libraries/Servo.git"},
+                            {"name": "Ethernet",
+                             "version": "2.0.0",
+                             "repository": "http://github.com/arduino-libraries/Ethernet"},
+                            {"name": "Servo",
+                             "version": "1.1.10",
+                             "repository": "https://www.github.com/Arduino-Libraries/Servo/"},
+                            {"name": "Servo",
+                             "version": "1.1.10-beta",
+                             "repository": "https://github.com/arduino-libraries/Servo"},
+                            {"name": "Foo",
+                             "version": "1.0.0",
+                             "repository": "https://gitlab.com/foo/Foo.git"}]
+        libraries = group_library_releases(library_releases=library_releases)
+        # the releases that aren't next to each other in the index are grouped and non-GitHub repositories are skipped
+        self.assertEqual(list(libraries), ["https://github.com/arduino-libraries/servo",
+                                           "https://github.com/arduino-libraries/ethernet"])
+        servo_library = libraries["https://github.com/arduino-libraries/servo"]
+        self.assertEqual(servo_library["full_name"], "arduino-libraries/Servo")
+        self.assertEqual(servo_library["release_count"], 3)
+        self.assertEqual(servo_library["newest_release"]["version"], "1.1.10")
+        self.assertEqual(libraries["https://github.com/arduino-libraries/ethernet"]["full_name"],
+                         "arduino-libraries/Ethernet")
+
+        self.assertIsNone(get_repository_full_name(repository_url="https://github.com/arduino-libraries"))
+        self.assertTrue(get_version_key(version="1.0.0") > get_version_key(version="1.0.0-rc.1"))
+        self.assertTrue(get_version_key(version="2.0") > get_version_key(version="1.99.0"))
+
+    def test_library_index_metadata(self):
+        repository_object = {"html_url": "https://github.com/arduino-libraries/Servo",
+                             "pushed_at": "2018-01-01T00:00:00Z"}
+        library_manager_data = {"full_name": "arduino-libraries/Servo",
+                                "release_count": 2,
+                                "newest_release": {"name": "Servo",
+                                                   "version": "1.1.2",
+                                                   "author": "Michael Margolis, Arduino",
+                                                   "maintainer": "Arduino <info@arduino.cc>",
+                                                   "sentence": "Allows Arduino boards to control a variety of servo "
+                                                               "motors.",
+                                                   "paragraph": None,
+                                                   "category": "Device Control",
+                                                   "website": "http://www.arduino.cc/en/Reference/Servo",
+                                                   "architectures": ["avr", "sam", "samd"]}}
+        # it is disabled by default
+        self.assertFalse(library_index_metadata_is_current(repository_object=repository_object,
+                                                           library_manager_data=library_manager_data))
+        set_library_index_metadata(use_library_index_metadata_input=True)
+        try:
+            self.assertFalse(library_index_metadata_is_current(repository_object=repository_object,
+                                                               library_manager_data=None))
+            # the release is unverified until library.properties has been fetched
+            self.assertFalse(library_index_metadata_is_current(repository_object=repository_object,
+                                                               library_manager_data=library_manager_data))
+            # the library.properties of the repository is not the release's so it is not recorded
+            row_list = [""] * Column.count
+            row_list[Column.library_manager_version] = "1.1.3-beta"
+            record_verified_library_release(repository_object=repository_object,
+                                            library_manager_data=library_manager_data,
+                                            row_list=row_list)
+            self.assertFalse(library_index_metadata_is_current(repository_object=repository_object,
+                                                               library_manager_data=library_manager_data))
+            row_list[Column.library_manager_version] = "1.1.2"
+            record_verified_library_release(repository_object=repository_object,
+                                            library_manager_data=library_manager_data,
+                                            row_list=row_list)
+            # the repository hasn't been pushed to since the release was verified
+            self.assertTrue(library_index_metadata_is_current(repository_object=repository_object,
+                                                              library_manager_data=library_manager_data))
+
+            row_list = [""] * Column.count
+            fill_library_index_metadata(row_list=row_list, newest_release=library_manager_data["newest_release"])
+            self.assertEqual(row_list[Column.library_manager_name], "Servo")
+            self.assertEqual(row_list[Column.library_manager_paragraph], "")
+            self.assertEqual(row_list[Column.library_manager_url], "http://www.arduino.cc/en/Reference/Servo")
+            self.assertEqual(row_list[Column.library_manager_architectures], "avr,sam,samd")
+
+            # the repository was pushed to after the release was verified
+            self.assertFalse(library_index_metadata_is_current(
+                repository_object={"html_url": repository_object["html_url"], "pushed_at": "2018-02-01T00:00:00Z"},
+                library_manager_data=library_manager_data
+            ))
+            # a new release is unverified
+            library_manager_data["newest_release"]["version"] = "1.1.3"
+            self.assertFalse(library_index_metadata_is_current(repository_object=repository_object,
+                                                               library_manager_data=library_manager_data))
+        finally:
+            set_library_index_metadata(use_library_index_metadata_input=False)
+            sys.modules["inoliblist"].verified_library_releases.clear()
+
+    def test_get_fork_parent(self):
+        repository_object = {"html_url": "https://github.com/per1234/Servo",
+                             "full_name": "per1234/Servo",
+                             "fork": True,
+                             "parent": {"full_name": "arduino-libraries/Servo"}}
+        try:
+            self.assertEqual(get_fork_parent(repository_object=repository_object), "arduino-libraries/Servo")
+            # the parent is known so the repos API request is not needed for the search result
+            del repository_object["parent"]
+            repository_object = LazyRepositoryObject(repository_object)
+            self.assertEqual(get_fork_parent(repository_object=repository_object), "arduino-libraries/Servo")
+            self.assertFalse(repository_object.details_loaded)
+            # items that are not missing from search results don't cause a request
+            with self.assertRaises(KeyError):
+                repository_object["foo"]
+            self.assertFalse(repository_object.details_loaded)
+        finally:
+            load_fork_parents()
+
+    def test_metrics(self):
+        test_metrics = Metrics()
+        with test_metrics.stage(name="verification"):
+            test_metrics.record_request(url="https://api.github.com/repos/arduino-libraries/Servo/contents",
+                                        status=200,
+                                        bytes_sent=0,
+                                        bytes_received=1000,
+                                        latency=0.2)
+            with test_metrics.stage(name="metadata"):
+                test_metrics.record_request(url="https://raw.githubusercontent.com/arduino-libraries/Servo/master/"
+                                                "library.json",
+                                            status=404,
+                                            bytes_sent=0,
+                                            bytes_received=0,
+                                            latency=60)
+                test_metrics.record_retry()
+            test_metrics.record_rate_limit_wait(seconds=2)
+        report = test_metrics.get_report()
+        self.assertEqual(report["stages"]["verification"]["requests"], {"github_core": 1})
+        self.assertEqual(report["stages"]["verification"]["bytes_received"], 1000)
+        self.assertEqual(report["stages"]["verification"]["rate_limit_wait_seconds"], 2)
+        self.assertEqual(report["stages"]["verification"]["latency_buckets"], [0, 0, 1, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(report["stages"]["metadata"]["requests"], {"github_raw": 1})
+        self.assertEqual(report["stages"]["metadata"]["statuses"], {"404": 1})
+        self.assertEqual(report["stages"]["metadata"]["retries"], 1)
+        self.assertEqual(report["stages"]["metadata"]["latency_buckets"][-1], 1)
+        prometheus_text = test_metrics.get_prometheus_text()
+        self.assertIn("inoliblist_requests_total{stage=\"metadata\",endpoint=\"github_raw\"} 1\n", prometheus_text)
+        self.assertIn("inoliblist_request_duration_seconds_bucket{stage=\"verification\",le=\"+Inf\"} 1\n",
+                      prometheus_text)
+
+    def test_get_repository_key(self):
+        self.assertEqual(get_repository_key(repository_url="https://github.com/Arduino-Libraries/Ethernet.git"),
+                         "https://github.com/arduino-libraries/ethernet")
+        self.assertEqual(get_repository_key(repository_url="https://github.com/arduino-libraries/Ethernet/"),
+                         "https://github.com/arduino-libraries/ethernet")
+
+    def test_repository_is_listed(self):
+        row_list = [""] * Column.count
+        row_list[Column.repository_url] = "https://github.com/arduino-libraries/Ethernet"
+        add_row_to_table(row_list=row_list)
+        self.assertTrue(repository_is_listed(repository_url="https://github.com/arduino-libraries/ethernet"))
+        self.assertFalse(repository_is_listed(repository_url="https://github.com/arduino-libraries/WiFi"))
+
+    def test_row(self):
+        row_list = [""] * Column.count
+        row_list[Column.repository_url] = "https://github.com/arduino-libraries/Ethernet"
+        row_list[Column.repository_owner] = "arduino-libraries"
+        row_list[Column.archived] = "False"
+        row_list[Column.star_count] = "123"
+        row_list[Column.fork_count] = "0"
+        # not an integer, so it must be kept as is
+        row_list[Column.contributor_count] = "007"
+        row = Row(row_list=row_list)
+        self.assertEqual(row.get_value(column=Column.star_count), 123)
+        self.assertEqual(row.get_value(column=Column.fork_count), 0)
+        self.assertIs(row.get_value(column=Column.archived), False)
+        self.assertEqual(row.get_value(column=Column.contributor_count), "007")
+        self.assertIs(row.get_value(column=Column.repository_owner), sys.intern("arduino-libraries"))
+        # the text is unchanged
+        self.assertEqual(row[Column.star_count], "123")
+        self.assertEqual(row[Column.archived], "False")
+        self.assertEqual(row.get_text_list(), row_list)
+        self.assertEqual(len(row), Column.count)
+        # a row saved by an older version of the script has fewer columns
+        row = Row(row_list=row_list[:Column.count - 2])
+        self.assertEqual(row.get_text_list(), row_list[:Column.count - 2] + ["", ""])
+        self.assertEqual(row.get_value(column=Column.count - 1), "")
+
+    def test_name_matcher(self):
+        name_matcher = NameMatcher(regular_expressions=["^examples$", "^.*\\.md$", "^node\\.js$", "^\\..*"])
+        self.assertTrue(name_matcher.matches(name="Examples"))
+        self.assertTrue(name_matcher.matches(name="README.MD"))
+        self.assertTrue(name_matcher.matches(name="node.js"))
+        self.assertTrue(name_matcher.matches(name=".travis.yml"))
+        self.assertFalse(name_matcher.matches(name="nodexjs"))
+        self.assertFalse(name_matcher.matches(name="examples2"))
+        self.assertFalse(name_matcher.matches(name="README.md.txt"))
+
+    def test_find_library_verify_only_administrative_files(self):
+        folder_listing = [{"name": "README.md", "type": "file"},
+                          {"name": ".gitignore", "type": "file"},
+                          {"name": "LICENSE", "type": "file"},
+                          {"name": "MyLibrary", "type": "dir"}]
+        self.assertIsNone(find_library(folder_listing=folder_listing, verify=True))
+        folder_listing.append({"name": "MyLibrary.HPP", "type": "file"})
+        self.assertTrue(find_library(folder_listing=folder_listing, verify=True))
+        folder_listing.append({"name": "sketch.ino", "type": "file"})
+        self.assertFalse(find_library(folder_listing=folder_listing, verify=True))
+        folder_listing.append({"name": "Examples", "type": "dir"})
+        self.assertTrue(find_library(folder_listing=folder_listing, verify=True))
+
+    def test_get_folder_listings_from_tree(self):
+        tree = [{"path": "README.md", "mode": "100644", "type": "blob"},
+                {"path": "extras", "mode": "040000", "type": "tree"},
+                {"path": "extras/MyLibrary", "mode": "040000", "type": "tree"},
+                {"path": "extras/MyLibrary/MyLibrary.h", "mode": "100644", "type": "blob"},
+                {"path": "src", "mode": "040000", "type": "tree"},
+                {"path": "src/MyLibrary.h", "mode": "100644", "type": "blob"},
+                {"path": "src/link", "mode": "120000", "type": "blob"}]
+        folder_listings = get_folder_listings_from_tree(tree=tree)
+        self.assertEqual(folder_listings["/"], [{"name": "README.md", "type": "file"},
+                                                {"name": "extras", "type": "dir"},
+                                                {"name": "src", "type": "dir"}])
+        self.assertEqual(folder_listings["extras"], [{"name": "MyLibrary", "type": "dir"}])
+        self.assertEqual(folder_listings["src"], [{"name": "MyLibrary.h", "type": "file"},
+                                                  {"name": "link", "type": "symlink"}])
+        self.assertTrue(find_library(folder_listing=folder_listings["src"], verify=True))
+
+    def test_raw_file_is_missing(self):
+        repository_object = {"html_url": "https://github.com/arduino-libraries/Servo",
+                             "default_branch": "master",
+                             "pushed_at": "2018-05-29T12:00:00Z"}
+        folder_listing = [{"name": "Servo.h", "type": "file"}]
+        self.assertFalse(raw_file_is_missing(repository_object=repository_object,
+                                             path="src/Servo.h",
+                                             folder_listing=folder_listing))
+        self.assertTrue(raw_file_is_missing(repository_object=repository_object,
+                                            path="src/library.properties",
+                                            folder_listing=folder_listing))
+        try:
+            self.assertFalse(raw_file_is_missing(repository_object=repository_object, path="library.json"))
+            add_missing_raw_file(repository_object=repository_object, path="library.json")
+            self.assertTrue(raw_file_is_missing(repository_object=repository_object, path="library.json"))
+            # the file might have been added by the push
+            repository_object["pushed_at"] = "2018-05-30T12:00:00Z"
+            self.assertFalse(raw_file_is_missing(repository_object=repository_object, path="library.json"))
+        finally:
+            load_missing_raw_files()
+
     @unittest.skip("")
     def test_find_library_folder_library_dot_properties_in_root(self):
         # requirements: library.properties in the root, no library.json in the root, no header in root
@@ -750,7 +1647,69 @@ class TestInoliblist(unittest.TestCase):
             csv_data = csv.reader(csv_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar)
             # convert to list so specific rows can be accessed
             csv_data = list(csv_data)
-        self.assertEqual(csv_data, get_table())
+        self.assertEqual(csv_data, [get_table()[0]] + [row.get_text_list() for row in get_table()[1:]])
+
+    def test_create_output_file_low_memory(self):
+        set_low_memory(enable_low_memory_input=True)
+        try:
+            for repository_name in ["Servo", "arduino", "Ethernet", "WiFi"]:
+                row_list = [""] * Column.count
+                row_list[Column.repository_url] = "https://github.com/arduino-libraries/" + repository_name
+                add_row_to_table(row_list=row_list)
+        finally:
+            set_low_memory(enable_low_memory_input=False)
+        # the rows are only in the spool file
+        self.assertEqual(len(get_table()), 1)
+        create_output_file()
+        with open(file=output_folder_name + "/" + output_filename,
+                  mode='r',
+                  encoding=file_encoding,
+                  newline=file_newline
+                  ) as csv_file:
+            csv_data = list(csv.reader(csv_file, delimiter=output_file_delimiter, quotechar=output_file_quotechar))
+        self.assertEqual(csv_data[0], get_heading_row())
+        self.assertEqual([row[Column.repository_url].split('/')[-1] for row in csv_data[1:]],
+                         ["Ethernet", "Servo", "WiFi", "arduino"])
+
+    def test_create_output_file_sort_by(self):
+        for repository_name, star_count, last_push_date in [("Servo", "5", "2018-01-02T00:00:00Z"),
+                                                            ("Ethernet", "12", "2018-03-01T00:00:00Z"),
+                                                            ("WiFi", "5", "2018-02-01T00:00:00Z"),
+                                                            ("arduino", "", "")]:
+            row_list = [""] * Column.count
+            row_list[Column.repository_url] = "https://github.com/arduino-libraries/" + repository_name
+            row_list[Column.repository_name] = repository_name
+            row_list[Column.star_count] = star_count
+            row_list[Column.last_push_date] = last_push_date
+            add_row_to_table(row_list=row_list)
+        try:
+            for sort_key_names, repository_names in [(["stars", "name"], ["Ethernet", "Servo", "WiFi", "arduino"]),
+                                                     (["stars", "last-push"], ["Ethernet", "WiFi", "Servo", "arduino"]),
+                                                     (["last-push"], ["Ethernet", "WiFi", "Servo", "arduino"])]:
+                set_sort_by(sort_key_names_input=sort_key_names)
+                # the order must be the same whether the rows are sorted in one chunk or merged from multiple chunks
+                for chunk_size in [spool_sort_chunk_size, 1]:
+                    sys.modules["inoliblist"].spool_sort_chunk_size = chunk_size
+                    create_output_file()
+                    with open(file=output_folder_name + "/" + output_filename,
+                              mode='r',
+                              encoding=file_encoding,
+                              newline=file_newline
+                              ) as csv_file:
+                        csv_data = list(csv.reader(csv_file,
+                                                   delimiter=output_file_delimiter,
+                                                   quotechar=output_file_quotechar))
+                    self.assertEqual(csv_data[0], get_heading_row())
+                    self.assertEqual([row[Column.repository_name] for row in csv_data[1:]], repository_names)
+                    # the text of the cells is unchanged
+                    self.assertEqual(csv_data[1][Column.star_count], "12")
+        finally:
+            sys.modules["inoliblist"].spool_sort_chunk_size = spool_sort_chunk_size
+            set_sort_by(sort_key_names_input=default_sort_key_names)
+
+    def test_set_sort_by_invalid(self):
+        with self.assertRaises(ValueError):
+            set_sort_by(sort_key_names_input=["size"])
 
     @unittest.skip("")
     def test_create_output_file_empty(self):
@@ -771,6 +1730,45 @@ class TestInoliblist(unittest.TestCase):
                       ):
                 pass
 
+    def test_query_index(self):
+        row_values = [("arduino-libraries", "Servo", "LGPL-2.1", "Device Control", "avr, sam,samd", "arduino",
+                       "Allows Arduino boards to control a variety of servo motors."),
+                      ("per1234", "inoliblist", "MIT", "", "", "arduino, arduino-library",
+                       "A list of Arduino library repositories."),
+                      ("arduino-libraries", "Ethernet", "none", "Communication", "*", "",
+                       "Enables network connection (local and Internet) using the Arduino Ethernet board.")]
+        rows = []
+        for owner, name, license_identifier, category, architectures, topics, description in row_values:
+            row_list = [""] * Column.count
+            row_list[Column.repository_url] = "https://github.com/" + owner + "/" + name
+            row_list[Column.repository_owner] = owner
+            row_list[Column.repository_name] = name
+            row_list[Column.repository_license] = license_identifier
+            row_list[Column.library_manager_category] = category
+            row_list[Column.library_manager_architectures] = architectures
+            row_list[Column.github_topics] = topics
+            row_list[Column.repository_description] = description
+            rows.append(Row(row_list=row_list))
+        query_index = QueryIndex(rows=rows)
+
+        def query_names(**query_arguments):
+            return [row[Column.repository_name] for row in query_index.query(**query_arguments)]
+
+        self.assertEqual(query_names(), ["Servo", "inoliblist", "Ethernet"])
+        self.assertEqual(query_names(filters={"owner": "Arduino-Libraries"}), ["Servo", "Ethernet"])
+        self.assertEqual(query_names(filters={"owner": "arduino-libraries"}, limit=1), ["Servo"])
+        # the lists are indexed by each of their values
+        self.assertEqual(query_names(filters={"architecture": "sam"}), ["Servo"])
+        self.assertEqual(query_names(filters={"topic": "arduino"}), ["Servo", "inoliblist"])
+        self.assertEqual(query_names(filters={"topic": "arduino", "license": "mit"}), ["inoliblist"])
+        self.assertEqual(query_names(filters={"category": ""}), [])
+        # all the words of the search must be in the row
+        self.assertEqual(query_names(search="arduino"), ["Servo", "inoliblist", "Ethernet"])
+        self.assertEqual(query_names(search="Arduino board"), ["Ethernet"])
+        self.assertEqual(query_names(search="servo motors", filters={"license": "MIT"}), [])
+        with self.assertRaises(ValueError):
+            query_index.query(filters={"stars": "1"})
+
 
 if __name__ == '__main__':
     unittest.main()